@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+artifact_io.py
+--------------
+File formats and retention of the `graph_data/` artifacts (`raw_graph_*`,
+`risk_paths_*`).
+
+    json         pretty-printed JSON (indent=2), the default
+    json.gz      compact JSON, gzip-compressed
+    json.xz      compact JSON, lzma/xz-compressed
+    ndjson       a header line, then one line per path (raw graphs) or risk entity (risk_paths)
+    ndjson.gz    NDJSON, gzip-compressed
+    ndjson.xz    NDJSON, lzma/xz-compressed
+
+The format name is the file extension (`raw_graph_<address>_<ts>.ndjson.gz`),
+but readers do not rely on it: compression is detected from the magic bytes
+and the NDJSON layout from its header line, so `load_artifact()` and
+`graph_stream.iter_graph_events()` read every format.
+
+The NDJSON header is the document with its item list replaced by null, led by
+an `__ndjson__` key naming where the following lines belong:
+
+    {"__ndjson__": {"version": 1, "items": ["graph_data", "data", "paths"]}, "chain": "Tron", ...}
+    {"path": [...], "direction": -1, ...}
+    ...
+
+New artifacts use AMLCLAW_RAW_GRAPH_FORMAT / AMLCLAW_RISK_PATHS_FORMAT, else
+AMLCLAW_OUTPUT_FORMAT, else `json` (the LLM report flow reads risk_paths as JSON).
+
+Retention:
+    python3 scripts/artifact_io.py compact graph_data --older-than 7d --format ndjson.xz
+    python3 scripts/artifact_io.py prune graph_data --older-than 90d --kind raw_graph --dry-run
+    python3 scripts/artifact_io.py stats graph_data
+"""
+import argparse
+import gzip
+import json
+import lzma
+import os
+import re
+import sys
+import time
+
+FORMATS = ("json", "json.gz", "json.xz", "ndjson", "ndjson.gz", "ndjson.xz")
+DEFAULT_FORMAT = "json"
+
+# Item list of each artifact kind, written one per line in the NDJSON layout
+ITEMS_PATHS = {
+    "raw_graph": ("graph_data", "data", "paths"),
+    "risk_paths": ("risk_entities",),
+}
+# Kinds `prune` can delete (batch_*.ndjson logs included)
+PRUNE_KINDS = ("raw_graph", "risk_paths", "batch")
+
+NDJSON_KEY = "__ndjson__"
+NDJSON_VERSION = 1
+_NDJSON_PREFIX = '{"' + NDJSON_KEY + '"'
+
+_MAGIC = ((b"\x1f\x8b", "gz"), (b"\xfd7zXZ\x00", "xz"))
+# gzip level 5: close to level 9 in size for JSON at a fraction of the CPU time
+GZIP_LEVEL = 5
+XZ_PRESET = 6
+
+_ARTIFACT_NAME = re.compile(r"^(raw_graph|risk_paths|batch)_(.+?)\.((?:nd)?json(?:\.(?:gz|xz))?)$")
+_AGE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+_AGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "": 86400}
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown artifact format '{fmt}' (choose from {', '.join(FORMATS)})")
+    return fmt
+
+
+def output_format(kind: str) -> str:
+    """Format for new `kind` artifacts from the environment (see module docstring)."""
+    fmt = os.getenv(f"AMLCLAW_{kind.upper()}_FORMAT") or os.getenv("AMLCLAW_OUTPUT_FORMAT") or DEFAULT_FORMAT
+    return check_format(fmt)
+
+
+def artifact_stem(name: str) -> str:
+    """`raw_graph_<stem>.<format>` -> `<stem>` (the name without kind prefix and format extension)."""
+    match = _ARTIFACT_NAME.match(os.path.basename(name))
+    if match:
+        return match.group(2)
+    return os.path.basename(name).split(".", 1)[0]
+
+
+def _compression(path):
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_artifact(path, mode="rt"):
+    """Open an artifact for reading as text, decompressing it when needed."""
+    compression = _compression(path)
+    if compression == "gz":
+        return gzip.open(path, mode, encoding="utf-8")
+    if compression == "xz":
+        return lzma.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_ndjson_header(f):
+    """Header dict of an NDJSON artifact opened with `open_artifact()`, else None (file rewound)."""
+    if f.read(len(_NDJSON_PREFIX)) != _NDJSON_PREFIX:
+        f.seek(0)
+        return None
+    f.seek(0)
+    return json.loads(f.readline())
+
+
+def detect_format(path) -> str:
+    """Format name of an existing artifact, from its content."""
+    with open_artifact(path) as f:
+        layout = "ndjson" if read_ndjson_header(f) is not None else "json"
+    compression = _compression(path)
+    return f"{layout}.{compression}" if compression else layout
+
+
+def _set_path(doc, items_path, value):
+    for key in items_path[:-1]:
+        doc = doc[key]
+    doc[items_path[-1]] = value
+
+
+def read_ndjson(f, header):
+    """Rebuild the full document from an NDJSON header and the remaining lines of `f`."""
+    doc = dict(header)
+    items_path = doc.pop(NDJSON_KEY).get("items")
+    items = [json.loads(line) for line in f if line.strip()]
+    if items_path:
+        _set_path(doc, items_path, items)
+    return doc
+
+
+def load_artifact(path):
+    """Load any artifact format as the document `json.load()` would return for plain JSON."""
+    with open_artifact(path) as f:
+        header = read_ndjson_header(f)
+        if header is not None:
+            return read_ndjson(f, header)
+        return json.load(f)
+
+
+def _split_items(doc, items_path):
+    """`(header, items)`: copies of the dicts along `items_path` with the item list replaced by None."""
+    header = dict(doc)
+    node = header
+    for key in items_path[:-1]:
+        child = node.get(key)
+        if not isinstance(child, dict):
+            return doc, None
+        node[key] = node = dict(child)
+    items = node.get(items_path[-1])
+    if not isinstance(items, list):
+        return doc, None
+    node[items_path[-1]] = None
+    return header, items
+
+
+def _write_ndjson(f, doc, items_path):
+    header, items = _split_items(doc, items_path) if items_path else (doc, None)
+    meta = {"version": NDJSON_VERSION, "items": list(items_path) if items is not None else None}
+    f.write(json.dumps({NDJSON_KEY: meta, **header}, ensure_ascii=False, separators=(",", ":")))
+    f.write("\n")
+    for item in items or ():
+        f.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        f.write("\n")
+
+
+def write_artifact(doc, path, fmt=DEFAULT_FORMAT, items_path=None):
+    """Write `doc` to `path` in `fmt` (through a temporary file, so readers never see a partial artifact)."""
+    layout, _, compression = check_format(fmt).partition(".")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if compression == "gz":
+        f = gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=GZIP_LEVEL)
+    elif compression == "xz":
+        f = lzma.open(tmp_path, "wt", encoding="utf-8", preset=XZ_PRESET)
+    else:
+        f = open(tmp_path, "w", encoding="utf-8")
+    try:
+        with f:
+            if layout == "ndjson":
+                _write_ndjson(f, doc, items_path)
+            elif compression:
+                f.write(json.dumps(doc, ensure_ascii=False, separators=(",", ":")))
+            else:
+                json.dump(doc, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _reserve_path(out_dir, kind, stem, fmt):
+    """
+    Create an empty `<kind>_<stem>.<format>` exclusively, adding `_2`, `_3`, ... to
+    the stem when taken, so concurrent screenings in the same second never share a file.
+    """
+    suffix = 1
+    while True:
+        name = f"{kind}_{stem}.{fmt}" if suffix == 1 else f"{kind}_{stem}_{suffix}.{fmt}"
+        path = os.path.join(out_dir, name)
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return path
+        except FileExistsError:
+            suffix += 1
+
+
+def save_artifact(doc, kind, stem, out_dir, fmt=None):
+    """Write a new `<kind>_<stem>.<format>` artifact into `out_dir` and return its path."""
+    fmt = check_format(fmt) if fmt else output_format(kind)
+    os.makedirs(out_dir, exist_ok=True)
+    path = _reserve_path(out_dir, kind, stem, fmt)
+    try:
+        return write_artifact(doc, path, fmt, ITEMS_PATHS.get(kind))
+    except BaseException:
+        os.remove(path)
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Retention
+# ---------------------------------------------------------------------------
+
+def parse_age(text: str) -> float:
+    """`90d`, `12h`, `30m`, `45s` (a bare number is days) -> seconds."""
+    match = _AGE.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid age '{text}' (expected e.g. 7d, 12h, 30m)")
+    return float(match.group(1)) * _AGE_UNITS[match.group(2)]
+
+
+def iter_artifacts(directory, kinds=PRUNE_KINDS):
+    """Yield `(path, kind, stem, extension, stat)` for the artifacts directly in `directory`."""
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            match = _ARTIFACT_NAME.match(entry.name)
+            if not match or match.group(1) not in kinds or not entry.is_file(follow_symlinks=False):
+                continue
+            yield entry.path, match.group(1), match.group(2), match.group(3), entry.stat()
+
+
+def _screening_index(directory):
+    """The directory's existing screening index (see screening_index.py), if any."""
+    from screening_index import open_index
+    return open_index(directory, create=False)
+
+
+def compact(directory, older_than, fmt, kinds=tuple(ITEMS_PATHS), dry_run=False, now=None):
+    """
+    Rewrite artifacts older than `older_than` seconds in `fmt` (mtime is kept,
+    the original is removed and the screening index repointed). Returns counts
+    and byte totals.
+    """
+    check_format(fmt)
+    index = _screening_index(directory)
+    cutoff = (now or time.time()) - older_than
+    summary = {"compacted": 0, "skipped": 0, "failed": 0, "bytes_before": 0, "bytes_after": 0, "errors": []}
+    for path, kind, stem, _, stat in iter_artifacts(directory, kinds):
+        if stat.st_mtime >= cutoff:
+            continue
+        new_path = os.path.join(directory, f"{kind}_{stem}.{fmt}")
+        try:
+            if detect_format(path) == fmt or (new_path != path and os.path.exists(new_path)):
+                summary["skipped"] += 1
+                continue
+            if not dry_run:
+                write_artifact(load_artifact(path), new_path, fmt, ITEMS_PATHS[kind])
+        except (OSError, ValueError, EOFError, lzma.LZMAError) as e:
+            summary["failed"] += 1
+            summary["errors"].append(f"{os.path.basename(path)}: {e}")
+            continue
+        summary["compacted"] += 1
+        summary["bytes_before"] += stat.st_size
+        if dry_run:
+            continue
+        os.utime(new_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        if new_path != path:
+            os.remove(path)
+            if index is not None:
+                index.rename_artifact(path, new_path)
+        summary["bytes_after"] += os.path.getsize(new_path)
+    return summary
+
+
+def prune(directory, older_than, kinds=PRUNE_KINDS, dry_run=False, now=None):
+    """
+    Delete artifacts older than `older_than` seconds (their screening index rows
+    are kept, without the path). Returns counts and bytes freed.
+    """
+    cutoff = (now or time.time()) - older_than
+    index = _screening_index(directory)
+    summary = {"deleted": 0, "bytes": 0}
+    for path, _, _, _, stat in iter_artifacts(directory, kinds):
+        if stat.st_mtime >= cutoff:
+            continue
+        if not dry_run:
+            os.remove(path)
+            if index is not None:
+                index.forget_artifact(path)
+        summary["deleted"] += 1
+        summary["bytes"] += stat.st_size
+    return summary
+
+
+def stats(directory, kinds=PRUNE_KINDS):
+    """File count, bytes and oldest mtime per kind and extension."""
+    result = {}
+    for _, kind, _, extension, stat in iter_artifacts(directory, kinds):
+        entry = result.setdefault(kind, {}).setdefault(extension, {"files": 0, "bytes": 0, "oldest": None})
+        entry["files"] += 1
+        entry["bytes"] += stat.st_size
+        if entry["oldest"] is None or stat.st_mtime < entry["oldest"]:
+            entry["oldest"] = stat.st_mtime
+    for by_extension in result.values():
+        for entry in by_extension.values():
+            entry["oldest"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(entry["oldest"]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact, prune or inspect graph_data/ artifacts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_compact = sub.add_parser("compact", help="Rewrite old raw_graph/risk_paths files in a compact format")
+    p_compact.add_argument("directory", nargs="?", default="graph_data")
+    p_compact.add_argument("--older-than", default="7d", help="Minimum age, e.g. 7d, 12h (default: 7d)")
+    p_compact.add_argument("--format", default="ndjson.xz", choices=FORMATS, help="Target format (default: ndjson.xz)")
+    p_compact.add_argument("--kind", action="append", choices=list(ITEMS_PATHS), help="Artifact kind (repeatable, default: all)")
+    p_compact.add_argument("--dry-run", action="store_true")
+
+    p_prune = sub.add_parser("prune", help="Delete old artifacts")
+    p_prune.add_argument("directory", nargs="?", default="graph_data")
+    p_prune.add_argument("--older-than", required=True, help="Minimum age, e.g. 90d")
+    p_prune.add_argument("--kind", action="append", choices=list(PRUNE_KINDS), help="Artifact kind (repeatable, default: all)")
+    p_prune.add_argument("--dry-run", action="store_true")
+
+    p_stats = sub.add_parser("stats", help="Files and bytes per kind and format")
+    p_stats.add_argument("directory", nargs="?", default="graph_data")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(json.dumps({"status": "failed", "error": f"Directory not found: {args.directory}"}))
+        sys.exit(1)
+    try:
+        if args.command == "compact":
+            result = compact(args.directory, parse_age(args.older_than), args.format,
+                             kinds=tuple(args.kind or ITEMS_PATHS), dry_run=args.dry_run)
+        elif args.command == "prune":
+            result = prune(args.directory, parse_age(args.older_than), kinds=tuple(args.kind or PRUNE_KINDS),
+                           dry_run=args.dry_run)
+        else:
+            result = stats(args.directory)
+    except ValueError as e:
+        print(json.dumps({"status": "failed", "error": str(e)}))
+        sys.exit(1)
+
+    failed = result.get("failed")
+    print(json.dumps({"status": "failed" if failed else "success", "command": args.command,
+                      "dry_run": getattr(args, "dry_run", False), **result}, ensure_ascii=False))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+batch_screening.py
+------------------
+Batch mode for `run_screening.py --batch`.
+
+Submits TrustIn tasks for many (chain, address, scenario) entries up front,
+polls each outstanding task_id on its own poll policy schedule (the status
+calls due at the same time run concurrently) and downloads and extracts each
+result on a worker thread as it lands, instead of the serial submit -> poll -> result loop of a single run.
+
+Input file formats:
+    CSV     header row with `chain,address[,scenario]`
+    NDJSON  one {"chain": ..., "address": ..., "scenario": ...} object per line
+"""
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from trustin_api import AuthorizationError, TrustInAPI, build_submit_payload
+from polling import PollPolicy, latency_bucket
+from fetch_graph import build_graph_response, default_time_window
+from run_screening import SCENARIO_DIRECTION_DEFAULTS, process_graph
+from hop_planner import plan_hops
+from metrics import ScreeningMetrics
+from reputation_store import record_graph_safely
+
+
+class BatchJob:
+    """One batch entry and its progress through submit -> poll -> extract."""
+
+    def __init__(self, line_no, chain, address, scenario):
+        self.line_no = line_no
+        self.chain = chain
+        self.address = address
+        self.scenario = scenario
+        self.task_id = None
+        self.submitted_at = None
+        self.start_time = None
+        self.time_window = None
+        self.direction = None
+        self.hops = None  # {"inflow_hops", "outflow_hops", "max_nodes_per_hop"} of the TrustIn request
+        self.payload = None  # submit payload (graph cache key, latency hint bucket)
+        self.poll_delays = None  # PollPolicy.delays() iterator of this task
+        self.next_poll = None  # monotonic time of the next status call
+        self.poll_error = None  # last failed status call, retried until the deadline
+        self.metrics = ScreeningMetrics(chain, address, scenario)
+
+    def record(self, status, **fields):
+        record = {
+            "line": self.line_no,
+            "chain": self.chain,
+            "address": self.address,
+            "scenario": self.scenario,
+            "task_id": self.task_id,
+            "status": status,
+        }
+        if self.submitted_at is not None:
+            record["task_seconds"] = round(time.monotonic() - self.submitted_at, 3)
+        record.update(fields)
+        record["metrics"] = self.metrics.record(status, error=fields.get("error"))
+        return record
+
+
+def load_batch_entries(path, default_scenario="all"):
+    """Read batch entries from a CSV or NDJSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    stripped = content.lstrip()
+    is_ndjson = path.endswith((".ndjson", ".jsonl")) or stripped.startswith("{")
+
+    rows = []
+    if is_ndjson:
+        for line_no, line in enumerate(content.splitlines(), start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append((line_no, json.loads(line)))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+    else:
+        reader = csv.DictReader(content.splitlines())
+        fields = [f.strip().lower() for f in (reader.fieldnames or [])]
+        if "chain" not in fields or "address" not in fields:
+            raise ValueError(f"{path}: CSV header must contain 'chain' and 'address' columns")
+        for line_no, row in enumerate(reader, start=2):
+            rows.append((line_no, {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}))
+
+    jobs = []
+    for line_no, row in rows:
+        chain = row.get("chain")
+        address = row.get("address")
+        if not chain or not address:
+            raise ValueError(f"{path}:{line_no}: 'chain' and 'address' are required")
+        scenario = row.get("scenario") or default_scenario
+        if scenario not in SCENARIO_DIRECTION_DEFAULTS:
+            raise ValueError(f"{path}:{line_no}: unknown scenario '{scenario}'")
+        jobs.append(BatchJob(line_no, chain, address, scenario))
+    return jobs
+
+
+def run_batch(jobs, rules, inflow_hops=3, outflow_hops=3, max_nodes_per_hop=100,
+              min_timestamp=None, max_timestamp=None, api_key=None, concurrency=20,
+              poll_interval=None, task_timeout=None, graph_dir=None, use_cache=True, engine="python",
+              workers=1, raw_graph_format=None, risk_paths_format=None, hop_plan=False):
+    """
+    Screen all jobs with up to `concurrency` TrustIn tasks in flight.
+
+    Each task is polled on the client's poll policy schedule (adaptive backoff
+    from its latency hint; `poll_interval` selects `PollPolicy.fixed()` instead)
+    until `task_timeout`, which defaults to the policy deadline. A failed status
+    call (exception or error code) is retried on the same schedule until the
+    deadline; a rejected API key fails the entry at once.
+    Observed task durations feed the client's latency hints. Finished tasks are
+    downloaded and extracted on a separate thread pool so polling and submits
+    carry on meanwhile; entries being completed count against `concurrency`.
+    Entries with a fresh graph cache
+    entry are extracted without submitting a task. `engine`, `workers` and the
+    artifact formats are passed to `process_graph()`; with `workers` != 1
+    extractions run one at a time. With `hop_plan`, the hops
+    are ceilings trimmed per scenario to what its rules need (see hop_planner.py).
+    Returns the list of per-entry records (in completion order) and the client's
+    graph cache stats (or None).
+    """
+    if poll_interval:
+        poll_policy = PollPolicy.fixed(poll_interval, deadline=task_timeout or PollPolicy().deadline)
+    else:
+        poll_policy = PollPolicy(deadline=task_timeout) if task_timeout else None
+    api = TrustInAPI(api_key=api_key, poll_policy=poll_policy, use_cache=use_cache)
+    task_timeout = api.poll_policy.deadline
+    shapes = {}  # scenario -> (direction, request hops)
+
+    def request_shape(scenario):
+        if scenario not in shapes:
+            direction = SCENARIO_DIRECTION_DEFAULTS[scenario]
+            hops = (inflow_hops, outflow_hops)
+            if hop_plan:
+                plan = plan_hops(rules, scenario, inflow_hops, outflow_hops, direction)
+                direction, hops = plan["direction"], (plan["inflow_hops"], plan["outflow_hops"])
+            shapes[scenario] = (direction, {"inflow_hops": hops[0], "outflow_hops": hops[1],
+                                            "max_nodes_per_hop": max_nodes_per_hop})
+        return shapes[scenario]
+
+    formats = {"raw_graph_format": raw_graph_format, "risk_paths_format": risk_paths_format}
+
+    # Sharded extractions run one at a time: each starts a pool of `workers` processes
+    extraction_lock = threading.Lock() if workers != 1 else None
+
+    pending = deque(jobs)
+    in_flight = {}  # task_id -> BatchJob
+    completing = {}  # Future of _complete_job() -> BatchJob
+    records = []
+
+    def finish(job, record):
+        records.append(record)
+        status = record["status"].upper()
+        detail = record.get("error") or f"{record.get('count', 0)} risk entities"
+        print(f"  [{len(records)}/{len(jobs)}] {status} {job.chain} {job.address} ({job.scenario}): {detail}")
+
+    def poll(job):
+        """Status of one task; failed calls (exceptions, non-zero codes) are returned as the error."""
+        try:
+            status = api.get_status(job.task_id, metrics=job.metrics)
+        except Exception as e:
+            return None, e
+        if status is None:
+            return None, Exception(f"Task {job.task_id} status call returned an error response")
+        return status, None
+
+    def complete(job, **kwargs):
+        """Hand a finished (or cached) entry to the completion pool."""
+        future = completer.submit(_complete_job, api, job, rules, graph_dir, engine=engine, workers=workers,
+                                  extraction_lock=extraction_lock, **formats, **kwargs)
+        completing[future] = job
+
+    def schedule(job, now):
+        """Next status call of `job`, never later than its deadline."""
+        job.next_poll = min(now + next(job.poll_delays), job.submitted_at + task_timeout)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as completer:
+        while pending or in_flight or completing:
+            # --- Submit up to the concurrency window ---
+            while pending and len(in_flight) + len(completing) < concurrency:
+                job = pending.popleft()
+                job.start_time = datetime.now()
+                job_min_ts, job_max_ts = default_time_window(job.start_time, min_timestamp, max_timestamp)
+                job.time_window = (job_min_ts, job_max_ts)
+                job.direction, job.hops = request_shape(job.scenario)
+                try:
+                    cached = api.cached_result(job.chain, job.address, scenario=job.scenario,
+                                               min_timestamp=job_min_ts, max_timestamp=job_max_ts, **job.hops)
+                except Exception:
+                    cached = None
+                job.metrics.set("cache_hit", cached is not None)
+                if cached is not None:
+                    complete(job, result=cached)
+                    continue
+                job.payload = build_submit_payload(job.chain, job.address, min_timestamp=job_min_ts,
+                                                   max_timestamp=job_max_ts, **job.hops)
+                try:
+                    job.submitted_at = time.monotonic()
+                    job.task_id = api.submit_task(
+                        job.chain, job.address, min_timestamp=job_min_ts, max_timestamp=job_max_ts,
+                        metrics=job.metrics, **job.hops
+                    )
+                except Exception as e:
+                    finish(job, job.record("failed", stage="submit", error=str(e)))
+                    continue
+                job.poll_delays = api.poll_policy.delays(api.latency_hints.get(latency_bucket(job.payload)))
+                schedule(job, job.submitted_at)
+                in_flight[job.task_id] = job
+
+            # --- Wait for the earliest scheduled poll or completed entry ---
+            timeout = None
+            if in_flight:
+                timeout = max(0.0, min(job.next_poll for job in in_flight.values()) - time.monotonic())
+            if completing:
+                done, _ = wait(completing, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(completing.pop(future), future.result())
+            elif timeout:
+                time.sleep(timeout)
+
+            # --- Run every due poll together ---
+            now = time.monotonic()
+            due = [job for job in in_flight.values() if job.next_poll <= now]
+            for job, (status, error) in zip(due, pool.map(poll, due)):
+                now = time.monotonic()
+                if status == "finished":
+                    del in_flight[job.task_id]
+                    job.metrics.set("poll_wait_seconds", now - job.submitted_at)
+                    api.latency_hints.record(latency_bucket(job.payload), now - job.submitted_at)
+                    complete(job, cache_payload=job.payload)
+                    continue
+                if error is not None:
+                    job.metrics.add("status_errors")
+                    if isinstance(error, AuthorizationError):
+                        del in_flight[job.task_id]
+                        finish(job, job.record("failed", stage="poll", error=str(error)))
+                        continue
+                    # Transient (network, 5xx, error code, bad body): retried on the policy schedule
+                    job.poll_error = str(error)
+                if now - job.submitted_at >= task_timeout:
+                    del in_flight[job.task_id]
+                    reason = f" (last status error: {job.poll_error})" if job.poll_error else ""
+                    finish(job, job.record("failed", stage="poll",
+                                           error=f"Task {job.task_id} timed out while processing.{reason}"))
+                    continue
+                schedule(job, now)
+
+    return records, (api.cache.stats() if api.cache is not None else None)
+
+
+def _complete_job(api, job, rules, graph_dir, result=None, cache_payload=None, engine="python", workers=1, raw_graph_format=None,
+                  risk_paths_format=None, extraction_lock=None):
+    """Download a finished task (unless served from cache) and run extraction in-process."""
+    cache_hit = result is not None
+    try:
+        if result is None:
+            result = api.get_result(job.task_id, cache_payload=cache_payload, metrics=job.metrics)
+        min_ts, max_ts = job.time_window
+        inflow_hops, outflow_hops = job.hops["inflow_hops"], job.hops["outflow_hops"]
+        graph = build_graph_response(
+            job.chain, job.address, job.direction,
+            inflow_hops, outflow_hops, job.hops["max_nodes_per_hop"], min_ts, max_ts, job.start_time, result.details
+        )
+        if not cache_hit:
+            record_graph_safely(graph)
+        processed = process_graph(graph, rules, scenario=job.scenario, max_depth=max(inflow_hops, outflow_hops),
+                                  output_dir=graph_dir, metrics=job.metrics, engine=engine, workers=workers,
+                                  raw_graph_format=raw_graph_format, risk_paths_format=risk_paths_format,
+                                  extraction_lock=extraction_lock)
+    except Exception as e:
+        return job.record("failed", stage="result", error=str(e))
+
+    output = processed["risk_paths"]
+    return job.record(
+        "success",
+        raw_graph=processed["raw_graph_path"],
+        output=processed["risk_paths_path"],
+        count=len(output["risk_entities"]),
+        highest_severity=output["summary"]["highest_severity"],
+        rules_triggered=output["summary"]["rules_triggered"],
+        action=output.get("verdict", {}).get("action"),
+        decided=output.get("verdict", {}).get("decided"),
+        target_self_hits=len(output["target"]["self_matched_rules"]),
+        cache_hit=cache_hit,
+    )
+
+
+def summarize(records, wall_seconds, cache_stats=None):
+    """Throughput summary for a finished batch."""
+    ok = [r for r in records if r["status"] == "success"]
+    latencies = sorted(r["task_seconds"] for r in ok if "task_seconds" in r)
+    summary = {
+        "total": len(records),
+        "succeeded": len(ok),
+        "failed": len(records) - len(ok),
+        "wall_seconds": round(wall_seconds, 3),
+        "screenings_per_minute": round(len(ok) / wall_seconds * 60, 2) if wall_seconds > 0 else 0.0,
+    }
+    if latencies:
+        summary["task_seconds_p50"] = latencies[len(latencies) // 2]
+        summary["task_seconds_max"] = latencies[-1]
+        summary["task_seconds_mean"] = round(sum(latencies) / len(latencies), 3)
+    if any(r.get("action") for r in ok):
+        summary["verdicts_decided"] = sum(1 for r in ok if r.get("decided"))
+    if cache_stats is not None:
+        summary["cache"] = cache_stats
+    return summary
+
+
+def write_batch_log(records, summary, graph_dir=None):
+    """Write one NDJSON line per entry plus a final summary line; returns the file path."""
+    graph_dir = graph_dir or os.path.join(os.getcwd(), "graph_data")
+    os.makedirs(graph_dir, exist_ok=True)
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    log_path = os.path.join(graph_dir, f"batch_{timestamp_str}.ndjson")
+    with open(log_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"summary": summary}, ensure_ascii=False) + "\n")
+    return log_path
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+------------
+Performance suite for the screening hot paths, run against the bundled default
+rule packs (`aml-rule-generator/defaults/*.json`) and synthetic graphs from
+`synthetic_graph.py`:
+
+    extract_risk_paths      full extraction, scenario `all` (plus `extract_risk_paths[numpy]`
+                            with the vectorized engine when NumPy is installed)
+    format_evidence_path    one evidence string per node of every path
+    evaluate_target_rules   target self-tag rules against a tagged target
+    validate_rules          schema, rule_id and label checks of `validate_rules.py`
+    load_compiled_rules     loading a rule pack through its compiled artifact (`compiled_rules.py`)
+
+Results can be saved and compared against a saved baseline; the comparison
+exits non-zero when a case's median time regresses beyond the tolerance.
+
+Usage:
+    python3 scripts/benchmark.py --save baseline.json
+    python3 scripts/benchmark.py --profile large --baseline baseline.json --tolerance 0.15
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from compiled_rules import compile_rules, load_compiled_rules
+from extract_risk_paths import (
+    evaluate_target_rules,
+    extract_risk_paths,
+    format_evidence_path,
+    load_rules,
+)
+from synthetic_graph import LABELS_PATH, generate_graph, load_label_catalog, random_tags
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+RULE_GENERATOR_DIR = os.path.join(REPO_ROOT, "aml-rule-generator")
+DEFAULT_RULES_DIR = os.path.join(RULE_GENERATOR_DIR, "defaults")
+
+# Synthetic graph shapes (see synthetic_graph.generate_graph for the knobs)
+PROFILES = {
+    "small":  {"inflow_hops": 3, "outflow_hops": 3, "nodes_per_hop": 50,  "paths": 200,   "tag_density": 0.3, "overlap": 0.5},
+    "medium": {"inflow_hops": 5, "outflow_hops": 5, "nodes_per_hop": 100, "paths": 2000,  "tag_density": 0.3, "overlap": 0.7},
+    "large":  {"inflow_hops": 5, "outflow_hops": 5, "nodes_per_hop": 200, "paths": 20000, "tag_density": 0.3, "overlap": 0.9},
+}
+DEFAULT_PROFILES = ["small", "medium"]
+
+# Calls per sample for sub-millisecond cases
+TARGET_RULE_CALLS = 1000
+VALIDATE_CALLS = 20
+
+
+def _import_validate_rules():
+    sys.path.insert(0, os.path.join(RULE_GENERATOR_DIR, "scripts"))
+    try:
+        import validate_rules
+    finally:
+        sys.path.pop(0)
+    return validate_rules
+
+
+def time_call(fn, repeat=5, number=1):
+    """Run `fn` `number` times per sample; return per-call statistics in seconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def bench_extract(graph, rules, repeat, engine="python"):
+    return time_call(lambda: extract_risk_paths(graph, rules, max_depth=5, scenario="all", engine=engine), repeat)
+
+
+def _numpy_available():
+    return importlib.util.find_spec("numpy") is not None
+
+
+def bench_format_evidence(graph, repeat):
+    paths = graph["graph_data"]["data"]["paths"]
+    jobs = [(p["path"], i, p.get("direction", -1)) for p in paths for i in range(len(p["path"]))]
+
+    def run():
+        for nodes, idx, direction in jobs:
+            format_evidence_path(nodes, idx, direction)
+
+    stats = time_call(run, repeat)
+    stats["ops"] = len(jobs)
+    return stats
+
+
+def bench_target_rules(rules, target_tags, repeat):
+    return time_call(lambda: evaluate_target_rules(rules, target_tags), repeat, number=TARGET_RULE_CALLS)
+
+
+def bench_validate(validate_rules, rules_path, repeat):
+    schema_path = validate_rules.SCHEMA_PATH
+
+    def run():
+        rules = validate_rules.load_json(rules_path)
+        schema = validate_rules.load_json(schema_path)
+        primary, secondary = validate_rules.parse_trustin_labels(validate_rules.LABELS_PATH)
+        validate_rules.validate_schema_structure(rules, schema)
+        validate_rules.validate_rule_id_uniqueness(rules)
+        validate_rules.validate_tag_values(rules, primary, secondary)
+
+    return time_call(run, repeat, number=VALIDATE_CALLS)
+
+
+def bench_load_compiled(rules_path, cache_dir, repeat):
+    compile_rules(rules_path, cache_dir=cache_dir)
+    return time_call(lambda: load_compiled_rules(rules_path, cache_dir=cache_dir), repeat, number=VALIDATE_CALLS)
+
+
+def run_suite(profiles, rules_dir=DEFAULT_RULES_DIR, repeat=5, seed=0, log=print):
+    """Run every benchmark case; returns `{"meta": ..., "results": {case: stats}}`."""
+    packs = sorted(f for f in os.listdir(rules_dir) if f.endswith(".json"))
+    if not packs:
+        raise FileNotFoundError(f"No rule packs found in {rules_dir}")
+    validate_rules = _import_validate_rules()
+    with_numpy = _numpy_available()
+    catalog = load_label_catalog(LABELS_PATH)
+
+    results = {}
+
+    def record(case, stats):
+        results[case] = stats
+        log(f"  {case:<55} median {stats['median_s'] * 1000:10.3f} ms")
+
+    target_tags = random_tags(random.Random(seed), catalog, max_tags=3)
+    rule_sets = {}
+    artifact_dir = tempfile.TemporaryDirectory()
+    for pack in packs:
+        rules_path = os.path.join(rules_dir, pack)
+        name = pack[:-5]
+        rule_sets[name] = load_rules(rules_path)
+        record(f"validate_rules/{name}", bench_validate(validate_rules, rules_path, repeat))
+        record(f"load_compiled_rules/{name}", bench_load_compiled(rules_path, artifact_dir.name, repeat))
+        record(f"evaluate_target_rules/{name}", bench_target_rules(rule_sets[name], target_tags, repeat))
+
+    for profile in profiles:
+        graph = generate_graph(seed=seed, **PROFILES[profile])
+        record(f"format_evidence_path/{profile}", bench_format_evidence(graph, repeat))
+        for name, rules in rule_sets.items():
+            record(f"extract_risk_paths/{profile}/{name}", bench_extract(graph, rules, repeat))
+            if with_numpy:
+                record(f"extract_risk_paths[numpy]/{profile}/{name}",
+                       bench_extract(graph, rules, repeat, engine="numpy"))
+
+    meta = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "seed": seed,
+        "profiles": {name: PROFILES[name] for name in profiles},
+        "rule_packs": packs,
+    }
+    artifact_dir.cleanup()
+    return {"meta": meta, "results": results}
+
+
+def compare(results, baseline, tolerance=0.15):
+    """
+    Compare median times case by case.
+    Returns rows of (case, baseline_s, current_s, ratio, status) with status
+    `regressed`, `improved`, `ok`, `new` or `missing`.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for case in sorted(set(results) | set(base_results)):
+        current = results.get(case)
+        base = base_results.get(case)
+        if base is None:
+            rows.append((case, None, current["median_s"], None, "new"))
+            continue
+        if current is None:
+            rows.append((case, base["median_s"], None, None, "missing"))
+            continue
+        ratio = current["median_s"] / base["median_s"] if base["median_s"] > 0 else float("inf")
+        if ratio > 1 + tolerance:
+            status = "regressed"
+        elif ratio < 1 - tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((case, base["median_s"], current["median_s"], ratio, status))
+    return rows
+
+
+def print_comparison(rows):
+    def ms(value):
+        return f"{value * 1000:10.3f}" if value is not None else f"{'-':>10}"
+
+    print(f"\n  {'case':<55} {'base ms':>10} {'now ms':>10} {'ratio':>7}  status")
+    for case, base, current, ratio, status in rows:
+        ratio_str = f"{ratio:7.2f}" if ratio is not None else f"{'-':>7}"
+        print(f"  {case:<55} {ms(base)} {ms(current)} {ratio_str}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction and rule validation on synthetic graphs.")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES.keys()),
+                        help=f"Graph profile to run (repeatable, default: {', '.join(DEFAULT_PROFILES)}).")
+    parser.add_argument("--rules-dir", default=DEFAULT_RULES_DIR, help="Directory of rule packs (default: bundled defaults).")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per case (default: 5).")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic graph seed (default: 0).")
+    parser.add_argument("--save", default=None, help="Write results JSON to this path.")
+    parser.add_argument("--baseline", default=None, help="Compare against a results JSON saved with --save.")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed median slowdown before a case counts as regressed (default: 0.15).")
+    args = parser.parse_args()
+
+    profiles = args.profile or DEFAULT_PROFILES
+    print(f"Benchmarking profiles {', '.join(profiles)} with {args.repeat} samples per case")
+    suite = run_suite(profiles, rules_dir=args.rules_dir, repeat=args.repeat, seed=args.seed)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2, ensure_ascii=False)
+        print(f"\nResults saved to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(suite["results"], baseline, args.tolerance)
+        print_comparison(rows)
+        regressed = [row[0] for row in rows if row[4] == "regressed"]
+        if regressed:
+            print(f"\nFAIL: {len(regressed)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nPASS: no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+compiled_rules.py
+-----------------
+Compiled, versioned form of `rules.json` for fast screening start-up.
+
+Compiling validates the rules once (schema, rule_id uniqueness and TrustIn
+labels, through aml-rule-generator's `validate_rules.py` when it is installed)
+and precomputes what every screening would otherwise re-derive:
+
+    - the rule list of every scenario (the SCENARIO_CATEGORIES filter),
+    - the node-level spec of every rule (`rule_index.rule_spec()`): direction,
+      hop range and conditions, with IN / NOT_IN values as frozensets,
+    - the optimized evaluation plan of every scenario (`rule_index.optimize_plan()`).
+
+The artifact is a `marshal` file named after the SHA-256 of the source file
+(`rules_<hash>.bin`), so it is found without trusting mtimes and an edited
+`rules.json` is recompiled automatically on the next load. It holds plain data
+only and records its format and Python version; a mismatch triggers a rebuild.
+
+Opt-out: set AMLCLAW_RULES_CACHE=false (rules are still compiled in memory).
+Location: AMLCLAW_RULES_CACHE_DIR, else `rules/` under AMLCLAW_GRAPH_CACHE_DIR, else
+`cache/rules/` under the screening's graph directory (default: ./graph_data).
+
+Usage:
+    python3 scripts/compiled_rules.py rules.json
+    python3 scripts/compiled_rules.py rules.json --cache-dir /var/cache/amlclaw --no-validate
+"""
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import sys
+from datetime import datetime
+
+from extract_risk_paths import SCENARIO_CATEGORIES
+from rule_index import optimize_plan, rule_spec
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RULE_GENERATOR_SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(SCRIPT_DIR)), "aml-rule-generator", "scripts")
+
+# Bump when the artifact layout changes; older artifacts are recompiled
+ARTIFACT_FORMAT = 2
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("AMLCLAW_RULES_CACHE", "").lower() != "false"
+
+
+def default_cache_dir(graph_dir=None) -> str:
+    """Artifact directory next to the other screening caches of `graph_dir` (default: ./graph_data)."""
+    if os.getenv("AMLCLAW_RULES_CACHE_DIR"):
+        return os.getenv("AMLCLAW_RULES_CACHE_DIR")
+    if os.getenv("AMLCLAW_GRAPH_CACHE_DIR"):
+        return os.path.join(os.getenv("AMLCLAW_GRAPH_CACHE_DIR"), "rules")
+    return os.path.join(graph_dir or os.path.join(os.getcwd(), "graph_data"), "cache", "rules")
+
+
+class RulesValidator:
+    """Schema, rule_id and TrustIn label checks from `validate_rules.py`, loaded once."""
+
+    def __init__(self, validate_rules):
+        self.validate_rules = validate_rules
+        self.schema = validate_rules.SchemaIndex(validate_rules.load_json(validate_rules.SCHEMA_PATH))
+        self.primary, self.secondary = validate_rules.parse_trustin_labels(validate_rules.LABELS_PATH)
+
+    @classmethod
+    def load(cls):
+        """Validator from the sibling aml-rule-generator skill, or None when it is not installed."""
+        sys.path.insert(0, RULE_GENERATOR_SCRIPTS)
+        try:
+            import validate_rules
+        except ImportError:
+            return None
+        finally:
+            sys.path.pop(0)
+        if not os.path.exists(validate_rules.SCHEMA_PATH):
+            return None
+        return cls(validate_rules)
+
+    def errors(self, rules):
+        errors = self.validate_rules.validate_schema_structure(rules, self.schema)
+        if not errors:
+            errors.extend(self.validate_rules.validate_rule_id_uniqueness(rules))
+            errors.extend(self.validate_rules.validate_tag_values(rules, self.primary, self.secondary))
+        return errors
+
+
+class RuleList(list):
+    """A rule list carrying the node-level spec of each rule and its evaluation plan (read by `RuleIndex`)."""
+
+    def __init__(self, rules=(), specs=None, plan=None):
+        super().__init__(rules)
+        self.specs = tuple(rule_spec(r) for r in self) if specs is None else tuple(specs)
+        self.plan = optimize_plan(self.specs) if plan is None else plan
+
+
+class CompiledRules(RuleList):
+    """
+    All rules of a compiled file (usable wherever a rules list is expected),
+    with the per-scenario `RuleList`s and the source hash they were built from.
+    """
+
+    def __init__(self, rules, specs, scenarios, source_sha256="", plans=None, validated=False, errors=(),
+                 compiled_at=None):
+        plans = plans or {}
+        super().__init__(rules, specs, plans.get("all"))
+        self.scenario_indices = {name: tuple(indices) for name, indices in scenarios.items()}
+        self.scenarios = {
+            name: RuleList([rules[i] for i in indices], [self.specs[i] for i in indices], plans.get(name))
+            for name, indices in scenarios.items()
+        }
+        self.source_sha256 = source_sha256
+        self.version = source_sha256[:16]
+        self.validated = validated
+        self.errors = list(errors)
+        self.compiled_at = compiled_at
+
+    def for_scenario(self, scenario):
+        """Rules of one scenario (all rules for unknown scenarios, as `filter_rules_for_scenario()`)."""
+        return self.scenarios.get(scenario, self)
+
+
+def source_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def scenario_indices(rules):
+    """Positions of each scenario's rules (SCENARIO_CATEGORIES filter) in `rules`."""
+    indices = {}
+    for name, categories in SCENARIO_CATEGORIES.items():
+        indices[name] = tuple(i for i, r in enumerate(rules) if not categories or r.get("category") in categories)
+    return indices
+
+
+def compile_rules_data(raw: bytes, validator=None) -> CompiledRules:
+    """Parse, validate and compile the bytes of a rules file; raises ValueError if it is not a rule list."""
+    rules = json.loads(raw)
+    if not isinstance(rules, list):
+        raise ValueError("Root element must be a JSON array")
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule [{i}] is not a JSON object")
+
+    errors = validator.errors(rules) if validator is not None else []
+    return CompiledRules(rules, [rule_spec(r) for r in rules], scenario_indices(rules), source_hash(raw),
+                         validated=validator is not None, errors=errors,
+                         compiled_at=datetime.now().isoformat())
+
+
+def artifact_path(sha256: str, cache_dir=None, graph_dir=None) -> str:
+    return os.path.join(cache_dir or default_cache_dir(graph_dir), f"rules_{sha256[:32]}.bin")
+
+
+def _read_artifact(path, sha256, validate):
+    try:
+        with open(path, "rb") as f:
+            payload = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (not isinstance(payload, dict)
+            or payload.get("format") != ARTIFACT_FORMAT
+            or payload.get("python") != list(sys.version_info[:2])
+            or payload.get("source_sha256") != sha256
+            or (validate and not payload.get("validated"))):
+        return None
+    return CompiledRules(payload["rules"], payload["specs"], payload["scenarios"], sha256,
+                         plans=payload["plans"], validated=payload["validated"], errors=payload["errors"],
+                         compiled_at=payload["compiled_at"])
+
+
+def _write_artifact(compiled, path):
+    payload = {
+        "format": ARTIFACT_FORMAT,
+        "python": list(sys.version_info[:2]),
+        "source_sha256": compiled.source_sha256,
+        "compiled_at": compiled.compiled_at,
+        "validated": compiled.validated,
+        "errors": compiled.errors,
+        "rules": list(compiled),
+        "specs": compiled.specs,
+        "scenarios": compiled.scenario_indices,
+        "plans": {name: rules.plan for name, rules in compiled.scenarios.items()},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        marshal.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def compile_rules(rules_path, cache_dir=None, validate=True):
+    """Compile `rules_path` and write its artifact. Returns `(CompiledRules, artifact path)`."""
+    with open(rules_path, "rb") as f:
+        raw = f.read()
+    compiled = compile_rules_data(raw, RulesValidator.load() if validate else None)
+    path = artifact_path(compiled.source_sha256, cache_dir)
+    _write_artifact(compiled, path)
+    return compiled, path
+
+
+def load_compiled_rules(rules_path, cache_dir=None, validate=True, graph_dir=None):
+    """
+    Load `rules_path` through its compiled artifact, compiling (and storing the
+    artifact) when none exists for the file's current content. Without
+    `cache_dir` the artifact lives under `graph_dir` (see default_cache_dir()). Validation runs
+    only when compiling; its errors are printed to stderr once and kept in
+    `CompiledRules.errors`, but do not stop screening.
+    """
+    with open(rules_path, "rb") as f:
+        raw = f.read()
+    sha256 = source_hash(raw)
+    path = artifact_path(sha256, cache_dir, graph_dir)
+    if cache_enabled():
+        compiled = _read_artifact(path, sha256, validate)
+        if compiled is not None:
+            return compiled
+
+    compiled = compile_rules_data(raw, RulesValidator.load() if validate else None)
+    if compiled.errors:
+        print(f"Warning: {rules_path} has {len(compiled.errors)} validation error(s), "
+              f"first: {compiled.errors[0]}", file=sys.stderr)
+    if cache_enabled():
+        try:
+            _write_artifact(compiled, path)
+        except OSError:
+            pass  # Read-only cache location: keep the in-memory compilation
+    return compiled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate rules.json once and write its compiled artifact.")
+    parser.add_argument("rules", nargs="?", default="rules.json", help="Path to rules.json (default: ./rules.json).")
+    parser.add_argument("--cache-dir", help="Artifact directory (default: AMLCLAW_RULES_CACHE_DIR, AMLCLAW_GRAPH_CACHE_DIR/rules "
+                                            "or ./graph_data/cache/rules)")
+    parser.add_argument("--no-validate", action="store_true", help="Skip schema/label validation")
+    args = parser.parse_args()
+
+    try:
+        compiled, path = compile_rules(args.rules, cache_dir=args.cache_dir, validate=not args.no_validate)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"status": "failed", "error": str(e)}))
+        sys.exit(1)
+
+    print(json.dumps({
+        "status": "failed" if compiled.errors else "success",
+        "artifact": path,
+        "version": compiled.version,
+        "rules": len(compiled),
+        "scenarios": {name: len(rules) for name, rules in compiled.scenarios.items()},
+        "validated": compiled.validated,
+        "errors": compiled.errors,
+    }, ensure_ascii=False))
+    if compiled.errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
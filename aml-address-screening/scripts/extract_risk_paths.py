@@ -8,11 +8,31 @@ Supports scenario-based filtering: only applies rules matching the business scen
 Outputs a deduplicated, LLM-friendly `risk_paths_*.json` for report generation.
 """
 import argparse
+import heapq
 import json
+import multiprocessing
 import os
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from artifact_io import FORMATS, artifact_stem, load_artifact, save_artifact
+from flow_exposure import FlowExposure
+from graph_table import CompactPath, NodeTable, amount_value, prioritize_tag
+from rule_index import RuleIndex, tag_contains
+
+
+# Evidence paths kept per risk entity (see DESIGN.md §3.5)
+MAX_EVIDENCE_PATHS = 3
+
+# Extraction engines: "python" (reference) or "numpy" (vector_engine.py, falls back to python without NumPy)
+ENGINES = ("python", "numpy")
+
+# --workers: paths per shard (fewer paths run serially) and shards queued per worker
+MIN_PATHS_PER_SHARD = 1000
+SHARDS_PER_WORKER = 4
 
 # ---------------------------------------------------------------------------
 # Scenario → Category mapping
@@ -45,20 +65,8 @@ def load_rules(rules_path: str):
 
 
 def load_graph(graph_path: str):
-    with open(graph_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def prioritize_tag(tags):
-    """Return the tag dict with the lowest `priority` value."""
-    if not tags:
-        return None
-    def pr(tag):
-        try:
-            return int(tag.get("priority", 9999))
-        except Exception:
-            return 9999
-    return min(tags, key=pr)
+    """Load a raw graph file in any artifact format (JSON, NDJSON, gzip / xz; see artifact_io.py)."""
+    return load_artifact(graph_path)
 
 
 # ---------------------------------------------------------------------------
@@ -108,6 +116,8 @@ def eval_condition(cond, node_tag, node_deep):
             return actual != value
         elif op == "NOT_IN":
             return actual not in value
+        elif op == "CONTAINS":
+            return tag_contains(actual, value)
         return False
 
     if param == "path.node.tags.secondary_category":
@@ -122,6 +132,8 @@ def eval_condition(cond, node_tag, node_deep):
             return actual != value
         elif op == "NOT_IN":
             return actual not in value
+        elif op == "CONTAINS":
+            return tag_contains(actual, value)
         return False
 
     if param == "path.node.tags.risk_level":
@@ -134,6 +146,8 @@ def eval_condition(cond, node_tag, node_deep):
             return actual != value
         elif op == "IN":
             return actual in value
+        elif op == "CONTAINS":
+            return tag_contains(actual, value)
         return False
 
     return None
@@ -166,6 +180,8 @@ def eval_target_condition(cond, target_tag):
             return actual != value
         elif op == "NOT_IN":
             return actual not in value
+        elif op == "CONTAINS":
+            return tag_contains(actual, value)
         return False
 
     if param == "target.tags.secondary_category":
@@ -180,6 +196,8 @@ def eval_target_condition(cond, target_tag):
             return actual != value
         elif op == "NOT_IN":
             return actual not in value
+        elif op == "CONTAINS":
+            return tag_contains(actual, value)
         return False
 
     if param == "target.tags.risk_level":
@@ -192,6 +210,8 @@ def eval_target_condition(cond, target_tag):
             return actual != value
         elif op == "IN":
             return actual in value
+        elif op == "CONTAINS":
+            return tag_contains(actual, value)
         return False
 
     return None
@@ -365,87 +385,123 @@ def compute_true_deep(node_index, num_nodes, path_dir, raw_deep):
         return node_index
 
 
-def extract_risk_paths(graph_data, rules, max_depth=5, scenario="all"):
-    """
-    Core extraction: walk every path, compute true hop distances,
-    match nodes against rules, deduplicate by address.
-    Supports scenario-based category filtering and path direction filtering.
-    """
-    data = graph_data.get("graph_data", {}).get("data", {})
-    target_address = graph_data.get("address", "")
-
-    # --- Scenario: filter rules by category ---
+def filter_rules_for_scenario(rules, scenario="all"):
+    """Return the rules whose category applies to the scenario (all rules for `all`)."""
+    compiled = getattr(rules, "scenarios", None)  # CompiledRules: lists built at compile time
+    if compiled is not None and scenario in compiled:
+        return compiled[scenario]
     categories = SCENARIO_CATEGORIES.get(scenario)
-    rules_total_loaded = len(rules)
     if categories:
-        rules = [r for r in rules if r.get("category") in categories]
-    rules_after_filter = len(rules)
+        return [r for r in rules if r.get("category") in categories]
+    return rules
 
-    # --- Scenario: determine allowed path directions ---
-    allowed_dirs = SCENARIO_PATH_FILTER.get(scenario)
-
-    # --- Target self-tag evaluation ---
-    target_tags_raw = data.get("tags", [])
-    target_findings = evaluate_target_rules(rules, target_tags_raw)
-    target_self_matched_rules = set()
-    for tf in target_findings:
-        target_self_matched_rules.update(tf["matched_rules"])
-
-    # --- Path traversal ---
-    findings = {}  # address -> { tag, deep_min, matched_rules: set, evidence_paths: [], occurrences }
 
-    all_paths = data.get("paths", [])
-    paths_direction_filtered = 0
+class ExtractionState:
+    """
+    What an in-memory extraction built and later stages reuse instead of
+    rebuilding (see verdict_engine.GraphFacts).
+    """
 
-    for path_idx, path in enumerate(all_paths):
-        nodes = path.get("path", [])
-        path_dir = path.get("direction", -1)
+    __slots__ = ("nodes", "paths", "exposure")
 
-        if not nodes:
-            continue
+    def __init__(self, nodes, paths, exposure):
+        self.nodes = nodes  # NodeTable
+        self.paths = paths  # [(path index, CompactPath)] of the scenario's directions
+        self.exposure = exposure  # FlowExposure
 
-        # Filter paths by scenario direction
-        if allowed_dirs and path_dir not in allowed_dirs:
-            paths_direction_filtered += 1
-            continue
 
-        num_nodes = len(nodes)
+class RiskPathAccumulator:
+    """
+    Incremental core of `extract_risk_paths()`: paths are fed one at a time via
+    `add_path()`, so callers can stream them without holding the whole graph.
+    Nodes are interned into a `NodeTable`, so memory is bounded by the unique
+    nodes and findings, not by the number of paths (unless `keep_paths`
+    retains the normalized paths for `compact_paths()`).
+    """
 
-        for node_idx, node in enumerate(nodes):
-            addr = node.get("address", "")
+    def __init__(self, rules, target_address="", max_depth=5, scenario="all", keep_paths=False):
+        self.target_address = target_address
+        self.max_depth = max_depth
+        self.allowed_dirs = SCENARIO_PATH_FILTER.get(scenario)
+        # --- Compile node-level rules once (direction/hop/category index) ---
+        self.rule_index = RuleIndex(rules)
+        self.nodes = NodeTable()
+        self.node_matches = {}  # (node id, path_dir, deep) -> matched rule ids
+        self.findings = {}  # address -> { tag, deep_min, matched_rules: set, evidence_paths: heap, occurrences }
+        self.total_paths = 0
+        self.paths_direction_filtered = 0
+        self.nodes_visited = 0
+        self._kept_paths = [] if keep_paths else None
+
+    @property
+    def rule_evaluations(self):
+        """Unique (node, direction, hop) keys matched against the rule index."""
+        return len(self.node_matches)
+
+    def compact_paths(self):
+        """`(path index, CompactPath)` of every matched path, or None without `keep_paths`."""
+        return self._kept_paths
+
+    def add_paths(self, paths):
+        """Match a whole in-memory path list (path indices = list positions)."""
+        for path_idx, path in enumerate(paths):
+            self.add_path(path_idx, path)
+
+    def add_path(self, path_idx, path):
+        """Normalize one raw path into the node table and match it."""
+        self.add_compact_path(path_idx, CompactPath.from_path(path, self.nodes))
+
+    def add_compact_path(self, path_idx, path):
+        """Match every node of one path against the rule index and aggregate hits."""
+        self.total_paths += 1
+        path_dir = path.direction
+
+        if not path.nodes:
+            return
 
+        # Filter paths by scenario direction
+        if self.allowed_dirs and path_dir not in self.allowed_dirs:
+            self.paths_direction_filtered += 1
+            return
+        if self._kept_paths is not None:
+            self._kept_paths.append((path_idx, path))
+
+        num_nodes = len(path.nodes)
+        self.nodes_visited += num_nodes
+        findings = self.findings
+        table = self.nodes
+        node_matches = self.node_matches
+
+        for node_idx, node_id in enumerate(path.nodes):
             # Skip the target address itself — it's the investigation subject
-            if addr == target_address:
+            if table.addresses[node_id] == self.target_address:
                 continue
 
-            raw_deep = node.get("deep")
-            true_deep = compute_true_deep(node_idx, num_nodes, path_dir, raw_deep)
-
-            if true_deep is None or true_deep < 1 or true_deep > max_depth:
-                continue
+            true_deep = compute_true_deep(node_idx, num_nodes, path_dir, None)
 
-            tag = prioritize_tag(node.get("tags", []))
-            if not tag:
+            if true_deep is None or true_deep < 1 or true_deep > self.max_depth:
                 continue
 
-            # Match rules (check direction + hop range, then node-level conditions)
-            matched_rule_ids = []
-            for rule in rules:
-                if not rule_applies_to_context(rule, path_dir, true_deep):
-                    continue
-                if rule_matches_node(rule, tag, true_deep):
-                    matched_rule_ids.append(rule.get("rule_id"))
+            # Each unique (node, direction, hop) is evaluated once
+            key = (node_id, path_dir, true_deep)
+            matched_rule_ids = node_matches.get(key)
+            if matched_rule_ids is None:
+                tag = table.best_tags[node_id]
+                if not tag:
+                    matched_rule_ids = ()
+                else:
+                    # Match rules (direction + hop range, then node-level conditions) via the index
+                    matched_rule_ids = self.rule_index.match(path_dir, true_deep, tag)
+                node_matches[key] = matched_rule_ids
 
             if not matched_rule_ids:
                 continue
 
-            # Build evidence path string
-            evidence = format_evidence_path(nodes, node_idx, path_dir)
-
             # Aggregate into findings dict
-            key = addr
-            if key not in findings:
-                findings[key] = {
+            addr = table.addresses[node_id]
+            if addr not in findings:
+                tag = table.best_tags[node_id]
+                findings[addr] = {
                     "address": addr,
                     "min_deep": true_deep,
                     "tag": {
@@ -460,26 +516,68 @@ def extract_risk_paths(graph_data, rules, max_depth=5, scenario="all"):
                     "occurrences": 0,
                 }
 
-            entry = findings[key]
+            entry = findings[addr]
             entry["matched_rules"].update(matched_rule_ids)
             entry["min_deep"] = min(entry["min_deep"], true_deep)
             entry["occurrences"] += 1
 
-            # Keep evidence paths but cap per entity to avoid explosion
-            if len(entry["evidence_paths"]) < 3:
-                entry["evidence_paths"].append({
-                    "path_index": path_idx,
-                    "deep": true_deep,
-                    "flow": evidence,
+            # Keep the K most relevant evidence paths in a bounded heap whose
+            # root is the weakest candidate; strings are built in entities()
+            heap = entry["evidence_paths"]
+            if len(heap) < MAX_EVIDENCE_PATHS:
+                heapq.heappush(heap, (-true_deep, amount_value(path.hop_amount(node_idx)),
+                                      -path_idx, node_idx, path))
+            elif -true_deep >= heap[0][0]:
+                candidate = (-true_deep, amount_value(path.hop_amount(node_idx)), -path_idx, node_idx, path)
+                if candidate > heap[0]:
+                    heapq.heapreplace(heap, candidate)
+
+    def entities(self):
+        """
+        Findings as a list (insertion order preserved) with sorted matched_rules
+        and evidence formatted best first: shortest hop, then largest amount,
+        then earliest path.
+        """
+        result = self.partial_entities()
+        for f in result:
+            f["matched_rules"] = sorted(f["matched_rules"])
+            f["evidence_paths"] = [candidate[-1] for candidate in f["evidence_paths"]]
+        return result
+
+    def partial_entities(self):
+        """
+        Findings for merging shards (see `merge_partial_entities()`): matched_rules
+        stay a set and evidence_paths are ranked `(deep, -amount, path_index, evidence)`
+        candidates, best first.
+        """
+        result = []
+        table = self.nodes
+        for f in self.findings.values():
+            f["evidence_paths"] = [
+                (-neg_deep, -amount, -neg_path_idx, {
+                    "path_index": -neg_path_idx,
+                    "deep": -neg_deep,
+                    "flow": path.format_evidence(table, node_idx),
                 })
+                for neg_deep, amount, neg_path_idx, node_idx, path in sorted(f["evidence_paths"], reverse=True)
+            ]
+            result.append(f)
+        return result
 
-    # Convert sets to sorted lists and sort findings by severity
-    severity_order = {"severe": 0, "high": 1, "medium": 2, "low": 3}
-    result = []
-    for f in findings.values():
-        f["matched_rules"] = sorted(f["matched_rules"])
-        result.append(f)
 
+def summarize_findings(result, rules, rules_total_loaded, scenario, total_paths,
+                       paths_direction_filtered, target_findings, exposure=None):
+    """
+    Sort risk entities by severity and build the `summary` block.
+    `exposure` (a FlowExposure) adds the flow-weighted `exposure` per direction and category.
+    """
+    categories = SCENARIO_CATEGORIES.get(scenario)
+    target_self_matched_rules = set()
+    for tf in target_findings:
+        target_self_matched_rules.update(tf["matched_rules"])
+
+    # Sort findings by severity
+    severity_order = {"severe": 0, "high": 1, "medium": 2, "low": 3}
     result.sort(key=lambda x: (
         severity_order.get(x["tag"].get("risk_level", "low"), 3),
         x["min_deep"],
@@ -510,49 +608,342 @@ def extract_risk_paths(graph_data, rules, max_depth=5, scenario="all"):
     summary = {
         "scenario": scenario,
         "categories_applied": categories if categories else ["ALL"],
-        "total_paths_analyzed": len(all_paths),
+        "total_paths_analyzed": total_paths,
         "paths_direction_filtered": paths_direction_filtered,
         "unique_risk_entities": len(result),
-        "rules_loaded": rules_after_filter,
+        "rules_loaded": len(rules),
         "rules_total_available": rules_total_loaded,
         "rules_triggered": sorted(all_triggered),
         "highest_severity": highest_severity,
     }
+    if exposure is not None:
+        summary["exposure"] = exposure.exposure()
+    return summary
+
+
+def make_accumulator(rules, target_address="", max_depth=5, scenario="all", engine="python", workers=1,
+                     keep_paths=False):
+    """
+    Path accumulator for the chosen engine. `engine="numpy"` uses the vectorized
+    `VectorizedAccumulator` and falls back to `RiskPathAccumulator` (with a
+    warning on stderr) when NumPy is not installed. `workers` > 1 shards the
+    paths across a process pool (`ShardedAccumulator`); 0 means one per CPU.
+    `keep_paths` lets the python engine return its normalized paths from `compact_paths()`.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine '{engine}' (choose from {', '.join(ENGINES)})")
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1:
+        return ShardedAccumulator(rules, target_address, max_depth, scenario, engine, workers)
+    if engine == "numpy":
+        try:
+            from vector_engine import VectorizedAccumulator
+        except ImportError:
+            print("Warning: NumPy is not installed, using the python extraction engine.", file=sys.stderr)
+        else:
+            return VectorizedAccumulator(rules, target_address, max_depth,
+                                         allowed_dirs=SCENARIO_PATH_FILTER.get(scenario),
+                                         max_evidence=MAX_EVIDENCE_PATHS)
+    return RiskPathAccumulator(rules, target_address, max_depth, scenario, keep_paths)
+
+
+# ---------------------------------------------------------------------------
+# Multi-process sharding (--workers)
+# ---------------------------------------------------------------------------
+_worker_paths = None  # Pool worker only: the path list its pool was created for (see _init_worker())
+
+
+def _pool_context():
+    """
+    Fork where available so workers inherit the graph instead of receiving pickled
+    paths, but only from a single-threaded process (forking while other threads
+    hold locks is unsafe, e.g. in the daemon); otherwise forkserver or the default.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and sys.platform != "darwin" and threading.active_count() == 1:
+        return multiprocessing.get_context("fork")
+    if "forkserver" in methods:
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+def _init_worker(paths):
+    """Pool initializer: bind the pool's path list in the (forked) worker, where it is inherited, not pickled."""
+    global _worker_paths
+    _worker_paths = paths
+
+
+def _shard_bounds(num_paths, workers):
+    """Contiguous `(start, end)` path ranges, or None when the graph is too small to shard."""
+    shards = min(workers * SHARDS_PER_WORKER, num_paths // MIN_PATHS_PER_SHARD)
+    if shards < 2:
+        return None
+    step = -(-num_paths // shards)
+    return [(start, min(start + step, num_paths)) for start in range(0, num_paths, step)]
+
+
+def _extract_shard(task):
+    """Process-pool worker: match one contiguous shard of paths and return its partial findings."""
+    rules, target_address, max_depth, scenario, engine, start, end, paths = task
+    if paths is None:
+        paths = _worker_paths[start:end]
+    accumulator = make_accumulator(rules, target_address, max_depth, scenario, engine)
+    for offset, path in enumerate(paths):
+        accumulator.add_path(start + offset, path)
+    return (accumulator.partial_entities(), accumulator.paths_direction_filtered,
+            accumulator.nodes_visited, accumulator.rule_evaluations)
+
+
+class ShardedAccumulator:
+    """
+    Accumulator interface over a process pool: consecutive paths are cut into
+    shards, each worker builds partial findings for its shard, and the partials
+    are merged in shard order. Since shards are contiguous and every shard keeps
+    its own top-K evidence, the merged result is identical to a serial pass.
 
+    `rule_evaluations` is summed per shard (a node seen in several shards is
+    counted once per shard).
+    """
+
+    def __init__(self, rules, target_address="", max_depth=5, scenario="all", engine="python", workers=2):
+        self.shard_args = (rules, target_address, max_depth, scenario, engine)
+        self.workers = workers
+        self.paths_direction_filtered = 0
+        self.nodes_visited = 0
+        self.rule_evaluations = 0
+        self.findings = {}  # address -> merged partial entry (see partial_entities())
+        self._pool = None
+        self._pending = deque()
+        self._chunk = []
+        self._chunk_start = 0
+
+    def add_paths(self, paths):
+        """
+        Shard an in-memory path list (path indices = list positions). Forked
+        workers get the list through their own pool's initializer; otherwise
+        each task carries its shard.
+        """
+        bounds = _shard_bounds(len(paths), self.workers)
+        if bounds is None:
+            self._add_shard(_extract_shard(self.shard_args + (0, len(paths), paths)))
+            return
+        context = _pool_context()
+        inherit = context.get_start_method() == "fork"
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                         initializer=_init_worker if inherit else None,
+                                         initargs=(paths,) if inherit else ())
+        for start, end in bounds:
+            self._submit(self.shard_args + (start, end, None if inherit else paths[start:end]))
+        self._drain()
+
+    def add_path(self, path_idx, path):
+        """Buffer one path (consecutive indices); full shards are sent to the pool."""
+        if not self._chunk:
+            self._chunk_start = path_idx
+        self._chunk.append(path)
+        if len(self._chunk) >= MIN_PATHS_PER_SHARD:
+            self._submit_chunk()
+
+    def _submit_chunk(self):
+        chunk, self._chunk = self._chunk, []
+        task = self.shard_args + (self._chunk_start, self._chunk_start + len(chunk), chunk)
+        if self._pool is None and not self._pending and chunk and len(chunk) < MIN_PATHS_PER_SHARD:
+            self._add_shard(_extract_shard(task))  # Small trailing (or only) shard: no pool needed
+        else:
+            self._submit(task)
+
+    def _submit(self, task):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+        self._pending.append(self._pool.submit(_extract_shard, task))
+        # Bound memory: wait for the oldest shard once enough are queued
+        while len(self._pending) > self.workers * SHARDS_PER_WORKER:
+            self._add_shard(self._pending.popleft().result())
+
+    def _drain(self):
+        try:
+            while self._pending:
+                self._add_shard(self._pending.popleft().result())
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+            self._pending.clear()
+
+    def _add_shard(self, shard):
+        partial, paths_direction_filtered, nodes_visited, rule_evaluations = shard
+        self.paths_direction_filtered += paths_direction_filtered
+        self.nodes_visited += nodes_visited
+        self.rule_evaluations += rule_evaluations
+        findings = self.findings
+        for f in partial:
+            entry = findings.get(f["address"])
+            if entry is None:
+                findings[f["address"]] = f
+                continue
+            entry["min_deep"] = min(entry["min_deep"], f["min_deep"])
+            entry["matched_rules"] |= f["matched_rules"]
+            entry["evidence_paths"] = sorted(entry["evidence_paths"] + f["evidence_paths"],
+                                             key=lambda candidate: candidate[:3])[:MAX_EVIDENCE_PATHS]
+            entry["occurrences"] += f["occurrences"]
+
+    def compact_paths(self):
+        """None: the normalized paths stay in the workers."""
+        return None
+
+    def entities(self):
+        """Merged findings, identical to a serial `RiskPathAccumulator.entities()`."""
+        if self._chunk:
+            self._submit_chunk()
+        self._drain()
+        result = []
+        for f in self.findings.values():
+            f["matched_rules"] = sorted(f["matched_rules"])
+            f["evidence_paths"] = [candidate[-1] for candidate in f["evidence_paths"]]
+            result.append(f)
+        return result
+
+
+def _record_accumulator_metrics(metrics, accumulator):
+    if metrics is not None:
+        metrics.add("nodes_visited", accumulator.nodes_visited)
+        metrics.add("rule_evaluations", accumulator.rule_evaluations)
+
+
+def extract_risk_paths(graph_data, rules, max_depth=5, scenario="all", metrics=None, engine="python",
+                       workers=1, return_state=False):
+    """
+    Core extraction: walk every path, compute true hop distances,
+    match nodes against rules, deduplicate by address.
+    Supports scenario-based category filtering and path direction filtering.
+    The summary carries the flow-weighted risk exposure (flow_exposure.py).
+    `metrics` (a ScreeningMetrics) receives node visit and rule evaluation counts.
+    `engine` selects the matching engine (see ENGINES) and `workers` > 1 shards
+    the paths across processes; every combination returns identical results.
+    With `return_state`, an `ExtractionState` (node table, normalized paths and
+    exposure, e.g. for `evaluate_verdict()`) is returned as a fifth element.
+    """
+    data = graph_data.get("graph_data", {}).get("data", {})
+    target_address = graph_data.get("address", "")
+
+    # --- Scenario: filter rules by category ---
+    rules_total_loaded = len(rules)
+    rules = filter_rules_for_scenario(rules, scenario)
+
+    # --- Target self-tag evaluation ---
+    target_tags_raw = data.get("tags", [])
+    target_findings = evaluate_target_rules(rules, target_tags_raw)
+
+    # --- Path traversal ---
+    accumulator = make_accumulator(rules, target_address, max_depth, scenario, engine, workers, return_state)
+    all_paths = data.get("paths", [])
+    accumulator.add_paths(all_paths)
+    exposure = FlowExposure(target_address, max_depth, SCENARIO_PATH_FILTER.get(scenario))
+    exposure.set_reported_totals(data)
+    exposure.add_paths(all_paths)
+
+    result = accumulator.entities()
+    summary = summarize_findings(result, rules, rules_total_loaded, scenario, len(all_paths),
+                                 accumulator.paths_direction_filtered, target_findings, exposure)
+    _record_accumulator_metrics(metrics, accumulator)
+
+    if return_state:
+        return result, summary, target_findings, target_tags_raw, _extraction_state(accumulator, all_paths,
+                                                                                    scenario, exposure)
     return result, summary, target_findings, target_tags_raw
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Extract risk-relevant paths within 1-5 hops.")
-    parser.add_argument("--graph", required=True, help="Path to raw_graph JSON file.")
-    parser.add_argument("--rules", default="rules.json", help="Path to rules.json (default: ./rules.json).")
-    parser.add_argument("--max-depth", type=int, default=5, help="Maximum hop depth to consider.")
-    parser.add_argument("--scenario", choices=list(SCENARIO_CATEGORIES.keys()), default="all",
-                        help="Business scenario filter (default: all).")
-    args = parser.parse_args()
+def _extraction_state(accumulator, paths, scenario, exposure):
+    compact = accumulator.compact_paths()
+    if compact is not None:
+        return ExtractionState(accumulator.nodes, compact, exposure)
+    # Sharded: normalize in this process (the workers' tables are gone)
+    nodes = NodeTable()
+    allowed_dirs = SCENARIO_PATH_FILTER.get(scenario)
+    compact = [(path_idx, CompactPath.from_path(path, nodes)) for path_idx, path in enumerate(paths)
+               if path.get("path") and not (allowed_dirs and path.get("direction", -1) not in allowed_dirs)]
+    return ExtractionState(nodes, compact, exposure)
 
-    if not os.path.isfile(args.graph):
-        print(json.dumps({"error": f"Graph file not found: {args.graph}"}))
-        sys.exit(1)
-    if not os.path.isfile(args.rules):
-        print(json.dumps({"error": f"Rules file not found: {args.rules}"}))
-        sys.exit(1)
 
-    graph = load_graph(args.graph)
-    rules = load_rules(args.rules)
+def extract_risk_paths_streaming(graph_path, rules, max_depth=5, scenario="all", metrics=None, engine="python",
+                                 workers=1, return_state=False, on_path=None):
+    """
+    Streaming variant of `extract_risk_paths()` for very large raw graph files.
+
+    Walks `graph_data.data.paths` one element at a time (see graph_stream.py) and
+    matches each path as it arrives (with `workers` > 1, each full shard of paths
+    goes to the process pool as soon as it is read). Returns the same tuple as
+    `extract_risk_paths()` plus the graph without its paths (top-level fields and
+    `graph_data`, whose `data.paths` is left empty). `on_path` (optional) is
+    called with each raw path as it is read; `return_state` appends an
+    `ExtractionState` as in `extract_risk_paths()`, which keeps the normalized paths.
+    """
+    from graph_stream import iter_graph_events, read_graph_header
+
+    rules_total_loaded = len(rules)
+    rules = filter_rules_for_scenario(rules, scenario)
+    allowed_dirs = SCENARIO_PATH_FILTER.get(scenario)
+
+    header = {}
+    graph_fields = {}
+    target_tags_raw = []
+    data_fields = {}
+    accumulator = exposure = None
+    nodes = compact = None  # Normalized paths kept here when the accumulator cannot return them
+    path_idx = 0
+    for kind, key, value in iter_graph_events(graph_path):
+        if kind == "field":
+            header[key] = value
+        elif kind == "graph_field":
+            graph_fields[key] = value
+        elif kind == "data_field":
+            if key == "tags":
+                target_tags_raw = value
+            data_fields[key] = value
+        elif kind == "path":
+            if accumulator is None:
+                if "address" not in header:
+                    # Non-fetch_graph layout: address stored after graph_data
+                    header.update(read_graph_header(graph_path))
+                accumulator = make_accumulator(rules, header.get("address", ""), max_depth, scenario, engine, workers,
+                                               return_state)
+                exposure = FlowExposure(header.get("address", ""), max_depth, allowed_dirs)
+                if return_state and accumulator.compact_paths() is None:
+                    nodes, compact = NodeTable(), []  # Sharded: the workers' tables are gone
+            accumulator.add_path(path_idx, value)
+            exposure.add_path(value)
+            if compact is not None and value.get("path") \
+                    and not (allowed_dirs and value.get("direction", -1) not in allowed_dirs):
+                compact.append((path_idx, CompactPath.from_path(value, nodes)))
+            if on_path is not None:
+                on_path(value)
+            path_idx += 1
+
+    if accumulator is None:
+        accumulator = make_accumulator(rules, header.get("address", ""), max_depth, scenario, engine, workers,
+                                       return_state)
+        exposure = FlowExposure(header.get("address", ""), max_depth, allowed_dirs)
+    exposure.set_reported_totals(data_fields)
+    if data_fields or path_idx:
+        graph_fields["data"] = dict(data_fields, paths=[])
+    header.setdefault("graph_data", graph_fields)
+
+    target_findings = evaluate_target_rules(rules, target_tags_raw)
+    result = accumulator.entities()
+    summary = summarize_findings(result, rules, rules_total_loaded, scenario, path_idx,
+                                 accumulator.paths_direction_filtered, target_findings, exposure)
+    _record_accumulator_metrics(metrics, accumulator)
 
-    risk_entities, summary, target_findings, target_tags_raw = extract_risk_paths(
-        graph, rules, max_depth=args.max_depth, scenario=args.scenario
-    )
+    if return_state:
+        if compact is None:
+            nodes, compact = accumulator.nodes, accumulator.compact_paths() or []
+        return result, summary, target_findings, target_tags_raw, header, ExtractionState(nodes, compact, exposure)
+    return result, summary, target_findings, target_tags_raw, header
 
-    # Prepare output path — reuse the same timestamp from the raw_graph filename
-    base_name = os.path.basename(args.graph)
-    stem = base_name.replace(".json", "").replace("raw_graph_", "")
-    out_name = f"risk_paths_{stem}.json"
-    out_dir = os.path.join(os.getcwd(), "graph_data")
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, out_name)
 
+def build_risk_paths_output(graph, scenario, risk_entities, summary, target_findings, target_tags_raw):
+    """Assemble the `risk_paths_*.json` document from extract_risk_paths() results."""
     # Build target block with self-tags and self-matched rules
     target_self_matched = set()
     target_tags_formatted = []
@@ -567,22 +958,96 @@ def main():
     for tf in target_findings:
         target_self_matched.update(tf["matched_rules"])
 
-    output = {
+    return {
         "target": {
             "chain": graph.get("chain", ""),
             "address": graph.get("address", ""),
             "tags": target_tags_formatted,
             "self_matched_rules": sorted(target_self_matched),
         },
-        "scenario": args.scenario,
+        "scenario": scenario,
         "summary": summary,
         "risk_entities": risk_entities,
     }
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+
+def save_risk_paths(output, graph_path=None, out_dir=None, fmt=None):
+    """
+    Write a risk_paths document next to its raw graph name and return the file path.
+    `fmt` is an artifact format (see artifact_io.FORMATS; default: AMLCLAW_RISK_PATHS_FORMAT or json).
+    """
+    if graph_path:
+        # Reuse the same timestamp from the raw_graph filename
+        stem = artifact_stem(graph_path)
+    else:
+        stem = f"{output['target']['address']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    out_dir = out_dir or os.path.join(os.getcwd(), "graph_data")
+    return save_artifact(output, "risk_paths", stem, out_dir, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract risk-relevant paths within 1-5 hops.")
+    parser.add_argument("--graph", required=True, help="Path to raw_graph file (any format, detected from content).")
+    parser.add_argument("--rules", default="rules.json", help="Path to rules.json (default: ./rules.json).")
+    parser.add_argument("--max-depth", type=int, default=5, help="Maximum hop depth to consider.")
+    parser.add_argument("--scenario", choices=list(SCENARIO_CATEGORIES.keys()), default="all",
+                        help="Business scenario filter (default: all).")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream graph_data.data.paths instead of loading the whole graph (large files).")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="Matching engine: python (default) or numpy (vectorized, needs NumPy).")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to shard paths across (default: 1, 0 = one per CPU).")
+    parser.add_argument("--output-format", choices=FORMATS, default=None,
+                        help="risk_paths file format (default: AMLCLAW_RISK_PATHS_FORMAT or json).")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.graph):
+        print(json.dumps({"error": f"Graph file not found: {args.graph}"}))
+        sys.exit(1)
+    if not os.path.isfile(args.rules):
+        print(json.dumps({"error": f"Rules file not found: {args.rules}"}))
+        sys.exit(1)
+
+    from compiled_rules import load_compiled_rules
+    from verdict_engine import GraphFacts, TargetTransfers, evaluate_verdict, verdict_enabled
+    rules = load_compiled_rules(args.rules)
+    with_verdict = verdict_enabled()
+
+    transfers = state = None
+    if args.stream:
+        transfers = TargetTransfers() if with_verdict else None
+        streamed = extract_risk_paths_streaming(
+            args.graph, rules, max_depth=args.max_depth, scenario=args.scenario, engine=args.engine,
+            workers=args.workers, return_state=with_verdict, on_path=transfers.add_path if transfers else None
+        )
+        risk_entities, summary, target_findings, target_tags_raw, graph = streamed[:5]
+        if with_verdict:
+            state = streamed[5]
+    else:
+        graph = load_graph(args.graph)
+        extracted = extract_risk_paths(
+            graph, rules, max_depth=args.max_depth, scenario=args.scenario, engine=args.engine,
+            workers=args.workers, return_state=with_verdict
+        )
+        risk_entities, summary, target_findings, target_tags_raw = extracted[:4]
+        if with_verdict:
+            state = extracted[4]
+
+    output = build_risk_paths_output(graph, args.scenario, risk_entities, summary, target_findings, target_tags_raw)
+    if with_verdict:
+        # Same block as run_screening.process_graph()
+        facts = GraphFacts(graph, args.max_depth, state, transfers=transfers)
+        output["verdict"] = evaluate_verdict(graph, rules, args.scenario, args.max_depth, facts=facts,
+                                             extracted_rules=summary["rules_triggered"])
+    out_path = save_risk_paths(output, args.graph, fmt=args.output_format)
+
+    from screening_index import record_safely
+    record_safely(None, "record_extraction", output, args.graph, out_path,
+                  rules_version=getattr(rules, "version", None))
+
     print(json.dumps({"status": "success", "output": out_path, "count": len(risk_entities),
-                       "scenario": args.scenario, "target_self_hits": len(target_self_matched)}))
+                       "scenario": args.scenario, "target_self_hits": len(output["target"]["self_matched_rules"])}))
 
 
 if __name__ == "__main__":
@@ -6,12 +6,15 @@ This script does NOT perform rule evaluation. It only fetches the data and saves
 to a JSON file for downstream LLM or system consumption.
 """
 import os
-import json
 import argparse
 from typing import Dict
 from datetime import datetime
 
+from artifact_io import FORMATS, save_artifact
 from trustin_api import TrustInAPI
+from polling import PollPolicy
+from reputation_store import record_graph_safely
+from screening_index import record_safely
 
 try:
     from dotenv import load_dotenv
@@ -19,49 +22,83 @@ try:
 except ImportError:
     pass
 
-def fetch_graph(chain: str, address: str, direction: str = "inflow", inflow_hops: int = 3, outflow_hops: int = 3, api_key: str = None, min_timestamp: int = None, max_timestamp: int = None, max_nodes_per_hop: int = 100) -> Dict:
-    """Fetches graph data for an address using TrustInAPI."""
-    start_time = datetime.now()
-    
-    # Apply defaults for timestamps (4 years ago and now) if not provided
+def default_time_window(start_time: datetime, min_timestamp: int = None, max_timestamp: int = None):
+    """Apply defaults for timestamps (4 years ago and now) if not provided."""
     if not max_timestamp:
         max_timestamp = int(start_time.timestamp() * 1000)
     if not min_timestamp:
         four_years_ago = start_time.timestamp() - (4 * 365 * 24 * 60 * 60)
         min_timestamp = int(four_years_ago * 1000)
+    return min_timestamp, max_timestamp
+
+
+def build_graph_response(chain: str, address: str, direction: str, inflow_hops: int, outflow_hops: int,
+                         max_nodes_per_hop: int, min_timestamp: int, max_timestamp: int,
+                         start_time: datetime, graph_data: Dict) -> Dict:
+    """Package the raw graph details returned by the API."""
+    return {
+        "chain": chain,
+        "address": address,
+        "direction": direction,
+        "hops_requested": {
+            "inflow": inflow_hops,
+            "outflow": outflow_hops
+        },
+        "parameters": {
+            "max_nodes_per_hop": max_nodes_per_hop,
+            "min_timestamp_ms": min_timestamp,
+            "max_timestamp_ms": max_timestamp
+        },
+        "timestamp": datetime.now().isoformat(),
+        "execution_time": str(datetime.now() - start_time),
+        "graph_data": graph_data # The raw parsed JSON graph
+    }
+
+
+def save_raw_graph(result: Dict, graph_dir: str = None, fmt: str = None) -> str:
+    """
+    Write a fetch_graph() result to graph_data/ and return the file path.
+    `fmt` is an artifact format (see artifact_io.FORMATS; default: AMLCLAW_RAW_GRAPH_FORMAT or json).
+    """
+    graph_dir = graph_dir or os.path.join(os.getcwd(), "graph_data")
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return save_artifact(result, "raw_graph", f"{result['address']}_{timestamp_str}", graph_dir, fmt)
+
+
+def fetch_graph(chain: str, address: str, direction: str = "inflow", inflow_hops: int = 3, outflow_hops: int = 3, api_key: str = None, min_timestamp: int = None, max_timestamp: int = None, max_nodes_per_hop: int = 100, poll_deadline: float = None, scenario: str = None, use_cache: bool = True, metrics=None, api: TrustInAPI = None) -> Dict:
+    """
+    Fetches graph data for an address using TrustInAPI (`metrics`: optional ScreeningMetrics).
+    Pass `api` to reuse a long-lived client (HTTP session, graph cache, latency hints);
+    `api_key`, `poll_deadline` and `use_cache` are then taken from that client.
+    Graphs fetched from TrustIn (not the cache) are recorded in the reputation store.
+    """
+    start_time = datetime.now()
+    min_timestamp, max_timestamp = default_time_window(start_time, min_timestamp, max_timestamp)
         
     try:
-        api = TrustInAPI(api_key=api_key)
+        if api is None:
+            poll_policy = PollPolicy(deadline=poll_deadline) if poll_deadline else None
+            api = TrustInAPI(api_key=api_key, poll_policy=poll_policy, use_cache=use_cache)
         # TrustIn API automatically uses async_detect underneath
         kwargs = {
             "inflow_hops": inflow_hops, 
             "outflow_hops": outflow_hops,
             "max_nodes_per_hop": max_nodes_per_hop,
             "min_timestamp": min_timestamp,
-            "max_timestamp": max_timestamp
+            "max_timestamp": max_timestamp,
+            "scenario": scenario  # Selects the graph cache TTL
         }
         
-        result = api.kya_pro_detect(chain, address, **kwargs)
+        result = api.kya_pro_detect(chain, address, metrics=metrics, **kwargs)
         
-        # Package the raw graph details returned by the API
-        response = {
-            "chain": chain,
-            "address": address,
-            "direction": direction,
-            "hops_requested": {
-                "inflow": inflow_hops,
-                "outflow": outflow_hops
-            },
-            "parameters": {
-                "max_nodes_per_hop": max_nodes_per_hop,
-                "min_timestamp_ms": min_timestamp,
-                "max_timestamp_ms": max_timestamp
-            },
-            "timestamp": datetime.now().isoformat(),
-            "execution_time": str(datetime.now() - start_time),
-            "graph_data": result.details # The raw parsed JSON graph
-        }
-        return response
+        graph = build_graph_response(
+            chain, address, direction, inflow_hops, outflow_hops, max_nodes_per_hop,
+            min_timestamp, max_timestamp, start_time, result.details
+        )
+        # Fresh TrustIn graphs feed the local reputation store (see reputation_store.py)
+        if not result.cached and not result.error:
+            record_graph_safely(graph)
+        return graph
         
     except Exception as e:
         print(f"[ERROR] Failed to fetch graph: {str(e)}")
@@ -80,6 +117,9 @@ def main():
     parser.add_argument("--min-timestamp", type=int, help="Min timestamp in milliseconds (default: 4 years ago)")
     parser.add_argument("--max-timestamp", type=int, help="Max timestamp in milliseconds (default: now)")
     parser.add_argument("--api-key", help="TrustIn API Key (optional if in env)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local graph cache")
+    parser.add_argument("--poll-deadline", type=float, help="Max seconds to wait for the TrustIn task (default: 60)")
+    parser.add_argument("--output-format", choices=FORMATS, help="Raw graph file format (default: AMLCLAW_RAW_GRAPH_FORMAT or json)")
     
     args = parser.parse_args()
     
@@ -95,21 +135,18 @@ def main():
         max_nodes_per_hop=args.max_nodes,
         api_key=args.api_key,
         min_timestamp=args.min_timestamp,
-        max_timestamp=args.max_timestamp
+        max_timestamp=args.max_timestamp,
+        poll_deadline=args.poll_deadline,
+        use_cache=not args.no_cache
     )
     
     if result and result.get("graph_data"):
         # Create directories in the current working directory
         reports_dir = os.path.join(os.getcwd(), "reports")
-        graph_dir = os.path.join(os.getcwd(), "graph_data")
         os.makedirs(reports_dir, exist_ok=True)
-        os.makedirs(graph_dir, exist_ok=True)
-        
-        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        json_path = os.path.join(graph_dir, f"raw_graph_{args.address}_{timestamp_str}.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-            
+        json_path = save_raw_graph(result, fmt=args.output_format)
+        record_safely(None, "record_fetch", result, json_path)
+
         print(f"\n✅ SUCCESS: Raw Graph JSON saved to: {json_path}")
         print(f"👉 Now hand over to the LLM Agent to evaluate against rules.json!")
     else:
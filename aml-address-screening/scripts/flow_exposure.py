@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+flow_exposure.py
+----------------
+Flow-weighted risk exposure: how much of the target's inflow (outflow) traces
+back to (ends up at) tagged entities, per risk category and direction, in USD
+and as a share of the target's flow.
+
+TrustIn paths enumerate the same transfers many times. The paths are folded
+into a layered flow graph instead: a node is an (address, hop) pair and each
+distinct transfer between hop d and hop d + 1 is one edge (the largest amount
+reported for it). One pass from the target outward then attributes the
+target's flow hop by hop:
+
+    flow(u)  = amount(target, u)                                     for hop 1 nodes
+    flow(u) += flow(v) * amount(v, u) / sum(amount(v, w) for all w)  for each edge of an untagged v
+
+A tagged node keeps the flow that reached it (funds are attributed to the
+first tagged entity on the way, so flow behind an exchange counts as the
+exchange's) and untraced ends count as clean. This is the usual
+proportional ("haircut") taint, evaluated from the target's side: every edge
+is visited once, so the cost is linear in distinct transfers rather than in
+enumerated paths.
+
+Shares are relative to the target's direction total: `inflow_total_amount` /
+`outflow_total_amount` when TrustIn reports them, else the sum of its hop 1
+transfers. A missing or non-numeric amount weighs 0 but is not taken as a
+zero transfer: every source whose share depends on it (reached over it, or
+split against it at a later hop) is marked inexact, and so is the total when
+it is a hop 1 amount and TrustIn reports no total.
+
+`exposure()` (the risk_paths `summary.exposure` block) aggregates per primary
+category; `amount_bounds()` sums the tags a rule's node conditions select as
+`(low, high)` (unbounded above once an inexact source is among them), which is
+how `verdict_engine.py` evaluates `path.risk_amount_usd` / `path.risk_percentage`.
+
+Usage:
+    python3 scripts/flow_exposure.py --graph graph_data/raw_graph_<addr>_<ts>.json
+    python3 scripts/flow_exposure.py --graph raw_graph.json --max-depth 3
+"""
+import argparse
+import json
+import os
+import sys
+
+from graph_table import prioritize_tag
+
+DIRECTION_NAMES = {-1: "inflow", 1: "outflow"}
+
+# Tag fields a source is keyed by (plus its hop)
+SOURCE_FIELDS = ("primary_category", "secondary_category", "risk_level")
+
+_SEVERITY_ORDER = {"severe": 0, "high": 1, "medium": 2, "low": 3}
+
+_ABSENT = object()
+
+
+def _edge_amount(raw):
+    """Numeric hop amount, or None when missing, non-numeric, NaN or negative."""
+    if raw is None or isinstance(raw, bool):
+        return None
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return None
+    return value if value == value and value >= 0 else None
+
+
+class FlowExposure:
+    """
+    Layered flow graph built path by path (`add_path()`, so it works while
+    streaming) and propagated once on first use.
+    """
+
+    def __init__(self, target_address="", max_depth=5, allowed_dirs=None):
+        self.target_address = target_address
+        self.max_depth = max_depth
+        self.allowed_dirs = allowed_dirs
+        self.reported_totals = {}  # direction -> TrustIn `<direction>_total_amount`
+        self._edges = {-1: {}, 1: {}}  # direction -> (near hop, near address, far address) -> amount or None
+        self._sources = {}  # address -> source key without hop, or None when untagged
+        self._exposure = None  # direction -> {source key (with hop): amount}
+        self._inexact = {}  # direction -> source keys whose amount depends on a missing amount
+        self._totals = {}  # direction -> sum of the target's hop 1 transfers
+        self._totals_exact = {}  # direction -> no hop 1 amount is missing
+
+    def set_reported_totals(self, data):
+        """Use TrustIn's `inflow_total_amount` / `outflow_total_amount` of a graph's `data` when present."""
+        for direction, name in DIRECTION_NAMES.items():
+            value = data.get(f"{name}_total_amount") if isinstance(data, dict) else None
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self.reported_totals[direction] = float(value)
+
+    def add_paths(self, paths):
+        for path in paths:
+            self.add_path(path)
+
+    def add_path(self, path):
+        """Fold one raw `{direction, path: [node, ...]}` entry into the edge set."""
+        direction = path.get("direction", -1)
+        edges = self._edges.get(direction)
+        nodes = path.get("path") or []
+        if edges is None or len(nodes) < 2 or (self.allowed_dirs and direction not in self.allowed_dirs):
+            return
+        self._exposure = None
+        sources = self._sources
+        addresses = [node.get("address", "") for node in nodes]
+        for node, address in zip(nodes, addresses):
+            if address not in sources:
+                sources[address] = self._source_of(node)
+        n = len(nodes)
+        # Position i and i + 1 are joined by the amount on node i + 1 (either direction)
+        for i in range(n - 1):
+            near_hop = n - 2 - i if direction == -1 else i
+            if near_hop >= self.max_depth:
+                continue
+            if direction == -1:
+                key = (near_hop, addresses[i + 1], addresses[i])
+            else:
+                key = (near_hop, addresses[i], addresses[i + 1])
+            amount = _edge_amount(nodes[i + 1].get("amount"))
+            current = edges.get(key, _ABSENT)
+            # A known amount of the same transfer (from another path) wins over a missing one
+            if current is _ABSENT or amount is not None and (current is None or amount > current):
+                edges[key] = amount
+
+    def _source_of(self, node):
+        if node.get("address", "") == self.target_address:
+            return None  # Flow cycling through the target is not the target's own exposure
+        tag = prioritize_tag(node.get("tags") or [])
+        if not tag:
+            return None
+        return tuple(tag.get(field, "") for field in SOURCE_FIELDS)
+
+    def _propagate(self):
+        exposure = {}
+        sources = self._sources
+        for direction, edges in self._edges.items():
+            # Each near node's edges to the next hop, grouped by the near node's hop
+            # (zero transfers carry nothing; missing amounts are kept as None)
+            by_hop = {}
+            for (near_hop, near, far), amount in edges.items():
+                if amount is None or amount > 0:
+                    by_hop.setdefault(near_hop, {}).setdefault(near, []).append((far, amount))
+            attributed = {}
+            inexact = set()
+            flow = {}  # untagged address at `hop` -> USD of the target's flow reaching it
+            uncertain = set()  # untagged addresses at `hop` whose flow depends on a missing amount
+            hop = 0
+            while hop in by_hop:
+                reached = {}
+                unsure = set()
+                for near, far_edges in by_hop[hop].items():
+                    known = [amount for _, amount in far_edges if amount is not None]
+                    if hop == 0:
+                        # The target's own transfers: only a missing one is itself unknown
+                        scale, shared = 1.0, False
+                    else:
+                        weight = flow.get(near, 0.0)
+                        shared = near in uncertain or len(known) < len(far_edges)
+                        if not weight and not shared:
+                            continue
+                        total = sum(known)
+                        scale = weight / total if total > 0 else 0.0
+                    for far, amount in far_edges:
+                        reached[far] = reached.get(far, 0.0) + (amount or 0.0) * scale
+                        if shared or amount is None:
+                            unsure.add(far)
+                hop += 1
+                flow, uncertain = {}, set()
+                for far, weight in reached.items():
+                    source = sources.get(far)
+                    if source is None:
+                        flow[far] = weight
+                        if far in unsure:
+                            uncertain.add(far)
+                    else:
+                        key = source + (hop,)
+                        attributed[key] = attributed.get(key, 0.0) + weight
+                        if far in unsure:
+                            inexact.add(key)
+            exposure[direction] = attributed
+            self._inexact[direction] = inexact
+            hop1 = [amount for far_edges in by_hop.get(0, {}).values() for _, amount in far_edges]
+            self._totals[direction] = sum(amount for amount in hop1 if amount is not None)
+            self._totals_exact[direction] = None not in hop1
+        self._exposure = exposure
+
+    def total(self, direction):
+        """The target's total flow in `direction` (reported, else the sum of its hop 1 transfers)."""
+        if direction in self.reported_totals:
+            return self.reported_totals[direction]
+        if self._exposure is None:
+            self._propagate()
+        return self._totals.get(direction, 0.0)
+
+    def total_exact(self, direction):
+        """Whether `total(direction)` is exact (reported, or no hop 1 amount is missing)."""
+        if direction in self.reported_totals:
+            return True
+        if self._exposure is None:
+            self._propagate()
+        return self._totals_exact.get(direction, True)
+
+    def sources(self, direction):
+        """`{(primary, secondary, risk_level, hop): USD}` exposure of the target in `direction`."""
+        if self._exposure is None:
+            self._propagate()
+        return self._exposure.get(direction, {})
+
+    def inexact(self, direction):
+        """Source keys of `sources(direction)` whose USD depends on a missing amount (a lower bound)."""
+        if self._exposure is None:
+            self._propagate()
+        return self._inexact.get(direction, set())
+
+    def amount(self, direction, match=None, min_hops=None, max_hops=None):
+        """
+        USD of the target's `direction` flow attributed to tags for which
+        `match(tag_dict)` holds, at hops within `[min_hops, max_hops]`.
+        """
+        return self.amount_bounds(direction, match, min_hops, max_hops)[0]
+
+    def amount_bounds(self, direction, match=None, min_hops=None, max_hops=None):
+        """
+        `amount()` as `(low, high)`: exact unless an inexact source is selected,
+        in which case its amount is only a lower bound and `high` is infinite.
+        """
+        total, exact = 0.0, True
+        inexact = self.inexact(direction)
+        for key, value in self.sources(direction).items():
+            hop = key[-1]
+            if min_hops is not None and hop < min_hops or max_hops is not None and hop > max_hops:
+                continue
+            if match is None or match(dict(zip(SOURCE_FIELDS, key))):
+                total += value
+                exact = exact and key not in inexact
+        return (total, total) if exact else (total, float("inf"))
+
+    def percentage(self, direction, amount):
+        """`amount` as a percentage of the target's `direction` total (0 when there is no flow)."""
+        total = self.total(direction)
+        return min(amount / total * 100, 100.0) if total > 0 else 0.0
+
+    def percentage_bounds(self, direction, bounds):
+        """
+        `(low, high)` share of the `direction` total for amount `bounds`. An
+        inexact total is only a lower bound, so the share is then bounded below by 0.
+        """
+        low, high = bounds
+        total = self.total(direction)
+        if total <= 0:
+            return (0.0, 100.0) if high > 0 else (0.0, 0.0)
+        if not self.total_exact(direction):
+            return (0.0, self.percentage(direction, high))
+        return (self.percentage(direction, low), self.percentage(direction, high))
+
+    def exposure(self):
+        """
+        Per direction: `{"total_usd", "categories": [{"category", "risk_level",
+        "amount_usd", "percentage", "exact"}]}`, largest exposure first. `exact`
+        is false when the figures depend on a missing amount.
+        """
+        result = {}
+        for direction, name in DIRECTION_NAMES.items():
+            if self.allowed_dirs and direction not in self.allowed_dirs:
+                continue
+            categories = {}
+            inexact = self.inexact(direction)
+            total_exact = self.total_exact(direction)
+            for key, value in self.sources(direction).items():
+                primary, risk_level = key[0], key[2]
+                entry = categories.setdefault(primary, {"category": primary, "risk_level": risk_level,
+                                                        "amount": 0.0, "exact": total_exact})
+                entry["amount"] += value
+                entry["exact"] = entry["exact"] and key not in inexact
+                if _SEVERITY_ORDER.get(str(risk_level).lower(), 4) < _SEVERITY_ORDER.get(str(entry["risk_level"]).lower(), 4):
+                    entry["risk_level"] = risk_level
+            ranked = sorted(categories.values(), key=lambda entry: (-entry["amount"], entry["category"]))
+            result[name] = {
+                "total_usd": round(self.total(direction), 2),
+                "categories": [{
+                    "category": entry["category"],
+                    "risk_level": entry["risk_level"],
+                    "amount_usd": round(entry["amount"], 2),
+                    "percentage": round(self.percentage(direction, entry["amount"]), 2),
+                    "exact": entry["exact"],
+                } for entry in ranked],
+            }
+        return result
+
+
+def graph_exposure(graph, max_depth=5, allowed_dirs=None):
+    """FlowExposure of an in-memory raw graph."""
+    data = graph.get("graph_data", {}).get("data", {})
+    exposure = FlowExposure(graph.get("address", ""), max_depth, allowed_dirs)
+    if isinstance(data, dict):
+        exposure.set_reported_totals(data)
+        exposure.add_paths(data.get("paths") or [])
+    return exposure
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flow-weighted risk exposure of a raw graph per category and direction.")
+    parser.add_argument("--graph", required=True, help="Path to raw_graph file (any format, detected from content).")
+    parser.add_argument("--max-depth", type=int, default=5, help="Maximum hop depth to trace.")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.graph):
+        print(json.dumps({"status": "failed", "error": f"Graph file not found: {args.graph}"}))
+        sys.exit(1)
+    from artifact_io import load_artifact
+    exposure = graph_exposure(load_artifact(args.graph), args.max_depth)
+    print(json.dumps({"status": "success", **exposure.exposure()}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Content-addressed on-disk cache for TrustIn graph responses.
+
+Entries are keyed by a SHA-256 of the request that produced them:
+chain, address, inflow/outflow hops, max_nodes_per_hop and the time window
+rounded down to `window_ms` buckets (so "now"-anchored windows from repeated
+screenings of the same address share an entry).
+
+- Freshness: each read passes a TTL, chosen per scenario (`SCENARIO_TTLS`).
+- Size: total bytes are bounded by `max_bytes`; least-recently-used entries
+  (by file mtime, bumped on every hit) are evicted first.
+- Counters: `stats()` reports hits, misses, expirations, stores and evictions.
+
+Opt-out: set AMLCLAW_GRAPH_CACHE=false in .env.
+Location: AMLCLAW_GRAPH_CACHE_DIR (default: ./graph_data/cache).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# Freshness per business scenario (seconds). Gating decisions get the shortest TTLs.
+SCENARIO_TTLS = {
+    "onboarding": 6 * 3600,
+    "deposit":    3600,
+    "withdrawal": 900,
+    "cdd":        24 * 3600,
+    "monitoring": 6 * 3600,
+    "all":        3600,
+}
+DEFAULT_TTL = 3600
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_WINDOW_MS = 3600 * 1000
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("AMLCLAW_GRAPH_CACHE", "").lower() != "false"
+
+
+class GraphCache:
+    """Size-bounded LRU cache of TrustIn get_result responses on disk."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+                 window_ms: int = DEFAULT_WINDOW_MS, ttls: Optional[Dict[str, int]] = None):
+        self.cache_dir = (cache_dir or os.getenv("AMLCLAW_GRAPH_CACHE_DIR")
+                          or os.path.join(os.getcwd(), "graph_data", "cache"))
+        self.max_bytes = max_bytes
+        self.window_ms = window_ms
+        self.ttls = dict(SCENARIO_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def ttl_for(self, scenario: Optional[str]) -> int:
+        return self.ttls.get(scenario, DEFAULT_TTL)
+
+    def key(self, payload: Dict) -> str:
+        """Content address for a submit_task payload."""
+        def bucket(ts):
+            return ts // self.window_ms if isinstance(ts, int) else None
+
+        identity = {
+            "chain_name": payload.get("chain_name"),
+            "address": payload.get("address"),
+            "inflow_hops": payload.get("inflow_hops"),
+            "outflow_hops": payload.get("outflow_hops"),
+            "max_nodes_per_hop": payload.get("max_nodes_per_hop"),
+            "min_bucket": bucket(payload.get("min_timestamp")),
+            "max_bucket": bucket(payload.get("max_timestamp")),
+        }
+        canonical = json.dumps(identity, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, payload: Dict, ttl: Optional[int] = None) -> Optional[Dict]:
+        """Return the cached get_result response if present and younger than `ttl` seconds."""
+        path = self._path(self.key(payload))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        ttl = DEFAULT_TTL if ttl is None else ttl
+        if time.time() - entry.get("stored_at", 0) > ttl:
+            self._count("expired")
+            self._count("misses")
+            return None
+
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except OSError:
+            pass
+        self._count("hits")
+        return entry.get("response")
+
+    def put(self, payload: Dict, response: Dict) -> None:
+        """Store a successful get_result response and evict LRU entries over the size bound."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(self.key(payload))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        entry = {"stored_at": time.time(), "request": payload, "response": response}
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            return  # Caching is best-effort
+        self._count("stores")
+        self._evict()
+
+    def _entries(self):
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for e in it:
+                    if e.name.endswith(".json") and e.is_file():
+                        st = e.stat()
+                        yield e.path, st.st_size, st.st_mtime
+        except OSError:
+            return
+
+    def _evict(self) -> None:
+        entries = list(self._entries())
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self._count("evictions")
+
+    def stats(self) -> Dict:
+        entries = list(self._entries())
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = len(entries)
+        stats["bytes"] = sum(size for _, size, _ in entries)
+        return stats
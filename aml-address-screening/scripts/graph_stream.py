@@ -0,0 +1,205 @@
+"""
+graph_stream.py
+---------------
+Incremental reader for `raw_graph_*` files too large to `json.load()`.
+
+The file is read in fixed-size chunks and only one path element is decoded at
+a time, so memory is bounded by the largest single path instead of the whole
+graph. Events are yielded in file order:
+
+    ("field", key, value)        top-level fields (chain, address, parameters, ...)
+    ("graph_field", key, value)  graph_data fields other than `data` (code, msg, ...)
+    ("data_field", key, value)   graph_data.data fields other than `paths` (tags, ...)
+    ("path", None, path)         one element of graph_data.data.paths
+
+When `graph_data.data` is a stringified JSON document (a TrustIn quirk), it is
+decoded in memory as a whole; streaming only applies to object-valued data.
+
+Compressed and NDJSON artifacts (see artifact_io.py) are detected from their
+content. An NDJSON raw graph yields every header field first, then one path per
+line.
+"""
+
+import json
+
+from artifact_io import ITEMS_PATHS, NDJSON_KEY, open_artifact, read_ndjson, read_ndjson_header
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+_WHITESPACE = " \t\n\r"
+
+
+class JsonStreamReader:
+    """Pull-style JSON tokenizer over a text file object."""
+
+    def __init__(self, f, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Append the next chunk, dropping the consumed prefix. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found}' in JSON input")
+        self.pos += 1
+
+    def value(self):
+        """Decode and return the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def iter_object(self):
+        """Yield the keys of the next object; the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def iter_array(self):
+        """Yield once per element of the next array; the caller must consume each element."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _iter_data_events(data):
+    """Events for an in-memory graph_data.data object."""
+    for key, value in data.items():
+        if key == "paths" and isinstance(value, list):
+            for path in value:
+                yield "path", None, path
+        else:
+            yield "data_field", key, value
+
+
+def _iter_stream_data_events(reader):
+    if reader.peek() != "{":
+        data = reader.value()
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                pass
+        if isinstance(data, dict):
+            yield from _iter_data_events(data)
+        else:
+            yield "graph_field", "data", data
+        return
+
+    for key in reader.iter_object():
+        if key == "paths" and reader.peek() == "[":
+            for _ in reader.iter_array():
+                yield "path", None, reader.value()
+        else:
+            yield "data_field", key, reader.value()
+
+
+def _iter_ndjson_events(f, header):
+    if header[NDJSON_KEY].get("items") != list(ITEMS_PATHS["raw_graph"]):
+        yield from _iter_document_events(read_ndjson(f, header))
+        return
+    graph = header.get("graph_data")
+    for key, value in header.items():
+        if key not in (NDJSON_KEY, "graph_data"):
+            yield "field", key, value
+    for key, value in graph.items():
+        if key != "data":
+            yield "graph_field", key, value
+    for key, value in graph["data"].items():
+        if key != "paths":
+            yield "data_field", key, value
+    for line in f:
+        if line.strip():
+            yield "path", None, json.loads(line)
+
+
+def _iter_document_events(doc):
+    """Events for a whole in-memory raw graph document."""
+    for key, value in doc.items():
+        graph = value if key == "graph_data" and isinstance(value, dict) else None
+        if graph is None:
+            yield "field", key, value
+            continue
+        for graph_key, graph_value in graph.items():
+            if graph_key != "data":
+                yield "graph_field", graph_key, graph_value
+            elif isinstance(graph_value, dict):
+                yield from _iter_data_events(graph_value)
+            else:
+                yield "graph_field", graph_key, graph_value
+
+
+def iter_graph_events(graph_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream a raw graph file as (kind, key, value) events (see module docstring)."""
+    with open_artifact(graph_path) as f:
+        header = read_ndjson_header(f)
+        if header is not None:
+            yield from _iter_ndjson_events(f, header)
+            return
+        reader = JsonStreamReader(f, chunk_size)
+        for key in reader.iter_object():
+            if key != "graph_data" or reader.peek() != "{":
+                yield "field", key, reader.value()
+                continue
+            for graph_key in reader.iter_object():
+                if graph_key == "data":
+                    yield from _iter_stream_data_events(reader)
+                else:
+                    yield "graph_field", graph_key, reader.value()
+
+
+def read_graph_header(graph_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return the top-level fields of a raw graph file (graph_data excluded)."""
+    return {key: value for kind, key, value in iter_graph_events(graph_path, chunk_size) if kind == "field"}
@@ -0,0 +1,163 @@
+"""
+graph_table.py
+--------------
+Normalized in-memory form of TrustIn graph paths.
+
+TrustIn repeats the full node dict (address, tags, ...) in every path that
+passes through an address, so exchange-heavy graphs carry the same node many
+times. `NodeTable` interns each distinct node once and precomputes what
+extraction needs from it (prioritized tag, evidence label); `CompactPath`
+stores a path as a sequence of node ids plus the per-hop amounts.
+
+A node's identity is its address and its raw tag list: the same address
+reported with different tags in different paths gets separate node ids, so
+results stay identical to walking the raw dicts.
+"""
+
+import sys
+from array import array
+
+
+def prioritize_tag(tags):
+    """Return the tag dict with the lowest `priority` value."""
+    if not tags:
+        return None
+    def pr(tag):
+        try:
+            return int(tag.get("priority", 9999))
+        except Exception:
+            return 9999
+    return min(tags, key=pr)
+
+
+def _evidence_label(node, best_tag):
+    """`[address (label)]` fragment used by `format_evidence_path()`."""
+    addr = node.get("address", "Unknown")
+    label_str = ""
+    if best_tag:
+        lbl = (best_tag.get("quaternary_category")
+               or best_tag.get("tertiary_category")
+               or best_tag.get("secondary_category")
+               or best_tag.get("primary_category"))
+        if lbl:
+            label_str = f" ({lbl})"
+    return f"[{addr}{label_str}]"
+
+
+def amount_value(amount):
+    """Numeric hop amount for ranking (missing, non-numeric or NaN = 0)."""
+    try:
+        value = float(amount or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value == value else 0.0
+
+
+class NodeTable:
+    """Interned graph nodes with column-oriented fields (indexed by node id)."""
+
+    __slots__ = ("addresses", "tags", "best_tags", "labels", "_by_address")
+
+    def __init__(self):
+        self.addresses = []   # node id -> interned address ("" when missing)
+        self.tags = []        # node id -> raw tag list (identity check only)
+        self.best_tags = []   # node id -> prioritize_tag(tags) or None
+        self.labels = []      # node id -> evidence fragment "[addr (label)]"
+        self._by_address = {}  # address -> node id, or list of ids for tag variants
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def intern(self, node):
+        """Return the node id for a raw path node dict, adding it on first sight."""
+        addr = node.get("address", "")
+        tags = node.get("tags") or []
+        known = self._by_address.get(addr)
+        if known is not None:
+            if known.__class__ is int:
+                if self.tags[known] == tags:
+                    return known
+            else:
+                for node_id in known:
+                    if self.tags[node_id] == tags:
+                        return node_id
+        return self._add(node, addr, tags, known)
+
+    def intern_many(self, nodes):
+        """`intern()` over a list of raw node dicts (inlined fast path for already seen nodes)."""
+        by_address = self._by_address
+        known_tags = self.tags
+        ids = []
+        append = ids.append
+        for node in nodes:
+            known = by_address.get(node.get("address", ""))
+            if known.__class__ is int and known_tags[known] == (node.get("tags") or []):
+                append(known)
+            else:
+                append(self.intern(node))
+        return ids
+
+    def _add(self, node, addr, tags, known):
+        node_id = len(self.addresses)
+        if isinstance(addr, str):
+            addr = sys.intern(addr)
+        best_tag = prioritize_tag(tags)
+        self.addresses.append(addr)
+        self.tags.append(tags)
+        self.best_tags.append(best_tag)
+        self.labels.append(_evidence_label(node, best_tag))
+
+        if known is None:
+            self._by_address[addr] = node_id
+        elif isinstance(known, list):
+            known.append(node_id)
+        else:
+            self._by_address[addr] = [known, node_id]
+        return node_id
+
+
+class CompactPath:
+    """One TrustIn path as node ids (array-backed) plus the amount at each hop."""
+
+    __slots__ = ("direction", "nodes", "amounts")
+
+    def __init__(self, direction, nodes, amounts):
+        self.direction = direction
+        self.nodes = nodes
+        self.amounts = amounts
+
+    @classmethod
+    def from_path(cls, path, table):
+        """Normalize a raw `{direction, path: [node, ...]}` entry against `table`."""
+        raw_nodes = path.get("path", [])
+        nodes = array("l", table.intern_many(raw_nodes))
+        amounts = [n.get("amount", 0) for n in raw_nodes]
+        return cls(path.get("direction", -1), nodes, amounts)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def hop_amount(self, node_index):
+        """Amount on the evidence hop adjacent to `node_index` (toward the target)."""
+        if self.direction == -1 and node_index + 1 < len(self.amounts):
+            return self.amounts[node_index + 1]
+        return self.amounts[node_index]
+
+    def format_evidence(self, table, node_index):
+        """Same string as `format_evidence_path()` on the raw path."""
+        if self.direction == -1:
+            start, end = node_index, len(self.nodes)
+        elif self.direction == 1:
+            start, end = 0, node_index + 1
+        else:
+            start, end = 0, len(self.nodes)
+
+        labels = table.labels
+        parts = [labels[self.nodes[start]]]
+        for i in range(start + 1, end):
+            amount = self.amounts[i]
+            if amount is None:
+                amount = 0
+            parts.append(f"--({amount} USD)-->")
+            parts.append(labels[self.nodes[i]])
+        return " ".join(parts)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+hop_planner.py
+--------------
+Plans the smallest TrustIn request a screening needs: inflow / outflow hops
+and direction derived from the rules the scenario will actually evaluate.
+
+TrustIn graph size (and task time) grows roughly exponentially with hops,
+while extraction only ever looks at nodes some rule can match:
+
+    node rules         direction (or both) up to `max_hops` (no `max_hops`: the requested hops)
+    path-level rules   path.amount / path.risk_percentage / ... need the paths of their
+                       direction, so they count like node rules
+    target-only rules  target.* tag conditions are answered by the target's own tags (0 hops);
+                       daily deposit / withdrawal volumes need hop 1 inflow / outflow
+
+restricted to the scenario's path directions (`withdrawal` = outflow only) and
+an explicit `--direction`. The requested hops are ceilings: the plan never asks
+for more, so rules reaching past them stay limited exactly as before (reported
+as `capped_rules`). Nodes beyond the plan could not match any rule, so the
+risk_paths findings are the same as with the full request.
+
+When no rule needs any path (e.g. only target self-tag rules) one hop is still
+requested, the smallest graph that carries the target's tags.
+
+Opt-out: `--no-hop-plan` on `run_screening.py` / `screening_daemon.py`, or AMLCLAW_HOP_PLAN=false.
+
+Usage:
+    python3 scripts/hop_planner.py rules.json
+    python3 scripts/hop_planner.py rules.json --scenario withdrawal --inflow-hops 5 --outflow-hops 5 --json
+"""
+import argparse
+import json
+import os
+import sys
+
+from extract_risk_paths import NODE_LEVEL_PARAMS, SCENARIO_CATEGORIES, SCENARIO_PATH_FILTER, filter_rules_for_scenario
+
+# Path direction codes (TrustIn `direction` field)
+DIRECTION_CODES = {"inflow": -1, "outflow": 1}
+
+# Target-level parameters computed from the target's direct transfers
+TARGET_FLOW_PARAMS = {"target.daily_deposit_usd": "inflow", "target.daily_withdrawal_usd": "outflow"}
+
+DEFAULT_HOPS = 3
+
+# Largest `max_hops` allowed by the rule schema
+MAX_RULE_HOPS = 10
+
+
+def hop_plan_enabled() -> bool:
+    return os.environ.get("AMLCLAW_HOP_PLAN", "").lower() != "false"
+
+
+def rule_reach(rule, ceiling):
+    """
+    Hops a rule needs per direction, e.g. `{"inflow": 3}`, at most `ceiling`.
+    Target-only rules (and rules that can never match) need none: `{}`.
+    """
+    params = {cond.get("parameter", "") for cond in rule.get("conditions", [])}
+    reach = {}
+    # Daily volumes are the target's own (hop 1) transfers in that direction
+    for param, name in TARGET_FLOW_PARAMS.items():
+        if param in params and ceiling:
+            reach[name] = 1
+    if not any(p.startswith("path.") for p in params):
+        return reach
+    rule_dir = rule.get("direction")
+    if rule_dir and rule_dir not in DIRECTION_CODES:
+        return {}  # Matches no path direction (see rule_applies_to_context)
+    max_hops = rule.get("max_hops")
+    hops = min(max_hops, ceiling) if isinstance(max_hops, int) else ceiling
+    min_hops = rule.get("min_hops")
+    if params & NODE_LEVEL_PARAMS and isinstance(min_hops, int) and min_hops > hops:
+        return reach  # Its hop range lies entirely beyond the ceiling
+    for name in ([rule_dir] if rule_dir else DIRECTION_CODES):
+        reach[name] = max(reach.get(name, 0), hops)
+    return reach
+
+
+def plan_hops(rules, scenario="all", inflow_hops=DEFAULT_HOPS, outflow_hops=DEFAULT_HOPS, direction=None):
+    """
+    Minimal fetch shape for `rules` (a rules list or CompiledRules) in `scenario`.
+
+    `inflow_hops` / `outflow_hops` are the requested (maximum) hops and
+    `direction` an explicit trace direction ("inflow", "outflow", "all" or
+    None). Returns `{"scenario", "direction", "inflow_hops", "outflow_hops",
+    "requested", "deciding_rules", "capped_rules"}`.
+    """
+    ceilings = {"inflow": inflow_hops, "outflow": outflow_hops}
+    allowed = SCENARIO_PATH_FILTER.get(scenario)
+    for name, code in DIRECTION_CODES.items():
+        if allowed is not None and code not in allowed or direction in DIRECTION_CODES and direction != name:
+            ceilings[name] = 0
+
+    hops = {"inflow": 0, "outflow": 0}
+    deciding = {"inflow": [], "outflow": []}
+    capped = []
+    for rule in filter_rules_for_scenario(rules, scenario):
+        for name, ceiling in ceilings.items():
+            if not ceiling:
+                continue
+            if isinstance(rule.get("max_hops"), int) and rule_reach(rule, MAX_RULE_HOPS).get(name, 0) > ceiling:
+                if rule.get("rule_id") not in capped:
+                    capped.append(rule.get("rule_id"))
+            reach = rule_reach(rule, ceiling).get(name, 0)
+            if not reach:
+                continue
+            if reach > hops[name]:
+                hops[name], deciding[name] = reach, []
+            if reach == hops[name]:
+                deciding[name].append(rule.get("rule_id"))
+
+    if not hops["inflow"] and not hops["outflow"]:
+        # Target tags still come with a graph: ask for the smallest one allowed
+        for name in ("inflow", "outflow"):
+            if ceilings[name]:
+                hops[name] = 1
+                break
+
+    if hops["inflow"] and hops["outflow"]:
+        planned_direction = "all"
+    elif hops["outflow"]:
+        planned_direction = "outflow"
+    else:
+        planned_direction = "inflow"
+    return {
+        "scenario": scenario,
+        "direction": planned_direction,
+        "inflow_hops": hops["inflow"],
+        "outflow_hops": hops["outflow"],
+        "requested": {"inflow": inflow_hops, "outflow": outflow_hops, "direction": direction or "all"},
+        "deciding_rules": deciding,
+        "capped_rules": capped,
+    }
+
+
+def describe(plan):
+    """One-line summary of a plan, e.g. for run_screening.py output."""
+    requested = plan["requested"]
+    text = (f"Inflow: {plan['inflow_hops']} hops, Outflow: {plan['outflow_hops']} hops "
+            f"(requested {requested['inflow']}/{requested['outflow']})")
+    if plan["capped_rules"]:
+        text += f"; capped: {', '.join(plan['capped_rules'])}"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the minimal TrustIn hops each scenario's rules need.")
+    parser.add_argument("rules", nargs="?", default="rules.json", help="Path to rules.json (default: ./rules.json).")
+    parser.add_argument("--scenario", choices=list(SCENARIO_CATEGORIES), help="Plan one scenario (default: all of them).")
+    parser.add_argument("--direction", choices=["inflow", "outflow", "all"], help="Explicit trace direction.")
+    parser.add_argument("--inflow-hops", type=int, default=DEFAULT_HOPS, help=f"Requested inflow hops (default: {DEFAULT_HOPS}).")
+    parser.add_argument("--outflow-hops", type=int, default=DEFAULT_HOPS, help=f"Requested outflow hops (default: {DEFAULT_HOPS}).")
+    parser.add_argument("--json", action="store_true", help="Print the plans as JSON.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.rules):
+        print(json.dumps({"status": "failed", "error": f"Rules file not found: {args.rules}"}))
+        sys.exit(1)
+    from compiled_rules import load_compiled_rules
+    rules = load_compiled_rules(args.rules)
+
+    scenarios = [args.scenario] if args.scenario else list(SCENARIO_CATEGORIES)
+    plans = [plan_hops(rules, s, args.inflow_hops, args.outflow_hops, args.direction) for s in scenarios]
+    if args.json:
+        print(json.dumps(plans, indent=2, ensure_ascii=False))
+        return
+    print(f"Hop plan: {args.rules} (requested inflow {args.inflow_hops}, outflow {args.outflow_hops})")
+    print(f"  {'scenario':<12} {'direction':<9} {'inflow':>6} {'outflow':>7}  deciding rules")
+    for plan in plans:
+        deciding = sorted(set(plan["deciding_rules"]["inflow"] + plan["deciding_rules"]["outflow"]))
+        print(f"  {plan['scenario']:<12} {plan['direction']:<9} {plan['inflow_hops']:>6} {plan['outflow_hops']:>7}"
+              f"  {', '.join(deciding) or '-'}")
+        if plan["capped_rules"]:
+            print(f"  {'':<12} capped by the requested hops: {', '.join(plan['capped_rules'])}")
+
+
+if __name__ == "__main__":
+    main()
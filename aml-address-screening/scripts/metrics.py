@@ -0,0 +1,155 @@
+"""
+Per-stage timing and counters for one screening, exported as NDJSON or as a
+Prometheus textfile.
+
+A `ScreeningMetrics` object is passed down the pipeline (`screen()` ->
+`fetch_graph()` -> TrustIn client -> `process_graph()` -> `extract_risk_paths()`)
+and each stage adds to it:
+
+    submit_task_seconds                 submit_task request time
+    poll_wait_seconds                   submit -> finished wall time while polling
+    get_status_requests / _seconds      number and total time of status polls
+    status_errors                       failed status polls retried by batch screening
+    get_result_seconds / _bytes         result download time and body size
+    decode_seconds                      JSON decoding of responses (incl. stringified data)
+    cache_hit                           graph served from the local cache
+    extract_seconds                     extract_risk_paths()
+    verdict_seconds                     evaluate_verdict() (verdict_engine.py)
+    nodes_visited / rule_evaluations    path nodes inspected / unique (node, direction, hop) rule matches
+                                        (per shard with --workers)
+    write_seconds                       raw_graph / risk_paths file writes
+
+Pass `metrics=None` (the default everywhere) to skip instrumentation.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+# Record fields that are labels rather than measurements
+LABEL_FIELDS = ("timestamp", "chain", "address", "scenario", "status", "error")
+
+PROMETHEUS_PREFIX = "amlclaw_screening_"
+
+
+class ScreeningMetrics:
+    """Accumulates stage timings (seconds) and counters for one screening."""
+
+    def __init__(self, chain: Optional[str] = None, address: Optional[str] = None,
+                 scenario: Optional[str] = None):
+        self.labels = {"chain": chain, "address": address, "scenario": scenario}
+        self.values: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self._timestamp = datetime.now().isoformat()
+
+    def add(self, name: str, value: float = 1) -> None:
+        self.values[name] = self.values.get(name, 0) + value
+
+    def set(self, name: str, value) -> None:
+        self.values[name] = value
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block and add it to `<name>_seconds`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(f"{name}_seconds", time.perf_counter() - start)
+
+    def record(self, status: str = "success", error: Optional[str] = None) -> Dict:
+        """Flat metrics record for export."""
+        record = {"timestamp": self._timestamp, **self.labels, "status": status}
+        if error:
+            record["error"] = error
+        for name, value in sorted(self.values.items()):
+            record[name] = round(value, 6) if isinstance(value, float) else value
+        record["total_seconds"] = round(time.perf_counter() - self._started, 6)
+        return record
+
+
+class _NoMetrics(ScreeningMetrics):
+    """Drop-in that records nothing (used when no metrics object is passed)."""
+
+    def add(self, name, value=1):
+        pass
+
+    def set(self, name, value):
+        pass
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+
+NO_METRICS = _NoMetrics()
+
+
+def write_ndjson(records: Iterable[Dict], path: str) -> None:
+    """Append one JSON line per metrics record."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _prometheus_escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_prometheus(records: Iterable[Dict]) -> str:
+    """
+    Render records as Prometheus text exposition: every numeric field becomes a
+    summary (`_sum` / `_count`) per scenario, plus screening counts per status.
+    """
+    sums: Dict[str, Dict[str, list]] = {}
+    statuses: Dict[tuple, int] = {}
+    for record in records:
+        scenario = record.get("scenario") or "unknown"
+        key = (scenario, record.get("status", "unknown"))
+        statuses[key] = statuses.get(key, 0) + 1
+        for name, value in record.items():
+            if name in LABEL_FIELDS or not isinstance(value, (int, float)):
+                continue
+            entry = sums.setdefault(name, {}).setdefault(scenario, [0.0, 0])
+            entry[0] += float(value)
+            entry[1] += 1
+
+    lines = [
+        f"# HELP {PROMETHEUS_PREFIX}total Screenings by scenario and status.",
+        f"# TYPE {PROMETHEUS_PREFIX}total counter",
+    ]
+    for (scenario, status), count in sorted(statuses.items()):
+        lines.append(f'{PROMETHEUS_PREFIX}total{{scenario="{_prometheus_escape(scenario)}",'
+                     f'status="{_prometheus_escape(status)}"}} {count}')
+    for name in sorted(sums):
+        metric = PROMETHEUS_PREFIX + name
+        lines.append(f"# TYPE {metric} summary")
+        for scenario, (total, count) in sorted(sums[name].items()):
+            label = f'{{scenario="{_prometheus_escape(scenario)}"}}'
+            lines.append(f"{metric}_sum{label} {total:.6f}")
+            lines.append(f"{metric}_count{label} {count}")
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}last_export_timestamp_seconds gauge")
+    lines.append(f"{PROMETHEUS_PREFIX}last_export_timestamp_seconds {time.time():.3f}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(records: Iterable[Dict], path: str) -> None:
+    """Atomically (re)write a textfile-collector `.prom` file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(format_prometheus(records))
+    os.replace(tmp_path, path)
+
+
+def write_metrics(records: Iterable[Dict], path: str, fmt: Optional[str] = None) -> None:
+    """Export records as `ndjson` or `prometheus` (default: by extension, `.prom` = Prometheus)."""
+    fmt = fmt or ("prometheus" if path.endswith(".prom") else "ndjson")
+    if fmt == "prometheus":
+        write_prometheus(records, path)
+    else:
+        write_ndjson(records, path)
@@ -0,0 +1,111 @@
+"""
+Polling strategies for TrustIn task status.
+
+`PollPolicy` decides how long to wait between `get_status` calls: quick early
+polls, exponential backoff with jitter, a ceiling per interval and an overall
+deadline. `LatencyHints` learns typical task durations per
+(chain, inflow_hops, outflow_hops, max_nodes_per_hop) bucket so that the first
+poll can be scheduled close to when the task is expected to finish.
+
+Any object exposing `deadline` and `delays(hint)` can be passed to the TrustIn
+clients as a custom policy.
+"""
+
+import json
+import os
+import random
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+
+@dataclass
+class PollPolicy:
+    """Exponential backoff with jitter between status polls."""
+    initial_interval: float = 0.25   # First wait after submit (seconds)
+    multiplier: float = 1.6          # Growth factor per poll
+    max_interval: float = 5.0        # Ceiling for a single wait
+    jitter: float = 0.2              # +/- fraction applied to each wait
+    deadline: float = 60.0           # Give up after this many seconds
+    hint_fraction: float = 0.8       # First wait = hint * fraction when a latency hint exists
+
+    @classmethod
+    def fixed(cls, interval: float = 2.0, deadline: float = 60.0) -> "PollPolicy":
+        """Legacy behaviour: poll every `interval` seconds."""
+        return cls(initial_interval=interval, multiplier=1.0, max_interval=interval,
+                   jitter=0.0, deadline=deadline, hint_fraction=0.0)
+
+    def _jittered(self, delay: float) -> float:
+        if self.jitter <= 0:
+            return delay
+        return max(0.0, delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def delays(self, hint: Optional[float] = None) -> Iterator[float]:
+        """Yield successive waits (seconds) before each status poll."""
+        if hint and self.hint_fraction > 0:
+            # Sleep through most of the expected duration, then poll quickly around it
+            yield self._jittered(max(self.initial_interval, hint * self.hint_fraction))
+        delay = self.initial_interval
+        while True:
+            yield self._jittered(min(delay, self.max_interval))
+            delay = min(delay * self.multiplier, self.max_interval)
+
+
+def latency_bucket(payload: Dict) -> str:
+    """Bucket key for a submit_task payload."""
+    return "{}|{}|{}|{}".format(
+        payload.get("chain_name"),
+        payload.get("inflow_hops"),
+        payload.get("outflow_hops"),
+        payload.get("max_nodes_per_hop"),
+    )
+
+
+class LatencyHints:
+    """
+    Exponentially weighted moving average of task durations per bucket.
+
+    When `path` is given, hints are loaded from and persisted to that JSON file
+    so later processes start with learned estimates.
+    """
+
+    def __init__(self, path: Optional[str] = None, alpha: float = 0.3):
+        self.path = path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._hints: Dict[str, float] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._hints = {k: float(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError, AttributeError):
+                self._hints = {}
+
+    def get(self, bucket: Optional[str]) -> Optional[float]:
+        if bucket is None:
+            return None
+        with self._lock:
+            return self._hints.get(bucket)
+
+    def record(self, bucket: Optional[str], duration: float) -> None:
+        """Fold an observed task duration (seconds) into the bucket's estimate."""
+        if bucket is None:
+            return
+        with self._lock:
+            previous = self._hints.get(bucket)
+            if previous is None:
+                self._hints[bucket] = duration
+            else:
+                self._hints[bucket] = previous + self.alpha * (duration - previous)
+            snapshot = dict(self._hints)
+        if self.path:
+            self._save(snapshot)
+
+    def _save(self, snapshot: Dict[str, float]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Hints are an optimisation; never fail a screening over them
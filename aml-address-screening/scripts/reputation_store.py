@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+reputation_store.py
+-------------------
+Local entity reputation store (`graph_data/reputation.sqlite`): every address
+seen in a fetched TrustIn graph, with its tags and when it was last seen, plus
+the direct (hop 1) counterparties of each screened target.
+
+    entities   (chain, address) -> tags, first_seen, last_seen, seen_as (target / counterparty)
+    neighbors  (chain, address, neighbor, direction) -> hop amount (USD), last_seen
+
+`fetch_graph()` records each graph it fetches from TrustIn (graph cache hits and
+API fallbacks are skipped: they carry no new observation). Lookups are bulk, so
+questions that only need tags can be answered locally before an API task is
+spent:
+
+    target self-tag   `evaluate_target_rules()` on the target's stored tags
+    1-hop prescreen   node rules at hop 1 (`RuleIndex`) on the stored direct counterparties
+
+The store only knows what earlier graphs showed. A prescreen hit is evidence
+(e.g. a sanctioned target or a sanctioned direct counterparty); no hit is not
+a clean result, since deeper hops and transfers after `last_seen` are unknown.
+`max_age` ignores observations older than that.
+
+Opt-out: set AMLCLAW_REPUTATION_STORE=false.
+Location: AMLCLAW_REPUTATION_STORE_PATH (default: ./graph_data/reputation.sqlite).
+
+Usage:
+    python3 scripts/reputation_store.py lookup Tron <ADDRESS> [<ADDRESS> ...]
+    python3 scripts/reputation_store.py prescreen Tron <ADDRESS> --rules rules.json --scenario deposit --max-age 30d
+    python3 scripts/reputation_store.py import graph_data
+    python3 scripts/reputation_store.py stats
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from artifact_io import parse_age
+from graph_table import amount_value
+
+STORE_FILENAME = "reputation.sqlite"
+
+# Bump when the table layout changes; older databases are rebuilt empty
+SCHEMA_VERSION = 1
+
+# Addresses per `IN (...)` query (below SQLite's bound-parameter limit)
+LOOKUP_CHUNK = 500
+
+_SCHEMA = (
+    """
+CREATE TABLE entities (
+    chain TEXT NOT NULL,
+    address TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    seen_as TEXT NOT NULL,
+    PRIMARY KEY (chain, address)
+) WITHOUT ROWID""",
+    """
+CREATE TABLE neighbors (
+    chain TEXT NOT NULL,
+    address TEXT NOT NULL,
+    neighbor TEXT NOT NULL,
+    direction INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (chain, address, neighbor, direction)
+) WITHOUT ROWID""",
+)
+
+# Newest observation wins; an address once screened stays a "target"
+_UPSERT_ENTITY = """
+INSERT INTO entities (chain, address, tags, first_seen, last_seen, seen_as) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (chain, address) DO UPDATE SET
+    tags = CASE WHEN excluded.last_seen >= entities.last_seen THEN excluded.tags ELSE entities.tags END,
+    first_seen = MIN(entities.first_seen, excluded.first_seen),
+    last_seen = MAX(entities.last_seen, excluded.last_seen),
+    seen_as = CASE WHEN 'target' IN (entities.seen_as, excluded.seen_as) THEN 'target' ELSE 'counterparty' END
+"""
+_UPSERT_NEIGHBOR = """
+INSERT INTO neighbors (chain, address, neighbor, direction, amount, last_seen) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (chain, address, neighbor, direction) DO UPDATE SET
+    amount = CASE WHEN excluded.last_seen >= neighbors.last_seen THEN excluded.amount ELSE neighbors.amount END,
+    last_seen = MAX(neighbors.last_seen, excluded.last_seen)
+"""
+
+
+def store_enabled() -> bool:
+    return os.environ.get("AMLCLAW_REPUTATION_STORE", "").lower() != "false"
+
+
+def store_path() -> str:
+    return os.getenv("AMLCLAW_REPUTATION_STORE_PATH") or os.path.join(os.getcwd(), "graph_data", STORE_FILENAME)
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch).isoformat(timespec="seconds")
+
+
+def _epoch(timestamp):
+    """Epoch seconds of an ISO timestamp (fetch_graph's `timestamp` field), or None."""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def graph_observations(target, target_tags, paths):
+    """
+    Entities and hop-1 edges of one graph: `({address: tags}, {(neighbor, direction): amount})`.
+
+    Paths are raw TrustIn `{direction, path: [node, ...]}` entries; inflow paths
+    end at the target and outflow paths start at it (see `compute_true_deep()`).
+    """
+    entities = {target: list(target_tags or [])}
+    edges = {}
+    for path in paths:
+        nodes = path.get("path") or []
+        direction = path.get("direction", -1)
+        for node in nodes:
+            address = node.get("address")
+            if address and address != target and (address not in entities or not entities[address]):
+                entities[address] = list(node.get("tags") or [])
+        if len(nodes) < 2:
+            continue
+        # Hop 1 and the amount on its edge to the target
+        if direction == -1:
+            neighbor, amount = nodes[-2].get("address"), nodes[-1].get("amount")
+        else:
+            neighbor, amount = nodes[1].get("address"), nodes[1].get("amount")
+        if neighbor and neighbor != target:
+            key = (neighbor, direction)
+            edges[key] = max(edges.get(key, 0.0), amount_value(amount))
+    return entities, edges
+
+
+def _graph_parts(graph):
+    """`(chain, target, target_tags, paths)` of a fetch_graph() result, or None without graph data."""
+    data = (graph.get("graph_data") or {}).get("data")
+    if not isinstance(data, dict) or not graph.get("chain") or not graph.get("address"):
+        return None
+    return graph["chain"], graph["address"], data.get("tags") or [], data.get("paths") or []
+
+
+class ReputationStore:
+    """Connection to one reputation database (thread-safe; shared per path via `open_store()`)."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._schema_version() != SCHEMA_VERSION:
+            with self._transaction():
+                # Re-checked under the write lock: another process may have just created it
+                if self._schema_version() != SCHEMA_VERSION:
+                    self._conn.execute("DROP TABLE IF EXISTS entities")
+                    self._conn.execute("DROP TABLE IF EXISTS neighbors")
+                    for statement in _SCHEMA:
+                        self._conn.execute(statement)
+                    self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _schema_version(self):
+        return self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Writes -----------------------------------------------------------
+
+    def record(self, chain, target, target_tags, paths, seen_at=None):
+        """Record one graph's entities and the target's hop-1 edges. Returns the number of entities."""
+        seen_at = time.time() if seen_at is None else seen_at
+        entities, edges = graph_observations(target, target_tags, paths)
+        entity_rows = [
+            (chain, address, json.dumps(tags, ensure_ascii=False, separators=(",", ":")), seen_at, seen_at,
+             "target" if address == target else "counterparty")
+            for address, tags in entities.items()
+        ]
+        edge_rows = [(chain, target, neighbor, direction, amount, seen_at)
+                     for (neighbor, direction), amount in edges.items()]
+        with self._lock, self._transaction():
+            self._conn.executemany(_UPSERT_ENTITY, entity_rows)
+            self._conn.executemany(_UPSERT_NEIGHBOR, edge_rows)
+        return len(entity_rows)
+
+    def record_graph(self, graph, seen_at=None):
+        """Record a fetch_graph() result; returns the number of entities (0 without graph data)."""
+        parts = _graph_parts(graph)
+        if parts is None:
+            return 0
+        return self.record(*parts, seen_at=seen_at)
+
+    def import_artifacts(self, graph_dir):
+        """Record every `raw_graph_*` artifact in `graph_dir` as of its fetch time. Returns the graph count."""
+        from artifact_io import iter_artifacts
+        from graph_stream import iter_graph_events
+
+        graphs = 0
+        for path, _, _, _, stat in iter_artifacts(graph_dir, ("raw_graph",)):
+            header, target_tags, paths = {}, [], []
+            for kind, key, value in iter_graph_events(path):
+                if kind == "field":
+                    header[key] = value
+                elif kind == "data_field" and key == "tags":
+                    target_tags = value or []
+                elif kind == "path":
+                    paths.append(value)
+            if not header.get("chain") or not header.get("address") or not paths and not target_tags:
+                continue
+            seen_at = _epoch(header.get("timestamp")) or stat.st_mtime
+            self.record(header["chain"], header["address"], target_tags, paths, seen_at=seen_at)
+            graphs += 1
+        return graphs
+
+    # --- Queries ----------------------------------------------------------
+
+    def lookup(self, chain, addresses, max_age=None):
+        """
+        Stored entities among `addresses`:
+        `{address: {"tags", "first_seen", "last_seen", "seen_as"}}`.
+        Unknown addresses (or ones last seen more than `max_age` seconds ago) are absent.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        since = time.time() - max_age if max_age is not None else None
+        found = {}
+        with self._lock:
+            for start in range(0, len(addresses), LOOKUP_CHUNK):
+                chunk = addresses[start:start + LOOKUP_CHUNK]
+                query = (f"SELECT address, tags, first_seen, last_seen, seen_as FROM entities "
+                         f"WHERE chain = ? AND address IN ({', '.join('?' * len(chunk))})")
+                params = [chain, *chunk]
+                if since is not None:
+                    query += " AND last_seen >= ?"
+                    params.append(since)
+                for address, tags, first_seen, last_seen, seen_as in self._conn.execute(query, params):
+                    found[address] = {"tags": json.loads(tags), "first_seen": _iso(first_seen),
+                                      "last_seen": _iso(last_seen), "seen_as": seen_as}
+        return found
+
+    def neighbors(self, chain, address, max_age=None):
+        """Stored hop-1 counterparties of `address`: `[{"address", "direction", "amount", "last_seen"}]`."""
+        query = "SELECT neighbor, direction, amount, last_seen FROM neighbors WHERE chain = ? AND address = ?"
+        params = [chain, address]
+        if max_age is not None:
+            query += " AND last_seen >= ?"
+            params.append(time.time() - max_age)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY amount DESC", params).fetchall()
+        return [{"address": neighbor, "direction": direction, "amount": amount, "last_seen": _iso(last_seen)}
+                for neighbor, direction, amount, last_seen in rows]
+
+    def prescreen(self, chain, address, rules, scenario="all", max_age=None):
+        """
+        Answer the target self-tag check and the hop-1 rules from stored
+        observations. `hit` is True when any rule triggered; `known` is False
+        when the target was never seen (within `max_age`), i.e. nothing could be
+        checked locally.
+        """
+        from extract_risk_paths import (
+            SCENARIO_PATH_FILTER, evaluate_target_rules, filter_rules_for_scenario, summarize_findings,
+        )
+        from graph_table import prioritize_tag
+        from rule_index import RuleIndex
+
+        scenario_rules = filter_rules_for_scenario(rules, scenario)
+        allowed_dirs = SCENARIO_PATH_FILTER.get(scenario)
+        target = self.lookup(chain, [address], max_age).get(address)
+        target_findings = evaluate_target_rules(scenario_rules, target["tags"]) if target else []
+
+        counterparties = [n for n in self.neighbors(chain, address, max_age)
+                          if allowed_dirs is None or n["direction"] in allowed_dirs]
+        known = self.lookup(chain, [n["address"] for n in counterparties], max_age)
+        index = RuleIndex(scenario_rules)
+        findings = []
+        for counterparty in counterparties:
+            entity = known.get(counterparty["address"])
+            tag = prioritize_tag(entity["tags"]) if entity else None
+            if not tag:
+                continue
+            matched = index.match(counterparty["direction"], 1, tag)
+            if matched:
+                findings.append({
+                    "address": counterparty["address"],
+                    "direction": "inflow" if counterparty["direction"] == -1 else "outflow",
+                    "amount": counterparty["amount"],
+                    "last_seen": entity["last_seen"],
+                    "min_deep": 1,
+                    "tag": {key: tag.get(key, "") for key in (
+                        "primary_category", "secondary_category", "tertiary_category",
+                        "quaternary_category", "risk_level")},
+                    "matched_rules": sorted(set(matched)),
+                })
+
+        summary = summarize_findings(findings, scenario_rules, len(rules), scenario, 0, 0, target_findings)
+        return {
+            "chain": chain,
+            "address": address,
+            "scenario": scenario,
+            "known": target is not None,
+            "last_seen": target["last_seen"] if target else None,
+            "counterparties_checked": len(counterparties),
+            "hit": bool(summary["rules_triggered"]),
+            "rules_triggered": summary["rules_triggered"],
+            "highest_severity": summary["highest_severity"],
+            "target_findings": target_findings,
+            "hop1_findings": findings,
+        }
+
+    def stats(self):
+        with self._lock:
+            entities, tagged, targets = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tags != '[]'), 0), COALESCE(SUM(seen_as = 'target'), 0) "
+                "FROM entities").fetchone()
+            edges = self._conn.execute("SELECT COUNT(*) FROM neighbors").fetchone()[0]
+        return {"path": self.path, "entities": entities, "tagged": tagged, "targets": targets,
+                "hop1_edges": edges, "bytes": os.path.getsize(self.path)}
+
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_store(path=None, create=True):
+    """
+    Shared `ReputationStore` for `path` (default: `store_path()`), or None when
+    the store is disabled (or does not exist and `create` is False).
+    """
+    if not store_enabled():
+        return None
+    path = os.path.abspath(path or store_path())
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            if not create and not os.path.exists(path):
+                return None
+            store = _STORES[path] = ReputationStore(path)
+    return store
+
+
+def record_graph_safely(graph, seen_at=None):
+    """Record a fetch_graph() result without ever failing the fetch."""
+    try:
+        store = open_store()
+        if store is not None:
+            return store.record_graph(graph, seen_at=seen_at)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: reputation store not updated: {e}", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or fill the local entity reputation store.")
+    parser.add_argument("--store", help="Store file (default: AMLCLAW_REPUTATION_STORE_PATH or graph_data/reputation.sqlite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_lookup = sub.add_parser("lookup", help="Stored tags and last-seen time of addresses")
+    p_lookup.add_argument("chain")
+    p_lookup.add_argument("addresses", nargs="+")
+    p_lookup.add_argument("--max-age", help="Ignore observations older than this (e.g. 30d, 12h)")
+    p_pre = sub.add_parser("prescreen", help="Target self-tag and hop-1 rule check from stored observations")
+    p_pre.add_argument("chain")
+    p_pre.add_argument("address")
+    p_pre.add_argument("--rules", default="rules.json", help="Path to rules.json (default: ./rules.json)")
+    p_pre.add_argument("--scenario", default="all")
+    p_pre.add_argument("--max-age", help="Ignore observations older than this (e.g. 30d, 12h)")
+    p_import = sub.add_parser("import", help="Record the raw_graph artifacts of a directory")
+    p_import.add_argument("directory", nargs="?", default="graph_data")
+    sub.add_parser("stats", help="Entity and edge counts")
+    args = parser.parse_args()
+
+    path = args.store or store_path()
+    if args.command == "import" and not os.path.isdir(args.directory):
+        print(json.dumps({"status": "failed", "error": f"Directory not found: {args.directory}"}))
+        sys.exit(1)
+    if args.command != "import" and not os.path.exists(path):
+        print(json.dumps({"status": "failed", "error": f"Store not found: {path}"}))
+        sys.exit(1)
+    try:
+        max_age = parse_age(args.max_age) if getattr(args, "max_age", None) else None
+    except ValueError as e:
+        print(json.dumps({"status": "failed", "error": str(e)}))
+        sys.exit(1)
+
+    store = ReputationStore(path)
+    if args.command == "lookup":
+        print(json.dumps(store.lookup(args.chain, args.addresses, max_age), indent=2, ensure_ascii=False))
+    elif args.command == "prescreen":
+        from extract_risk_paths import SCENARIO_CATEGORIES, load_rules
+        if args.scenario not in SCENARIO_CATEGORIES:
+            print(json.dumps({"status": "failed", "error": f"Unknown scenario '{args.scenario}'"}))
+            sys.exit(1)
+        result = store.prescreen(args.chain, args.address, load_rules(args.rules), args.scenario, max_age)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command == "import":
+        print(json.dumps({"status": "success", "store": store.path, "graphs": store.import_artifacts(args.directory)}))
+    else:
+        print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
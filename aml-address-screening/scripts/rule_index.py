@@ -0,0 +1,415 @@
+"""
+rule_index.py
+-------------
+Compiles the node-level part of `rules.json` into a lookup index so that
+`extract_risk_paths()` can match a path node with a single dictionary lookup
+instead of re-walking every rule and condition.
+
+The index is keyed by path direction, hop distance and tag category:
+
+    (path_dir, deep)                        -> bucket of context-applicable rules
+    bucket.by_primary[primary_category]     -> candidate rules for that category
+    (path_dir, deep, primary, secondary, risk_level) -> matched rule ids (memoized)
+
+Matching semantics are identical to `rule_applies_to_context()` +
+`rule_matches_node()` in `extract_risk_paths.py`, which remain the reference
+implementation.
+
+Each rule is first reduced to a plain-data spec (`rule_spec()`), which
+`compiled_rules.py` stores in the precompiled rules artifact; a rule list that
+carries its specs (`RuleList.specs`) is indexed without re-deriving them.
+
+Rules are evaluated through a plan (`optimize_plan()`): rules with the same
+direction and identical node conditions share one plan entry that reports each
+member's rule_id where its own hop range applies, and an entry whose conditions
+imply a broader entry's is skipped when that entry did not match. See
+`rule_optimizer.py` for the report and equivalence check.
+"""
+
+# Path direction codes used by the TrustIn graph (-1 = inflow, 1 = outflow)
+DIRECTION_CODES = {"inflow": -1, "outflow": 1}
+
+# Node-level condition parameter -> tag field it reads
+NODE_PARAM_FIELDS = {
+    "path.node.tags.primary_category": "primary_category",
+    "path.node.tags.secondary_category": "secondary_category",
+    "path.node.tags.risk_level": "risk_level",
+}
+
+# Operators supported per tag field (mirrors eval_condition(); anything else never matches)
+_CATEGORY_OPERATORS = {"IN", "==", "!=", "NOT_IN", "CONTAINS"}
+_RISK_LEVEL_OPERATORS = {"IN", "==", "!=", "CONTAINS"}
+
+# Sentinel direction for rules whose `direction` is set but not recognised
+_NO_DIRECTION = object()
+
+
+def supports_operator(field, op):
+    """Whether `op` can ever match on `field` (unsupported operators never match)."""
+    return op in (_RISK_LEVEL_OPERATORS if field == "risk_level" else _CATEGORY_OPERATORS)
+
+
+def tag_contains(actual, value):
+    """CONTAINS on a tag value: it contains the string `value`, or any string of a list `value`."""
+    if not isinstance(actual, str):
+        return False
+    if isinstance(value, str):
+        return value in actual
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return any(isinstance(v, str) and v in actual for v in value)
+    return False
+
+
+def _as_member_set(value):
+    """Return a frozenset for list-valued IN/NOT_IN conditions, else None."""
+    if isinstance(value, frozenset):
+        return value
+    if not isinstance(value, (list, tuple)):
+        return None
+    try:
+        return frozenset(value)
+    except TypeError:
+        return None
+
+
+def compile_condition(cond):
+    """
+    Compile a node-level condition into a `(field, predicate)` pair.
+
+    The predicate receives the tag field value (never None) and returns a bool.
+    Returns None when the condition is not node-evaluable.
+    """
+    field = NODE_PARAM_FIELDS.get(cond.get("parameter", ""))
+    if field is None:
+        return None
+    return field, _predicate(field, cond.get("operator", ""), cond.get("value"))
+
+
+def _predicate(field, op, value):
+    """Predicate for one node-level condition on `field` (see compile_condition())."""
+    if not supports_operator(field, op):
+        return lambda actual: False
+    if op == "==":
+        return lambda actual: actual == value
+    if op == "!=":
+        return lambda actual: actual != value
+    if op == "CONTAINS":
+        return lambda actual: tag_contains(actual, value)
+
+    members = _as_member_set(value)
+    if op == "IN":
+        if members is not None:
+            return members.__contains__
+        return lambda actual: actual in value
+    # NOT_IN
+    if members is not None:
+        return lambda actual: actual not in members
+    return lambda actual: actual not in value
+
+
+def rule_spec(rule):
+    """
+    Plain-data node-level form of a rule:
+    `(rule_id, direction, min_hops, max_hops, conditions, primary_keys)`, where
+    conditions are `(field, operator, value)` with list-valued IN / NOT_IN
+    values frozen into frozensets. Returns None for rules without node-level
+    conditions (they never match a node).
+    """
+    conditions = []
+    for cond in rule.get("conditions", []):
+        field = NODE_PARAM_FIELDS.get(cond.get("parameter", ""))
+        if field is None:
+            continue
+        op = cond.get("operator", "")
+        value = cond.get("value")
+        members = _as_member_set(value) if op in ("IN", "NOT_IN") else None
+        conditions.append((field, op, value if members is None else members))
+    if not conditions:
+        return None
+    keys = _primary_index_keys(rule)
+    return (rule.get("rule_id"), rule.get("direction"), rule.get("min_hops"), rule.get("max_hops"),
+            tuple(conditions), None if keys is None else frozenset(keys))
+
+
+class CompiledRule:
+    """A rule reduced to its match context and node-level predicates."""
+
+    __slots__ = ("order", "rule_id", "direction", "min_hops", "max_hops", "conditions", "primary_keys")
+
+    def __init__(self, order, spec):
+        rule_id, rule_dir, min_hops, max_hops, conditions, primary_keys = spec
+        self.order = order
+        self.rule_id = rule_id
+        if rule_dir:
+            self.direction = DIRECTION_CODES.get(rule_dir, _NO_DIRECTION)
+        else:
+            self.direction = None
+        self.min_hops = min_hops
+        self.max_hops = max_hops
+        self.conditions = tuple((field, _predicate(field, op, value)) for field, op, value in conditions)
+        self.primary_keys = primary_keys
+
+    def applies_to(self, path_dir, node_deep):
+        """Same check as `rule_applies_to_context()`."""
+        if self.direction is not None and self.direction != path_dir:
+            return False
+        if self.min_hops is not None and node_deep < self.min_hops:
+            return False
+        if self.max_hops is not None and node_deep > self.max_hops:
+            return False
+        return True
+
+    def matches(self, node_tag):
+        """Same check as `rule_matches_node()` (AND over node-level conditions)."""
+        for field, predicate in self.conditions:
+            actual = node_tag.get(field)
+            if actual is None or not predicate(actual):
+                return False
+        return True
+
+
+def _primary_index_keys(rule):
+    """
+    Return the primary_category values a node must carry for this rule to match,
+    or None when the rule can match any primary category (wildcard).
+    """
+    keys = None
+    for cond in rule.get("conditions", []):
+        if cond.get("parameter") != "path.node.tags.primary_category":
+            continue
+        op = cond.get("operator")
+        value = cond.get("value")
+        if op == "==":
+            cond_keys = {value} if _is_hashable(value) else None
+        elif op == "IN":
+            cond_keys = _as_member_set(value)
+        else:
+            cond_keys = None
+        if cond_keys is None:
+            continue
+        keys = set(cond_keys) if keys is None else keys & cond_keys
+    return keys
+
+
+def _is_hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _admitted(op, value):
+    """`(positive, values)`: the set a condition admits (IN / ==) or excludes (NOT_IN / !=), else None."""
+    if op in ("IN", "NOT_IN"):
+        members = _as_member_set(value)
+        return None if members is None else (op == "IN", members)
+    if op in ("==", "!=") and _is_hashable(value):
+        return op == "==", frozenset((value,))
+    return None
+
+
+def condition_implies(cond, other):
+    """True when node condition `cond` matching guarantees that `other` matches."""
+    field, op, value = cond
+    other_field, other_op, other_value = other
+    if field != other_field or not supports_operator(field, op) or not supports_operator(field, other_op):
+        return False
+    if cond == other:
+        return True
+    admitted, other_admitted = _admitted(op, value), _admitted(other_op, other_value)
+    if admitted is None or other_admitted is None:
+        return False
+    (positive, values), (other_positive, other_values) = admitted, other_admitted
+    if positive:
+        # IN A ⇒ IN B when A ⊆ B;  IN A ⇒ NOT_IN B when A ∩ B = ∅
+        return values <= other_values if other_positive else not (values & other_values)
+    # NOT_IN A ⇒ NOT_IN B when B ⊆ A
+    return not other_positive and other_values <= values
+
+
+def conditions_imply(conditions, other_conditions):
+    """True when every condition of `other_conditions` is implied by one of `conditions` (AND semantics)."""
+    return all(any(condition_implies(c, o) for c in conditions) for o in other_conditions)
+
+
+def optimize_plan(specs):
+    """
+    Evaluation plan for rule specs: a tuple of `(direction, conditions, members, parent)`
+    entries. `members` are the positions in `specs` of the rules sharing the
+    direction and (order-insensitive) conditions; `parent` is the index of a
+    broader entry implied by this one's conditions, or None.
+    """
+    entries = []
+    groups = {}
+    for pos, spec in enumerate(specs):
+        if spec is None:
+            continue
+        direction, conditions = spec[1], spec[4]
+        try:
+            key = (direction, frozenset(conditions))
+            index = groups.get(key)
+        except TypeError:
+            key = index = None  # Unhashable condition values are never merged
+        if index is not None:
+            entries[index][2].append(pos)
+            continue
+        if key is not None:
+            groups[key] = len(entries)
+        entries.append([direction, conditions, [pos], None])
+
+    # Strictly broader entries each one implies and can share a (direction, hop) bucket with;
+    # gate on the narrowest of them
+    broader = [
+        [j for j, other in enumerate(entries)
+         if j != i and (not entry[0] or not other[0] or entry[0] == other[0])
+         and conditions_imply(entry[1], other[1]) and not conditions_imply(other[1], entry[1])]
+        for i, entry in enumerate(entries)
+    ]
+    for i, entry in enumerate(entries):
+        if broader[i]:
+            entry[3] = max(broader[i], key=lambda j: (len(broader[j]), -j))
+    return tuple((direction, conditions, tuple(members), parent)
+                 for direction, conditions, members, parent in entries)
+
+
+def unoptimized_plan(specs):
+    """One plan entry per rule (no merging or gating), for comparisons."""
+    return tuple((spec[1], spec[4], (pos,), None) for pos, spec in enumerate(specs) if spec is not None)
+
+
+class PlanEntry:
+    """Node conditions evaluated once for every member rule (see `optimize_plan()`)."""
+
+    __slots__ = ("order", "conditions", "primary_keys", "members", "parent", "depth")
+
+    def __init__(self, order, members):
+        self.order = order
+        self.members = members  # CompiledRule, in rule order
+        self.conditions = members[0].conditions
+        self.primary_keys = members[0].primary_keys
+        self.parent = None
+        self.depth = 0  # Number of ancestors; broader entries are evaluated first
+
+    def matches(self, node_tag):
+        for field, predicate in self.conditions:
+            actual = node_tag.get(field)
+            if actual is None or not predicate(actual):
+                return False
+        return True
+
+
+def _item_order(item):
+    entry = item[0]
+    return entry.depth, entry.order
+
+
+class _Bucket:
+    """
+    Plan entries applicable to one (direction, hop) context, indexed by primary
+    category. Items are `(entry, rule ids applicable here)`, broader entries first.
+    """
+
+    __slots__ = ("items", "by_primary", "wildcard")
+
+    def __init__(self, items):
+        self.items = sorted(items, key=_item_order)
+        self.by_primary = {}
+        wildcard = []
+        for item in self.items:
+            if item[0].primary_keys is None:
+                wildcard.append(item)
+                continue
+            for key in item[0].primary_keys:
+                self.by_primary.setdefault(key, []).append(item)
+        self.wildcard = wildcard
+
+    def candidates(self, primary):
+        hits = self.by_primary.get(primary)
+        if not hits:
+            return self.wildcard
+        if not self.wildcard:
+            return hits
+        return sorted(hits + self.wildcard, key=_item_order)
+
+
+class RuleIndex:
+    """
+    Node-matching index compiled once from a (scenario-filtered) rule list.
+
+    Usage:
+        index = RuleIndex(rules)
+        rule_ids = index.match(path_dir, true_deep, tag)
+    """
+
+    def __init__(self, rules):
+        specs = getattr(rules, "specs", None)
+        plan = getattr(rules, "plan", None)
+        if specs is None or len(specs) != len(rules):
+            specs = [rule_spec(rule) for rule in rules]
+            plan = None
+        if plan is None:
+            plan = optimize_plan(specs)
+        # Rules with zero node-level conditions (spec None) never match a node
+        compiled = {pos: CompiledRule(pos, spec) for pos, spec in enumerate(specs) if spec is not None}
+        self.rules = list(compiled.values())
+        self.plan = [PlanEntry(order, [compiled[pos] for pos in members])
+                     for order, (_, _, members, _) in enumerate(plan)]
+        for entry, (_, _, _, parent) in zip(self.plan, plan):
+            if parent is not None:
+                entry.parent = self.plan[parent]
+        for entry in self.plan:
+            ancestor = entry.parent
+            while ancestor is not None:
+                entry.depth += 1
+                ancestor = ancestor.parent
+        self._buckets = {}
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _bucket(self, path_dir, node_deep):
+        key = (path_dir, node_deep)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            items = []
+            for entry in self.plan:
+                rule_ids = tuple(r.rule_id for r in entry.members if r.applies_to(path_dir, node_deep))
+                if rule_ids:
+                    items.append((entry, rule_ids))
+            bucket = _Bucket(items)
+            self._buckets[key] = bucket
+        return bucket
+
+    def match(self, path_dir, node_deep, node_tag):
+        """Return the tuple of rule ids matching a node tag at the given direction and hop."""
+        primary = node_tag.get("primary_category")
+        key = (path_dir, node_deep, primary, node_tag.get("secondary_category"), node_tag.get("risk_level"))
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable tag values: evaluate without memoization
+            return self._evaluate(path_dir, node_deep, primary, node_tag)
+        matched = self._evaluate(path_dir, node_deep, primary, node_tag)
+        self._memo[key] = matched
+        return matched
+
+    def _evaluate(self, path_dir, node_deep, primary, node_tag):
+        bucket = self._bucket(path_dir, node_deep)
+        try:
+            candidates = bucket.candidates(primary)
+        except TypeError:
+            candidates = bucket.items
+        matched = []
+        failed = set()  # Entries that did not match; entries implying them are skipped
+        for entry, rule_ids in candidates:
+            if entry.parent is not None and entry.parent in failed:
+                failed.add(entry)
+            elif entry.matches(node_tag):
+                matched.extend(rule_ids)
+            else:
+                failed.add(entry)
+        return tuple(matched)
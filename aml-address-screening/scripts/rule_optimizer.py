@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+rule_optimizer.py
+-----------------
+Report and equivalence check for the rule evaluation plan built by
+`rule_index.optimize_plan()`.
+
+Node matching does not evaluate every rule separately. Rules sharing a
+direction and identical node conditions (typically the hop tiers of one
+category, e.g. Hop 1 / Hop 2-3 / Hop 4-5 Sanctions rules) share one plan
+entry, evaluated once per node, which still reports each member's own rule_id
+where its hop range applies. An entry whose conditions imply a broader entry's
+(e.g. `secondary_category IN [OFAC]` within `primary_category IN [Sanctions]`)
+is skipped when that entry did not match.
+
+The plan is derived from the rules on every load, so no rules are rewritten;
+this tool shows what was merged and proves that the plan returns the same
+rule ids as evaluating every rule independently:
+
+    1. tag check    every combination of the values the rules compare against
+                    (plus an unknown and a missing value per field) and every
+                    catalog label, at both directions and every hop, through
+                    `RuleIndex.match()` against the reference
+                    `rule_applies_to_context()` + `rule_matches_node()`,
+    2. graph check  full `extract_risk_paths()` output on synthetic graphs for
+                    every scenario, optimized plan vs one entry per rule, with
+                    both engines when NumPy is installed.
+
+Exits non-zero when any check differs.
+
+Usage:
+    python3 scripts/rule_optimizer.py rules.json
+    python3 scripts/rule_optimizer.py rules.json --graphs 20 --seed 7 --json
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import sys
+
+from compiled_rules import CompiledRules, scenario_indices
+from extract_risk_paths import (
+    SCENARIO_CATEGORIES,
+    extract_risk_paths,
+    load_rules,
+    rule_applies_to_context,
+    rule_matches_node,
+)
+from rule_index import DIRECTION_CODES, NODE_PARAM_FIELDS, RuleIndex, optimize_plan, rule_spec, unoptimized_plan
+from synthetic_graph import generate_graph, load_label_catalog
+
+# Tag fields read by node conditions
+TAG_FIELDS = tuple(dict.fromkeys(NODE_PARAM_FIELDS.values()))
+
+# Stand-in for any value no rule mentions (all such values behave alike)
+UNKNOWN_VALUE = "__unknown__"
+
+# Synthetic graph shape for the graph check: dense tags, 5 hops both ways
+VERIFY_PROFILE = {"inflow_hops": 5, "outflow_hops": 5, "nodes_per_hop": 40, "paths": 300,
+                  "tag_density": 0.6, "overlap": 0.5}
+
+
+def _numpy_available():
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _compiled(rules, optimized=True):
+    """All-scenario `CompiledRules` with the optimized plans, or one plan entry per rule."""
+    specs = [rule_spec(r) for r in rules]
+    indices = scenario_indices(rules)
+    plans = None
+    if not optimized:
+        plans = {name: unoptimized_plan([specs[i] for i in idx]) for name, idx in indices.items()}
+    return CompiledRules(rules, specs, indices, plans=plans)
+
+
+def describe_plan(rules, plan=None):
+    """Plan entries of a rule list by rule_id: merged members with hop ranges and the entry each is gated on."""
+    specs = [rule_spec(r) for r in rules]
+    plan = optimize_plan(specs) if plan is None else plan
+    entries = []
+    for direction, _, members, parent in plan:
+        entries.append({
+            "direction": direction or "any",
+            "rules": [{"rule_id": specs[m][0], "min_hops": specs[m][2], "max_hops": specs[m][3]} for m in members],
+            "gated_on": None if parent is None else [specs[m][0] for m in plan[parent][2]],
+        })
+    return {
+        "rules": len(rules),
+        "node_rules": sum(spec is not None for spec in specs),
+        "plan_entries": len(plan),
+        "entries": entries,
+    }
+
+
+def probe_tags(rules, catalog=None):
+    """Tags for the tag check: the product of every compared value per field, plus the catalog labels."""
+    values = {field: {None, UNKNOWN_VALUE} for field in TAG_FIELDS}
+    for spec in map(rule_spec, rules):
+        for field, _, value in (spec[4] if spec else ()):
+            members = value if isinstance(value, (frozenset, list, tuple)) else (value,)
+            values[field].update(m for m in members if isinstance(m, str))
+    tags = [dict(zip(TAG_FIELDS, combo)) for combo in itertools.product(*(sorted(values[f], key=str) for f in TAG_FIELDS))]
+    for primary, secondary, risk_level, _ in catalog or ():
+        for risk in {risk_level, risk_level.capitalize()}:
+            tags.append({"primary_category": primary, "secondary_category": secondary, "risk_level": risk})
+    return [{field: value for field, value in tag.items() if value is not None} for tag in tags]
+
+
+def _reference_match(rules, path_dir, node_deep, tag):
+    try:
+        return sorted(r.get("rule_id", "") for r in rules
+                      if rule_applies_to_context(r, path_dir, node_deep) and rule_matches_node(r, tag, node_deep))
+    except TypeError as e:
+        return f"error: {e}"
+
+
+def _index_match(index, path_dir, node_deep, tag):
+    try:
+        return sorted(index.match(path_dir, node_deep, tag))
+    except TypeError as e:
+        return f"error: {e}"
+
+
+def check_tags(rules, catalog=None, max_hops=5):
+    """Tag check for every scenario. Returns `(checks, mismatches)`."""
+    compiled = _compiled(rules)
+    hops = max([max_hops] + [s[3] for s in compiled.specs if s and isinstance(s[3], int)])
+    tags = probe_tags(rules, catalog)
+    checks, mismatches = 0, []
+    for scenario in SCENARIO_CATEGORIES:
+        scenario_rules = compiled.for_scenario(scenario)
+        index = RuleIndex(scenario_rules)
+        for path_dir in sorted(DIRECTION_CODES.values()):
+            for node_deep in range(hops + 2):
+                for tag in tags:
+                    checks += 1
+                    expected = _reference_match(scenario_rules, path_dir, node_deep, tag)
+                    got = _index_match(index, path_dir, node_deep, tag)
+                    if got != expected:
+                        mismatches.append({"check": "tag", "scenario": scenario, "direction": path_dir,
+                                           "deep": node_deep, "tag": tag, "expected": expected, "got": got})
+    return checks, mismatches
+
+
+def check_graphs(rules, graphs=5, seed=0, catalog=None):
+    """Graph check for every scenario and engine. Returns `(checks, mismatches)`."""
+    optimized, baseline = _compiled(rules), _compiled(rules, optimized=False)
+    engines = ("python", "numpy") if _numpy_available() else ("python",)
+    checks, mismatches = 0, []
+    for graph_seed in range(seed, seed + graphs):
+        graph = generate_graph(seed=graph_seed, catalog=catalog, **VERIFY_PROFILE)
+        for scenario in SCENARIO_CATEGORIES:
+            for engine in engines:
+                checks += 1
+                expected = extract_risk_paths(graph, baseline, scenario=scenario, engine=engine)[:3]
+                got = extract_risk_paths(graph, optimized, scenario=scenario, engine=engine)[:3]
+                if got != expected:
+                    mismatches.append({"check": "graph", "scenario": scenario, "engine": engine,
+                                       "seed": graph_seed})
+    return checks, mismatches
+
+
+def verify(rules, graphs=5, seed=0):
+    """Run both checks; returns `{"tag_checks", "graph_checks", "mismatches"}`."""
+    catalog = load_label_catalog()
+    tag_checks, tag_mismatches = check_tags(rules, catalog)
+    graph_checks, graph_mismatches = check_graphs(rules, graphs, seed, catalog)
+    return {"tag_checks": tag_checks, "graph_checks": graph_checks,
+            "mismatches": tag_mismatches + graph_mismatches}
+
+
+def _hop_range(rule):
+    low, high = rule["min_hops"], rule["max_hops"]
+    if low is None and high is None:
+        return "any hop"
+    return f"hop {low or 0}-{high if high is not None else '*'}"
+
+
+def print_report(rules_path, report, verification):
+    print(f"Rule plan: {rules_path}")
+    print(f"  {'scenario':<12} {'node rules':>10} {'plan entries':>13}")
+    for scenario, plan in report.items():
+        print(f"  {scenario:<12} {plan['node_rules']:>10} {plan['plan_entries']:>13}")
+
+    entries = report.get("all", {}).get("entries", [])
+    merged = [e for e in entries if len(e["rules"]) > 1]
+    gated = [e for e in entries if e["gated_on"]]
+    if merged:
+        print("\nMerged (conditions evaluated once):")
+        for entry in merged:
+            rules = ", ".join(f"{r['rule_id']} ({_hop_range(r)})" for r in entry["rules"])
+            print(f"  [{entry['direction']}] {rules}")
+    if gated:
+        print("\nGated (skipped when the broader entry does not match):")
+        for entry in gated:
+            print(f"  [{entry['direction']}] {', '.join(r['rule_id'] for r in entry['rules'])}"
+                  f" <- {', '.join(entry['gated_on'])}")
+
+    mismatches = verification["mismatches"]
+    status = "OK" if not mismatches else f"FAILED ({len(mismatches)} mismatch(es))"
+    print(f"\nEquivalence: {verification['tag_checks']} tag checks, "
+          f"{verification['graph_checks']} graph extractions: {status}")
+    for mismatch in mismatches[:10]:
+        print(f"  {json.dumps(mismatch, ensure_ascii=False, default=sorted)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the optimized rule plan and verify it against per-rule evaluation.")
+    parser.add_argument("rules", nargs="?", default="rules.json", help="Path to rules.json (default: ./rules.json).")
+    parser.add_argument("--graphs", type=int, default=5, help="Synthetic graphs for the graph check (default: 5).")
+    parser.add_argument("--seed", type=int, default=0, help="First synthetic graph seed (default: 0).")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    compiled = _compiled(rules)
+    report = {name: describe_plan(scenario_rules, scenario_rules.plan)
+              for name, scenario_rules in compiled.scenarios.items()}
+    verification = verify(rules, graphs=args.graphs, seed=args.seed)
+
+    if args.json:
+        print(json.dumps({"rules": args.rules, "plans": report, "verification": verification},
+                         indent=2, ensure_ascii=False, default=sorted))
+    else:
+        print_report(args.rules, report, verification)
+    if verification["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,33 @@ Orchestrates the full AML address-screening pipeline:
 2. Extracts risk-relevant paths (1 to 5 hops) by cross-referencing rules.json.
 3. Provides instructions for the final LLM report generation.
 
+Stages 1-2 run in-process via `screen()`, which can also be imported as a library.
+
 Supports --scenario to restrict analysis to a specific business context
 (onboarding, deposit, withdrawal, cdd, monitoring, or all).
+
+Supports --batch FILE (CSV/NDJSON of chain,address,scenario) to screen many
+addresses with concurrent TrustIn tasks (see batch_screening.py).
+
+The requested hops are trimmed to what the scenario's rules can match
+(see hop_planner.py; `--no-hop-plan` fetches them as given).
 """
 
 import argparse
-import subprocess
 import os
-import json
 import sys
-from datetime import datetime
+import time
+from contextlib import nullcontext
+
+from compiled_rules import load_compiled_rules
+from artifact_io import FORMATS
+from fetch_graph import fetch_graph, save_raw_graph as write_raw_graph
+from extract_risk_paths import ENGINES, extract_risk_paths, build_risk_paths_output
+from extract_risk_paths import save_risk_paths as write_risk_paths
+from hop_planner import describe as describe_hop_plan, hop_plan_enabled, plan_hops
+from metrics import NO_METRICS, ScreeningMetrics, write_metrics
+from screening_index import record_safely
+from verdict_engine import evaluate_verdict, verdict_enabled
 
 # ---------------------------------------------------------------------------
 # Default fetch direction per scenario (used when user omits --direction)
@@ -33,23 +50,269 @@ SCENARIO_DIRECTION_DEFAULTS = {
 SCENARIO_CHOICES = list(SCENARIO_DIRECTION_DEFAULTS.keys())
 
 
+class ScreeningError(Exception):
+    """Raised when a screening cannot produce a risk_paths result."""
+
+
+def process_graph(graph, rules, scenario="all", max_depth=5, output_dir=None,
+                  save_raw_graph=True, save_risk_paths=True, extra_fields=None, metrics=None,
+                  engine="python", workers=1, raw_graph_format=None, risk_paths_format=None,
+                  extraction_lock=None, delta=False):
+    """
+    Run extraction on an in-memory raw graph and optionally persist both artifacts.
+
+    `extra_fields` are merged into the risk_paths document before it is written.
+    `metrics` (a ScreeningMetrics) receives extraction and write timings.
+    Screenings that save an artifact are recorded in the screening index
+    (`screening_index.py`) of `output_dir`.
+    The document carries a `verdict` block (verdict_engine.py) unless AMLCLAW_VERDICT=false;
+    `delta` marks a graph of only the paths new since the previous monitoring cycle.
+    `engine` selects the extraction engine ("python" or "numpy") and `workers`
+    the number of extraction processes; `extraction_lock` (optional) is held
+    around extraction, e.g. so concurrent daemon requests do not each start a
+    process pool. `raw_graph_format` / `risk_paths_format`
+    select the file formats (see artifact_io.FORMATS; default from the environment, else json).
+    Returns a dict with the risk_paths document and the written file paths (or None).
+    """
+    metrics = metrics or NO_METRICS
+    with metrics.stage("write"):
+        raw_graph_path = write_raw_graph(graph, output_dir, raw_graph_format) if save_raw_graph else None
+
+    with extraction_lock or nullcontext():
+        started = time.perf_counter()
+        with metrics.stage("extract"):
+            risk_entities, summary, target_findings, target_tags_raw, state = extract_risk_paths(
+                graph, rules, max_depth=max_depth, scenario=scenario, metrics=metrics, engine=engine,
+                workers=workers, return_state=True
+            )
+            output = build_risk_paths_output(graph, scenario, risk_entities, summary, target_findings, target_tags_raw)
+        extract_seconds = time.perf_counter() - started
+    if verdict_enabled():
+        with metrics.stage("verdict"):
+            output["verdict"] = evaluate_verdict(graph, rules, scenario, max_depth, state=state,
+                                                 extracted_rules=summary["rules_triggered"], delta=delta)
+    if extra_fields:
+        output.update(extra_fields)
+    with metrics.stage("write"):
+        risk_paths_path = write_risk_paths(output, raw_graph_path, output_dir, risk_paths_format) if save_risk_paths else None
+
+    if raw_graph_path or risk_paths_path:
+        timings = {name: round(value, 6) for name, value in metrics.values.items() if name.endswith("_seconds")}
+        timings["extract_seconds"] = round(extract_seconds, 6)
+        record_safely(output_dir, "record_screening", graph, output, raw_graph_path, risk_paths_path,
+                      rules_version=getattr(rules, "version", None), timings=timings)
+
+    return {
+        "graph": graph,
+        "risk_paths": output,
+        "raw_graph_path": raw_graph_path,
+        "risk_paths_path": risk_paths_path,
+    }
+
+
+def screen(chain, address, rules, scenario="all", direction=None, inflow_hops=3, outflow_hops=3,
+           max_nodes_per_hop=100, min_timestamp=None, max_timestamp=None, api_key=None,
+           poll_deadline=None, output_dir=None, save_raw_graph=True, save_risk_paths=True,
+           use_cache=True, on_fetched=None, metrics=None, engine="python", workers=1, api=None,
+           raw_graph_format=None, risk_paths_format=None, hop_plan=False, extraction_lock=None):
+    """
+    Library entry point: fetch the graph and extract risk paths in-process.
+
+    The graph is passed to extraction in memory; writing `raw_graph_*` and
+    `risk_paths_*` files to `output_dir` (default: ./graph_data) is optional.
+
+    Args:
+        rules: Loaded rules list (or CompiledRules), or a path to rules.json (loaded via its compiled artifact).
+        on_fetched: Optional callback invoked with the raw graph before extraction.
+        metrics: Optional ScreeningMetrics receiving per-stage timings and counters.
+        engine: Extraction engine, "python" (default) or "numpy" (vectorized).
+        workers: Processes to shard extraction across (identical output; 0 = one per CPU).
+        api: Optional long-lived TrustInAPI client to reuse (see `screening_daemon.py`).
+        raw_graph_format / risk_paths_format: Artifact file formats (see artifact_io.FORMATS).
+        hop_plan: Treat `inflow_hops` / `outflow_hops` as ceilings and fetch only the
+            hops and direction the scenario's rules need (see hop_planner.py).
+        extraction_lock: Optional lock held around extraction (see process_graph()).
+
+    Returns:
+        dict with `graph`, `risk_paths`, `raw_graph_path` and `risk_paths_path`.
+    """
+    if isinstance(rules, str):
+        rules = load_compiled_rules(rules, graph_dir=output_dir)
+    if direction is None:
+        direction = SCENARIO_DIRECTION_DEFAULTS.get(scenario, "all")
+    if hop_plan:
+        plan = plan_hops(rules, scenario, inflow_hops, outflow_hops, direction)
+        direction, inflow_hops, outflow_hops = plan["direction"], plan["inflow_hops"], plan["outflow_hops"]
+
+    graph = fetch_graph(
+        chain=chain,
+        address=address,
+        direction=direction,
+        inflow_hops=inflow_hops,
+        outflow_hops=outflow_hops,
+        max_nodes_per_hop=max_nodes_per_hop,
+        api_key=api_key,
+        min_timestamp=min_timestamp,
+        max_timestamp=max_timestamp,
+        poll_deadline=poll_deadline,
+        scenario=scenario,
+        use_cache=use_cache,
+        metrics=metrics,
+        api=api,
+    )
+    graph_data = graph.get("graph_data") if graph else None
+    if not graph_data:
+        raise ScreeningError("Could not retrieve graph data.")
+    if graph_data.get("fallback"):
+        raise ScreeningError(f"TrustIn API error: {graph_data.get('api_error')}")
+
+    if on_fetched:
+        on_fetched(graph)
+
+    return process_graph(
+        graph, rules,
+        scenario=scenario,
+        max_depth=max(inflow_hops, outflow_hops),
+        output_dir=output_dir,
+        save_raw_graph=save_raw_graph,
+        save_risk_paths=save_risk_paths,
+        metrics=metrics,
+        engine=engine,
+        workers=workers,
+        raw_graph_format=raw_graph_format,
+        risk_paths_format=risk_paths_format,
+        extraction_lock=extraction_lock,
+    )
+
+
+def print_missing_rules(rules_path):
+    print("\n" + "="*60)
+    print("  NO COMPLIANCE RULES FOUND")
+    print("="*60)
+    print(f"\n  rules.json not found at: {rules_path}")
+    print("\n  You need a rules.json policy file before screening.")
+    print("  Use the aml-rule-generator skill to create one:\n")
+    print("  Option 1 (Quick Start - Load regional defaults):")
+    print("    /aml-rule-generator load singapore")
+    print("    /aml-rule-generator load hongkong")
+    print("    /aml-rule-generator load dubai\n")
+    print("  Option 2 (Custom):")
+    print("    /aml-rule-generator\n")
+    print("  This will generate rules.json in your workspace root.")
+    print("="*60 + "\n")
+
+
+def run_batch_mode(args, inflow, outflow):
+    """Screen every entry of --batch with concurrent TrustIn tasks."""
+    from batch_screening import load_batch_entries, run_batch, summarize, write_batch_log
+
+    if not os.path.exists(args.rules_config):
+        print_missing_rules(args.rules_config)
+        sys.exit(1)
+
+    try:
+        jobs = load_batch_entries(args.batch, default_scenario=args.scenario)
+    except (OSError, ValueError) as e:
+        print(f"FAILED: Could not read batch file: {e}")
+        sys.exit(1)
+
+    rules = load_compiled_rules(args.rules_config)
+
+    print("\n" + "="*60)
+    print(f"  Batch: {len(jobs)} address(es) | Concurrency: {args.batch_concurrency}")
+    print("="*60)
+    hops = f"Inflow: {inflow} hops, Outflow: {outflow} hops"
+    if not args.no_hop_plan and hop_plan_enabled():
+        hops = f"up to {hops}, planned per scenario"
+    print(f"\n[BATCH] Submitting and polling TrustIn tasks ({hops})")
+    print("-"*60)
+
+    started = time.monotonic()
+    records, cache_stats = run_batch(
+        jobs, rules,
+        inflow_hops=inflow,
+        outflow_hops=outflow,
+        max_nodes_per_hop=args.max_nodes,
+        min_timestamp=args.min_timestamp,
+        max_timestamp=args.max_timestamp,
+        concurrency=args.batch_concurrency,
+        poll_interval=args.poll_interval,
+        task_timeout=args.poll_deadline,
+        use_cache=not args.no_cache,
+        engine=args.engine,
+        workers=args.workers,
+        raw_graph_format=args.raw_graph_format,
+        risk_paths_format=args.risk_paths_format,
+        hop_plan=not args.no_hop_plan and hop_plan_enabled(),
+    )
+    summary = summarize(records, time.monotonic() - started, cache_stats)
+    log_path = write_batch_log(records, summary)
+
+    print(f"\n[BATCH] Throughput Summary")
+    print("-"*60)
+    print(f"Screened: {summary['succeeded']}/{summary['total']} succeeded, {summary['failed']} failed")
+    if "verdicts_decided" in summary:
+        print(f"Verdicts decided in code: {summary['verdicts_decided']}/{summary['succeeded']}")
+    if "cache" in summary:
+        print(f"Graph cache: {summary['cache']['hits']} hit(s), {summary['cache']['misses']} miss(es)")
+    print(f"Wall time: {summary['wall_seconds']}s | Throughput: {summary['screenings_per_minute']} screenings/min")
+    if "task_seconds_p50" in summary:
+        print(f"Task latency: p50 {summary['task_seconds_p50']}s | mean {summary['task_seconds_mean']}s | max {summary['task_seconds_max']}s")
+    print(f"\nPer-address results: `{log_path}`")
+    if args.metrics:
+        write_metrics([r["metrics"] for r in records], args.metrics)
+        print(f"Stage metrics: `{args.metrics}`")
+    if summary["failed"]:
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run full AML screening pipeline (Fetch -> Extract).")
-    parser.add_argument("chain", help="Blockchain network (e.g., Tron, Ethereum)")
-    parser.add_argument("address", help="Address to investigate")
+    parser.add_argument("chain", nargs="?", help="Blockchain network (e.g., Tron, Ethereum)")
+    parser.add_argument("address", nargs="?", help="Address to investigate")
     parser.add_argument("--direction", choices=["inflow", "outflow", "all"], default=None,
                         help="Trace direction (auto-set by scenario if omitted)")
     parser.add_argument("--scenario", choices=SCENARIO_CHOICES, default="all",
                         help="Business scenario filter (default: all)")
     parser.add_argument("--inflow-hops", type=int, default=3, help="Inflow hop depth")
     parser.add_argument("--outflow-hops", type=int, default=3, help="Outflow hop depth")
+    parser.add_argument("--no-hop-plan", action="store_true",
+                        help="Fetch the requested hops as given instead of only those the scenario's rules need")
     parser.add_argument("--max-nodes", type=int, default=100, help="Max nodes per hop")
     parser.add_argument("--min-timestamp", type=int, help="Min timestamp (ms)")
     parser.add_argument("--max-timestamp", type=int, help="Max timestamp (ms)")
     parser.add_argument("--rules-config", default=os.path.join(os.getcwd(), "rules.json"), help="Path to rules.json")
     parser.add_argument("--max-depth", type=int, help="Deprecated (use --inflow-hops/--outflow-hops)")
+    parser.add_argument("--poll-deadline", type=float,
+                        help="Max seconds to wait for each TrustIn task (default: 60)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the local TrustIn graph cache and always submit a fresh task")
+    parser.add_argument("--no-raw-graph", action="store_true",
+                        help="Do not write raw_graph_* (risk_paths_* is still written)")
+    parser.add_argument("--raw-graph-format", choices=FORMATS,
+                        help="raw_graph file format (default: AMLCLAW_RAW_GRAPH_FORMAT or json)")
+    parser.add_argument("--risk-paths-format", choices=FORMATS,
+                        help="risk_paths file format (default: AMLCLAW_RISK_PATHS_FORMAT or json)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Monitoring only: screen just the time slice and paths new since the last cycle")
+    parser.add_argument("--batch", help="CSV/NDJSON file of chain,address,scenario entries to screen concurrently")
+    parser.add_argument("--batch-concurrency", type=int, default=20,
+                        help="Max TrustIn tasks in flight in batch mode (default: 20)")
+    parser.add_argument("--poll-interval", type=float, default=None,
+                        help="Poll each batch task every N seconds instead of the adaptive poll policy")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="Extraction engine: python (default) or numpy (vectorized, needs NumPy)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to shard path extraction across (default: 1, 0 = one per CPU)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Export per-stage timings: append NDJSON, or write a Prometheus textfile if PATH ends in .prom")
     args = parser.parse_args()
 
+    if not args.batch and not (args.chain and args.address):
+        parser.error("chain and address are required unless --batch is given")
+    if args.incremental and (args.scenario != "monitoring" or args.batch):
+        parser.error("--incremental requires --scenario monitoring and a single address")
+
     # Handle legacy --max-depth
     if args.max_depth is not None:
         inflow = outflow = args.max_depth
@@ -70,109 +333,114 @@ def main():
     except Exception:
         pass  # Never block screening for update check
 
+    if args.batch:
+        run_batch_mode(args, inflow, outflow)
+        return
+
     scenario_label = args.scenario.upper()
 
+    rules_path = args.rules_config
+    if not os.path.exists(rules_path):
+        print_missing_rules(rules_path)
+        sys.exit(1)
+    rules = load_compiled_rules(rules_path)
+
+    plan = None
+    if not args.no_hop_plan and hop_plan_enabled():
+        plan = plan_hops(rules, args.scenario, inflow, outflow, direction)
+        direction, inflow, outflow = plan["direction"], plan["inflow_hops"], plan["outflow_hops"]
+
     print("\n" + "="*60)
     print(f"  Scenario: {scenario_label} | Direction: {direction.upper()}")
     print("="*60)
 
     print(f"\n[STEP 1/3] Fetching Raw Graph (Inflow: {inflow} hops, Outflow: {outflow} hops)")
     print("-"*60)
+    if plan is not None:
+        print(f"Hop plan: {describe_hop_plan(plan)}")
+    print(f"📡 Fetching Graph for {args.chain} - {args.address}...")
+    print(f"   Direction: {direction.upper()} | Inflow: {inflow} hops | Outflow: {outflow} hops | Max Nodes: {args.max_nodes}")
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    fetch_script = os.path.join(script_dir, "fetch_graph.py")
-
-    fetch_cmd = [
-        "python3", fetch_script,
-        args.chain, args.address,
-        "--direction", direction,
-        "--inflow-hops", str(inflow),
-        "--outflow-hops", str(outflow),
-        "--max-nodes", str(args.max_nodes)
-    ]
-    if args.min_timestamp:
-        fetch_cmd.extend(["--min-timestamp", str(args.min_timestamp)])
-    if args.max_timestamp:
-        fetch_cmd.extend(["--max-timestamp", str(args.max_timestamp)])
+    def announce_extraction(graph):
+        print(f"\n[STEP 2/3] Extracting Risk Paths (Scenario: {scenario_label}, Layers 1-{max(inflow, outflow)})")
+        print("-"*60)
 
+    metrics = ScreeningMetrics(args.chain, args.address, args.scenario) if args.metrics else None
     try:
-        subprocess.run(fetch_cmd, check=True)
-    except subprocess.CalledProcessError:
-        print("FAILED: API extraction aborted.")
-        sys.exit(1)
-
-    # Locate the most recently generated raw graph file
-    graph_dir = os.path.join(os.getcwd(), "graph_data")
-    if not os.path.exists(graph_dir):
-        print("FAILED: Directory graph_data/ not found.")
-        sys.exit(1)
-
-    raw_files = sorted([f for f in os.listdir(graph_dir) if f.startswith(f"raw_graph_{args.address}_") and f.endswith(".json")])
-    if not raw_files:
-        print("FAILED: Could not find newly generated raw graph file.")
+        if args.incremental:
+            from incremental_monitoring import screen_incremental
+            result = screen_incremental(
+                args.chain, args.address, rules,
+                scenario=args.scenario,
+                direction=direction,
+                inflow_hops=inflow,
+                outflow_hops=outflow,
+                max_nodes_per_hop=args.max_nodes,
+                poll_deadline=args.poll_deadline,
+                save_raw_graph=not args.no_raw_graph,
+                on_fetched=announce_extraction,
+                metrics=metrics,
+                engine=args.engine,
+                workers=args.workers,
+                raw_graph_format=args.raw_graph_format,
+                risk_paths_format=args.risk_paths_format,
+            )
+        else:
+            result = screen(
+                args.chain, args.address, rules,
+                scenario=args.scenario,
+                direction=direction,
+                inflow_hops=inflow,
+                outflow_hops=outflow,
+                max_nodes_per_hop=args.max_nodes,
+                min_timestamp=args.min_timestamp,
+                max_timestamp=args.max_timestamp,
+                poll_deadline=args.poll_deadline,
+                save_raw_graph=not args.no_raw_graph,
+                use_cache=not args.no_cache,
+                on_fetched=announce_extraction,
+                metrics=metrics,
+                engine=args.engine,
+                workers=args.workers,
+                raw_graph_format=args.raw_graph_format,
+                risk_paths_format=args.risk_paths_format,
+            )
+    except ScreeningError as e:
+        if metrics is not None:
+            write_metrics([metrics.record("failed", error=str(e))], args.metrics)
+        print(f"FAILED: {e}")
         sys.exit(1)
 
-    raw_path = os.path.join(graph_dir, raw_files[-1])
+    if metrics is not None:
+        write_metrics([metrics.record()], args.metrics)
 
-    print(f"\n[STEP 2/3] Extracting Risk Paths (Scenario: {scenario_label}, Layers 1-{max(inflow, outflow)})")
-    print("-"*60)
+    if result["raw_graph_path"]:
+        print(f"Raw Graph JSON saved to: {result['raw_graph_path']}")
 
-    extract_script = os.path.join(script_dir, "extract_risk_paths.py")
-    rules_path = args.rules_config
+    output = result["risk_paths"]
+    risk_path_file = result["risk_paths_path"]
+    target_self_hits = len(output["target"]["self_matched_rules"])
+    print(f"Extracted {len(output['risk_entities'])} unique risk entities (scenario: {output['scenario']}).")
+    if target_self_hits > 0:
+        print(f"  >> Target address self-check: {target_self_hits} rule(s) triggered on target's own tags.")
+    if "incremental" in output:
+        inc = output["incremental"]
+        print(f"  >> Incremental ({inc['mode']}): {inc['paths_new']} new of {inc['paths_fetched']} fetched path(s), "
+              f"{inc['paths_known']} known in total.")
 
-    if not os.path.exists(rules_path):
-        print("\n" + "="*60)
-        print("  NO COMPLIANCE RULES FOUND")
-        print("="*60)
-        print(f"\n  rules.json not found at: {rules_path}")
-        print("\n  You need a rules.json policy file before screening.")
-        print("  Use the aml-rule-generator skill to create one:\n")
-        print("  Option 1 (Quick Start - Load regional defaults):")
-        print("    /aml-rule-generator load singapore")
-        print("    /aml-rule-generator load hongkong")
-        print("    /aml-rule-generator load dubai\n")
-        print("  Option 2 (Custom):")
-        print("    /aml-rule-generator\n")
-        print("  This will generate rules.json in your workspace root.")
-        print("="*60 + "\n")
-        sys.exit(1)
-
-    extract_cmd = [
-        "python3", extract_script,
-        "--graph", raw_path,
-        "--rules", rules_path,
-        "--max-depth", str(max(inflow, outflow)),
-        "--scenario", args.scenario,
-    ]
-
-    try:
-        result = subprocess.run(extract_cmd, capture_output=True, text=True, check=True)
-        # Parse output from extract_risk_paths.py
-        for line in result.stdout.split('\n'):
-            if line.startswith('{"status": "success"'):
-                out_data = json.loads(line)
-                risk_path_file = out_data["output"]
-                path_count = out_data["count"]
-                scenario_used = out_data.get("scenario", "all")
-                target_self_hits = out_data.get("target_self_hits", 0)
-                print(f"Extracted {path_count} unique risk entities (scenario: {scenario_used}).")
-                if target_self_hits > 0:
-                    print(f"  >> Target address self-check: {target_self_hits} rule(s) triggered on target's own tags.")
-                break
-        else:
-            print("Warning: Could not parse exact path count, but extraction completed.")
-            # Fallback path finding
-            risk_files = sorted([f for f in os.listdir(graph_dir) if f.startswith(f"risk_paths_{args.address}_") and f.endswith(".json")])
-            risk_path_file = os.path.join(graph_dir, risk_files[-1]) if risk_files else "UNKNOWN"
-
-    except subprocess.CalledProcessError as e:
-        print("FAILED: Python extraction failed.")
-        print(e.stderr)
-        sys.exit(1)
+    verdict = output.get("verdict")
+    if verdict is not None:
+        state = "decided" if verdict["decided"] else \
+            f"{len(verdict['undetermined'])} rule(s) left for the agent: " + \
+            ", ".join(u["rule_id"] for u in verdict["undetermined"])
+        print(f"Verdict: {verdict['action']} ({state}; {len(verdict['triggered'])} rule(s) triggered)")
 
     print(f"\n[STEP 3/3] AI Agent Evaluation Handoff")
     print("-"*60)
     print("Data extraction is complete! The risk data has been heavily condensed to prevent LLM hallucination and context-loss.")
+    if verdict is not None and verdict["decided"]:
+        print(f"The rules are fully evaluated: the required action is {verdict['action']}. "
+              "The report only documents `verdict` and the evidence.")
     print(f"\nNEXT STEP FOR AI AGENT:")
     print(f"1. Read the parsed risk evidence: `{risk_path_file}`")
     print(f"2. Read the rule framework: `{rules_path}`")
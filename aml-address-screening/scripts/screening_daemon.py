@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+screening_daemon.py
+-------------------
+Long-running screening service for inline use (e.g. in a deposit flow).
+
+Keeps warm what every `run_screening.py` invocation pays for again: interpreter
+start-up and imports, `.env` loading, the update check, the TrustIn HTTP session
+(with its graph cache and latency hints), the parsed `rules.json` and the rule
+schema / TrustIn label tables used to validate it.
+
+`rules.json` is re-checked (mtime + size) on every request and reloaded when it
+changes on disk. A changed file that fails to parse or validate is rejected:
+the previous rules keep serving and the error is reported by `/health`.
+
+Endpoints (JSON bodies and responses):
+    POST /screen   {"chain", "address", "scenario"?, "direction"?, "inflow_hops"?, "outflow_hops"?,
+                    "max_nodes_per_hop"?, "min_timestamp"?, "max_timestamp"?, "save"?}
+                   -> {"status": "success", "rules_version", "elapsed_seconds", "risk_paths": {...}}
+                   `inflow_hops` / `outflow_hops` are ceilings trimmed to what the scenario's
+                   rules need (see hop_planner.py; `--no-hop-plan` fetches them as given);
+                   `risk_paths.verdict` is the action decided in code (see verdict_engine.py)
+    POST /prescreen {"chain", "address", "scenario"?, "max_age"?}
+                   -> {"status": "success", "rules_version", "prescreen": {...}}
+                   target self-tag and hop-1 rules from the local reputation store, without a
+                   TrustIn task (see reputation_store.py; `max_age`: seconds or e.g. "30d")
+    POST /reload   reload rules.json now
+    GET  /health   rules version, reload count and error, screening counters
+
+Listens on 127.0.0.1:8787 by default, or on a unix socket with --socket.
+Set --token (or AMLCLAW_DAEMON_TOKEN) to require `Authorization: Bearer <token>`.
+
+Usage:
+    python3 scripts/screening_daemon.py --rules-config rules.json
+    curl -s localhost:8787/screen -d '{"chain": "Tron", "address": "T...", "scenario": "deposit"}'
+    python3 scripts/screening_daemon.py --socket /tmp/amlclaw-screening.sock
+    curl -s --unix-socket /tmp/amlclaw-screening.sock http://localhost/health
+"""
+import argparse
+import hmac
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from artifact_io import FORMATS, parse_age
+from compiled_rules import RulesValidator, compile_rules_data
+from extract_risk_paths import ENGINES
+from hop_planner import hop_plan_enabled
+from metrics import ScreeningMetrics, write_metrics
+from polling import PollPolicy
+from reputation_store import open_store
+from run_screening import SCENARIO_CHOICES, ScreeningError, screen
+from trustin_api import TrustInAPI
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PORT = 8787
+DIRECTIONS = ("inflow", "outflow", "all")
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BadRequest(ValueError):
+    """Raised for a malformed screening request (HTTP 400)."""
+
+
+class RulesStore:
+    """`rules.json` held compiled in memory and reloaded when the file changes on disk."""
+
+    def __init__(self, path, validator=None):
+        self.path = path
+        self.validator = validator
+        self.rules = None
+        self.version = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.last_error = None
+        self._signature = None
+        self._lock = threading.Lock()
+        if not self.reload():
+            raise ValueError(self.last_error)
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def current(self):
+        """Return `(rules, version)`, reloading first if the file changed."""
+        try:
+            signature = self._stat()
+        except OSError as e:
+            self.last_error = f"Cannot stat {self.path}: {e}"
+            return self.rules, self.version
+        if signature != self._signature:
+            self.reload(signature)
+        return self.rules, self.version
+
+    def reload(self, signature=None):
+        """Load and validate the file; keep the previous rules on failure. Returns True on success."""
+        with self._lock:
+            if signature is not None and signature == self._signature:
+                return True  # Another request already reloaded this version
+            try:
+                signature = signature or self._stat()
+                with open(self.path, "rb") as f:
+                    raw = f.read()
+                rules = compile_rules_data(raw, self.validator)
+                if rules.errors:
+                    raise ValueError(f"{len(rules.errors)} validation error(s), first: {rules.errors[0]}")
+            except (OSError, ValueError) as e:
+                # Remember the rejected version so it is not re-parsed on every request
+                self._signature = signature
+                self.last_error = f"Rejected {self.path}: {e}"
+                print(f"[RULES] {self.last_error}", flush=True)
+                return False
+
+            reloaded = self.rules is not None
+            self.rules = rules
+            self.version = rules.version
+            self.loaded_at = datetime.now().isoformat()
+            self._signature = signature
+            self.last_error = None
+            if reloaded:
+                self.reloads += 1
+            print(f"[RULES] Loaded {len(rules)} rule(s) from {self.path} (version {self.version})", flush=True)
+            return True
+
+    def status(self):
+        return {
+            "path": self.path,
+            "version": self.version,
+            "rules": len(self.rules) if self.rules is not None else 0,
+            "loaded_at": self.loaded_at,
+            "reloads": self.reloads,
+            "validated": self.validator is not None,
+            "last_error": self.last_error,
+        }
+
+
+def _int_field(request, name, default=None):
+    value = request.get(name, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise BadRequest(f"'{name}' must be an integer")
+    return value
+
+
+def _target_fields(request):
+    """Validated `(chain, address, scenario)` of a request body."""
+    if not isinstance(request, dict):
+        raise BadRequest("Request body must be a JSON object")
+    chain = request.get("chain")
+    address = request.get("address")
+    if not isinstance(chain, str) or not chain or not isinstance(address, str) or not address:
+        raise BadRequest("'chain' and 'address' are required")
+    scenario = request.get("scenario", "all")
+    if scenario not in SCENARIO_CHOICES:
+        raise BadRequest(f"Unknown scenario '{scenario}' (choose from {', '.join(SCENARIO_CHOICES)})")
+    return chain, address, scenario
+
+
+class ScreeningService:
+    """Screens requests with the warm TrustIn client and rules store."""
+
+    def __init__(self, rules, api, output_dir=None, engine="python", workers=1, metrics_path=None, token=None,
+                 raw_graph_format=None, risk_paths_format=None, hop_plan=False):
+        self.rules = rules
+        self.api = api
+        self.output_dir = output_dir
+        self.raw_graph_format = raw_graph_format
+        self.risk_paths_format = risk_paths_format
+        self.engine = engine
+        self.workers = workers
+        self.hop_plan = hop_plan
+        self.metrics_path = metrics_path
+        self.token = token
+        self.started_at = datetime.now().isoformat()
+        self.counters = {"success": 0, "failed": 0, "rejected": 0}
+        self._lock = threading.Lock()
+        # Sharded extractions run one at a time: each starts a pool of `workers` processes
+        self._extraction_lock = threading.Lock() if workers != 1 else None
+
+    def count(self, status):
+        with self._lock:
+            self.counters[status] = self.counters.get(status, 0) + 1
+
+    def health(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "status": "ok",
+            "started_at": self.started_at,
+            "rules": self.rules.status(),
+            "screenings": counters,
+            "graph_cache": self.api.cache.stats() if self.api.cache is not None else None,
+        }
+
+    def screen(self, request):
+        """Run one screening request; raises BadRequest or ScreeningError."""
+        chain, address, scenario = _target_fields(request)
+        direction = request.get("direction")
+        if direction is not None and direction not in DIRECTIONS:
+            raise BadRequest(f"Unknown direction '{direction}' (choose from {', '.join(DIRECTIONS)})")
+        inflow_hops = _int_field(request, "inflow_hops", 3)
+        outflow_hops = _int_field(request, "outflow_hops", 3)
+        max_nodes_per_hop = _int_field(request, "max_nodes_per_hop", 100)
+        min_timestamp = _int_field(request, "min_timestamp")
+        max_timestamp = _int_field(request, "max_timestamp")
+        save = bool(request.get("save", False))
+
+        rules, version = self.rules.current()
+        metrics = ScreeningMetrics(chain, address, scenario) if self.metrics_path else None
+        started = time.perf_counter()
+        try:
+            result = screen(
+                chain, address, rules,
+                scenario=scenario,
+                direction=direction,
+                inflow_hops=inflow_hops,
+                outflow_hops=outflow_hops,
+                max_nodes_per_hop=max_nodes_per_hop,
+                min_timestamp=min_timestamp,
+                max_timestamp=max_timestamp,
+                output_dir=self.output_dir,
+                save_raw_graph=save,
+                save_risk_paths=save,
+                raw_graph_format=self.raw_graph_format,
+                risk_paths_format=self.risk_paths_format,
+                metrics=metrics,
+                engine=self.engine,
+                workers=self.workers,
+                api=self.api,
+                hop_plan=self.hop_plan,
+                extraction_lock=self._extraction_lock,
+            )
+        except ScreeningError as e:
+            if metrics is not None:
+                write_metrics([metrics.record("failed", error=str(e))], self.metrics_path)
+            raise
+        if metrics is not None:
+            write_metrics([metrics.record()], self.metrics_path)
+
+        response = {
+            "status": "success",
+            "rules_version": version,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "risk_paths": result["risk_paths"],
+        }
+        if save:
+            response["raw_graph_path"] = result["raw_graph_path"]
+            response["risk_paths_path"] = result["risk_paths_path"]
+        return response
+
+    def prescreen(self, request):
+        """Answer a request from the reputation store alone (no TrustIn task); raises BadRequest."""
+        chain, address, scenario = _target_fields(request)
+        max_age = request.get("max_age")
+        if max_age is not None:
+            try:
+                max_age = parse_age(max_age) if isinstance(max_age, str) else float(max_age)
+            except (TypeError, ValueError):
+                raise BadRequest("'max_age' must be seconds or an age such as \"30d\"")
+        store = open_store(create=False)
+        if store is None:
+            raise BadRequest("The reputation store is disabled or has not been filled yet")
+        rules, version = self.rules.current()
+        return {
+            "status": "success",
+            "rules_version": version,
+            "prescreen": store.prescreen(chain, address, rules, scenario, max_age),
+        }
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    server_version = "AMLClawScreening/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> ScreeningService:
+        return self.server.service
+
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        pass  # Screenings are logged once in do_POST
+
+    def _send_json(self, body, status=200):
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _authorized(self):
+        token = self.service.token
+        if not token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return True
+        self._send_json({"status": "failed", "error": "Unauthorized"}, status=401)
+        return False
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise BadRequest("Request body too large")
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body.decode("utf-8") or "{}")
+        except ValueError:
+            raise BadRequest("Request body is not valid JSON")
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path.split("?", 1)[0] == "/health":
+            self._send_json(self.service.health())
+        else:
+            self._send_json({"status": "failed", "error": "Not found"}, status=404)
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        path = self.path.split("?", 1)[0]
+        service = self.service
+
+        if path == "/reload":
+            ok = service.rules.reload()
+            self._send_json({"status": "success" if ok else "failed", "rules": service.rules.status()},
+                            status=200 if ok else 422)
+            return
+        if path == "/prescreen":
+            try:
+                response = service.prescreen(self._read_json())
+            except BadRequest as e:
+                self._send_json({"status": "failed", "error": str(e)}, status=400)
+                return
+            self._send_json(response)
+            return
+        if path != "/screen":
+            self._send_json({"status": "failed", "error": "Not found"}, status=404)
+            return
+
+        started = time.perf_counter()
+        label = "?"
+        try:
+            request = self._read_json()
+            if isinstance(request, dict):
+                label = f"{request.get('scenario', 'all')} {request.get('chain')} {request.get('address')}"
+            response = service.screen(request)
+        except BadRequest as e:
+            service.count("rejected")
+            self._send_json({"status": "failed", "error": str(e)}, status=400)
+            return
+        except ScreeningError as e:
+            service.count("failed")
+            print(f"[SCREEN] FAILED {label}: {e}", flush=True)
+            self._send_json({"status": "failed", "error": str(e)}, status=502)
+            return
+        except Exception as e:
+            service.count("failed")
+            print(f"[SCREEN] ERROR {label}: {e}", flush=True)
+            self._send_json({"status": "failed", "error": f"Internal error: {e}"}, status=500)
+            return
+
+        service.count("success")
+        count = len(response["risk_paths"].get("risk_entities", []))
+        verdict = response["risk_paths"].get("verdict")
+        action = f", {verdict['action']}{'' if verdict['decided'] else ' (undecided)'}" if verdict else ""
+        print(f"[SCREEN] OK {label}: {count} risk entities{action} in {time.perf_counter() - started:.3f}s", flush=True)
+        self._send_json(response)
+
+
+class TCPDaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, DaemonHandler)
+        self.service = service
+
+
+class UnixDaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Stale socket from a previous run
+        super().__init__(socket_path, DaemonHandler)
+        self.service = service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running AML screening daemon with warm state.")
+    parser.add_argument("--rules-config", default=os.path.join(os.getcwd(), "rules.json"),
+                        help="Path to rules.json (reloaded when it changes on disk)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="Listen on this unix socket instead of TCP")
+    parser.add_argument("--output-dir", help="Directory for raw_graph/risk_paths files of requests with \"save\": true")
+    parser.add_argument("--raw-graph-format", choices=FORMATS,
+                        help="raw_graph file format (default: AMLCLAW_RAW_GRAPH_FORMAT or json)")
+    parser.add_argument("--risk-paths-format", choices=FORMATS,
+                        help="risk_paths file format (default: AMLCLAW_RISK_PATHS_FORMAT or json)")
+    parser.add_argument("--poll-deadline", type=float,
+                        help="Seconds to wait for a TrustIn task before giving up (default: 60)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local graph cache")
+    parser.add_argument("--no-hop-plan", action="store_true",
+                        help="Fetch the requested hops as given instead of only those the scenario's rules need")
+    parser.add_argument("--no-validate", action="store_true",
+                        help="Skip schema/label validation of rules.json on (re)load")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="Extraction engine: python (default) or numpy (vectorized, needs NumPy)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to shard path extraction across (default: 1, 0 = one per CPU); "
+                             "sharded extractions of concurrent requests run one at a time")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Export per-stage timings: append NDJSON, or write a Prometheus textfile if PATH ends in .prom")
+    parser.add_argument("--token", default=os.getenv("AMLCLAW_DAEMON_TOKEN"),
+                        help="Require 'Authorization: Bearer TOKEN' (default: AMLCLAW_DAEMON_TOKEN)")
+    args = parser.parse_args()
+
+    # --- Update check (once, non-blocking) ---
+    try:
+        sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "..", "scripts"))
+        from check_update import check_for_updates
+        check_for_updates(quiet=True)
+    except Exception:
+        pass  # Never block the daemon for update check
+
+    try:
+        poll_policy = PollPolicy(deadline=args.poll_deadline) if args.poll_deadline else None
+        api = TrustInAPI(poll_policy=poll_policy, use_cache=not args.no_cache)
+    except ValueError as e:
+        print(f"FAILED: {e}")
+        sys.exit(1)
+
+    validator = None if args.no_validate else RulesValidator.load()
+    try:
+        rules = RulesStore(args.rules_config, validator)
+    except ValueError as e:
+        print(f"FAILED: {e}")
+        sys.exit(1)
+
+    service = ScreeningService(rules, api, output_dir=args.output_dir, engine=args.engine,
+                               workers=args.workers, metrics_path=args.metrics, token=args.token,
+                               raw_graph_format=args.raw_graph_format, risk_paths_format=args.risk_paths_format,
+                               hop_plan=not args.no_hop_plan and hop_plan_enabled())
+    if args.socket:
+        server = UnixDaemonServer(args.socket, service)
+        where = f"unix:{args.socket}"
+    else:
+        server = TCPDaemonServer((args.host, args.port), service)
+        where = f"http://{args.host}:{server.server_address[1]}"
+    print(f"Screening daemon listening on {where} (rules version {rules.version})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+screening_index.py
+------------------
+Local SQLite index of screenings (`graph_data/screenings.sqlite`), so artifact
+lookups and "latest screening of address X" are indexed queries instead of
+`graph_data/` directory scans.
+
+One row per screening: chain, address, scenario, direction, hops, time window,
+the `raw_graph_*` / `risk_paths_*` paths, rules version, verdict summary
+(highest severity, rules triggered, risk entity count, target self-hits) and
+stage timings. Rows are written by `process_graph()` (single, batch,
+incremental and daemon screenings that save artifacts) and by the
+`fetch_graph.py` / `extract_risk_paths.py` CLIs; an extraction of a fetched
+raw graph completes that fetch's row.
+
+The database uses WAL mode and a busy timeout, so overlapping screenings from
+several processes each insert their own row without blocking readers.
+`artifact_io.py compact` / `prune` keep the artifact paths in sync.
+
+Opt-out: set AMLCLAW_SCREENING_INDEX=false.
+Location: AMLCLAW_SCREENING_INDEX_PATH (default: screenings.sqlite in the artifact directory).
+
+Usage:
+    python3 scripts/screening_index.py latest <ADDRESS> [--chain Tron] [--scenario deposit]
+    python3 scripts/screening_index.py history <ADDRESS> --limit 10
+    python3 scripts/screening_index.py rebuild graph_data
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+INDEX_FILENAME = "screenings.sqlite"
+
+# Bump when the table layout changes; older databases are migrated by rebuilding the table
+SCHEMA_VERSION = 1
+
+COLUMNS = (
+    "screened_at", "chain", "address", "scenario", "direction",
+    "inflow_hops", "outflow_hops", "max_nodes_per_hop", "min_timestamp_ms", "max_timestamp_ms",
+    "raw_graph_path", "risk_paths_path", "rules_version", "status",
+    "risk_entities", "highest_severity", "rules_triggered", "target_self_hits", "timings",
+)
+# Columns holding JSON-encoded values
+_JSON_COLUMNS = ("rules_triggered", "timings")
+
+_SCHEMA = (
+    """
+CREATE TABLE screenings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    screened_at TEXT NOT NULL,
+    chain TEXT,
+    address TEXT NOT NULL,
+    scenario TEXT,
+    direction TEXT,
+    inflow_hops INTEGER,
+    outflow_hops INTEGER,
+    max_nodes_per_hop INTEGER,
+    min_timestamp_ms INTEGER,
+    max_timestamp_ms INTEGER,
+    raw_graph_path TEXT,
+    risk_paths_path TEXT,
+    rules_version TEXT,
+    status TEXT NOT NULL,
+    risk_entities INTEGER,
+    highest_severity TEXT,
+    rules_triggered TEXT,
+    target_self_hits INTEGER,
+    timings TEXT
+)""",
+    "CREATE INDEX idx_screenings_address ON screenings (address, screened_at)",
+    "CREATE INDEX idx_screenings_raw_graph ON screenings (raw_graph_path)",
+    "CREATE INDEX idx_screenings_risk_paths ON screenings (risk_paths_path)",
+)
+
+
+def index_enabled() -> bool:
+    return os.environ.get("AMLCLAW_SCREENING_INDEX", "").lower() != "false"
+
+
+def index_path(graph_dir=None) -> str:
+    return os.getenv("AMLCLAW_SCREENING_INDEX_PATH") or os.path.join(
+        graph_dir or os.path.join(os.getcwd(), "graph_data"), INDEX_FILENAME)
+
+
+def _abspath(path):
+    return os.path.abspath(path) if path else None
+
+
+def graph_fields(graph):
+    """Index columns describing the fetch of a `fetch_graph()` result."""
+    hops = graph.get("hops_requested") or {}
+    parameters = graph.get("parameters") or {}
+    return {
+        "chain": graph.get("chain"),
+        "address": graph.get("address"),
+        "direction": graph.get("direction"),
+        "inflow_hops": hops.get("inflow"),
+        "outflow_hops": hops.get("outflow"),
+        "max_nodes_per_hop": parameters.get("max_nodes_per_hop"),
+        "min_timestamp_ms": parameters.get("min_timestamp_ms"),
+        "max_timestamp_ms": parameters.get("max_timestamp_ms"),
+    }
+
+
+def verdict_fields(output):
+    """Index columns summarizing a risk_paths document."""
+    summary = output.get("summary") or {}
+    target = output.get("target") or {}
+    return {
+        "chain": target.get("chain"),
+        "address": target.get("address"),
+        "scenario": output.get("scenario"),
+        "risk_entities": len(output.get("risk_entities") or ()),
+        "highest_severity": summary.get("highest_severity"),
+        "rules_triggered": summary.get("rules_triggered", []),
+        "target_self_hits": len(target.get("self_matched_rules") or ()),
+    }
+
+
+class ScreeningIndex:
+    """Connection to one screenings database (thread-safe; one per path via `open_index()`)."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._schema_version() != SCHEMA_VERSION:
+            with self._transaction():
+                # Re-checked under the write lock: another process may have just created it
+                if self._schema_version() != SCHEMA_VERSION:
+                    self._conn.execute("DROP TABLE IF EXISTS screenings")
+                    for statement in _SCHEMA:
+                        self._conn.execute(statement)
+                    self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def _schema_version(self):
+        return self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Writes -----------------------------------------------------------
+
+    @staticmethod
+    def _row(fields):
+        row = {column: fields.get(column) for column in COLUMNS}
+        row["screened_at"] = row["screened_at"] or datetime.now().isoformat()
+        row["raw_graph_path"] = _abspath(row["raw_graph_path"])
+        row["risk_paths_path"] = _abspath(row["risk_paths_path"])
+        for column in _JSON_COLUMNS:
+            if row[column] is not None:
+                row[column] = json.dumps(row[column], ensure_ascii=False, separators=(",", ":"))
+        return row
+
+    def insert(self, **fields):
+        """Insert one screening row (see COLUMNS); returns its id."""
+        row = self._row(fields)
+        placeholders = ", ".join(f":{c}" for c in COLUMNS)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"INSERT INTO screenings ({', '.join(COLUMNS)}) VALUES ({placeholders})", row)
+        return cursor.lastrowid
+
+    def record_screening(self, graph, output, raw_graph_path=None, risk_paths_path=None, rules_version=None,
+                         timings=None):
+        """Index a completed screening (fetch + extraction)."""
+        return self.insert(**{**verdict_fields(output), **graph_fields(graph)}, status="success",
+                           raw_graph_path=raw_graph_path, risk_paths_path=risk_paths_path,
+                           rules_version=rules_version, timings=timings)
+
+    def record_fetch(self, graph, raw_graph_path):
+        """Index a fetched raw graph that has not been extracted yet."""
+        return self.insert(**graph_fields(graph), status="fetched", raw_graph_path=raw_graph_path)
+
+    def record_extraction(self, output, raw_graph_path, risk_paths_path, rules_version=None, timings=None):
+        """
+        Complete the `fetched` row of `raw_graph_path` with an extraction's verdict,
+        or insert a new row when there is none (e.g. a re-extraction).
+        """
+        row = self._row({**verdict_fields(output), "status": "success", "risk_paths_path": risk_paths_path,
+                         "rules_version": rules_version, "timings": timings})
+        updates = ("scenario", "risk_paths_path", "rules_version", "status", "risk_entities",
+                   "highest_severity", "rules_triggered", "target_self_hits", "timings")
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE screenings SET {', '.join(f'{c} = :{c}' for c in updates)} "
+                "WHERE id = (SELECT id FROM screenings WHERE raw_graph_path = :raw "
+                "AND status = 'fetched' ORDER BY id DESC LIMIT 1)",
+                dict(row, raw=_abspath(raw_graph_path)))
+        if cursor.rowcount:
+            return None
+        return self.insert(**verdict_fields(output), status="success", raw_graph_path=raw_graph_path,
+                           risk_paths_path=risk_paths_path, rules_version=rules_version, timings=timings)
+
+    def rename_artifact(self, old_path, new_path):
+        """Point rows at an artifact's new path (after compaction)."""
+        old_path, new_path = _abspath(old_path), _abspath(new_path)
+        with self._lock, self._transaction():
+            for column in ("raw_graph_path", "risk_paths_path"):
+                self._conn.execute(f"UPDATE screenings SET {column} = ? WHERE {column} = ?", (new_path, old_path))
+
+    def forget_artifact(self, path):
+        """Clear an artifact's path from its rows (after deletion); the verdict rows are kept."""
+        self.rename_artifact(path, None)
+
+    # --- Queries ----------------------------------------------------------
+
+    @staticmethod
+    def _decode(row):
+        if row is None:
+            return None
+        record = dict(row)
+        for column in _JSON_COLUMNS:
+            if record[column] is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def history(self, address, chain=None, scenario=None, limit=20, status=None):
+        """Screenings of `address`, newest first."""
+        query = "SELECT * FROM screenings WHERE address = ?"
+        params = [address]
+        for column, value in (("chain", chain), ("scenario", scenario), ("status", status)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        query += " ORDER BY screened_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def latest(self, address, chain=None, scenario=None, status="success"):
+        """Most recent screening of `address` (None if never screened)."""
+        rows = self.history(address, chain=chain, scenario=scenario, limit=1, status=status)
+        return rows[0] if rows else None
+
+    def by_artifact(self, path):
+        """Row owning a raw_graph or risk_paths file (None if not indexed)."""
+        path = _abspath(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM screenings WHERE raw_graph_path = ? OR risk_paths_path = ? "
+                "ORDER BY id DESC LIMIT 1", (path, path)).fetchone()
+        return self._decode(row)
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM screenings").fetchone()[0]
+
+    # --- Rebuild ----------------------------------------------------------
+
+    def rebuild(self, graph_dir):
+        """Re-create the index from the artifacts in `graph_dir` (timings are not recoverable). Returns row count."""
+        from artifact_io import iter_artifacts, load_artifact
+        from graph_stream import read_graph_header
+
+        raw_graphs, risk_paths = {}, {}
+        for path, kind, stem, _, stat in iter_artifacts(graph_dir, ("raw_graph", "risk_paths")):
+            (raw_graphs if kind == "raw_graph" else risk_paths)[stem] = (path, stat.st_mtime)
+
+        rows = []
+        for stem in sorted(set(raw_graphs) | set(risk_paths)):
+            raw_path, raw_mtime = raw_graphs.get(stem, (None, None))
+            risk_path, risk_mtime = risk_paths.get(stem, (None, None))
+            try:
+                fields = graph_fields(read_graph_header(raw_path)) if raw_path else {}
+                if risk_path:
+                    for key, value in verdict_fields(load_artifact(risk_path)).items():
+                        if value is not None or key not in fields:
+                            fields[key] = value
+            except (OSError, ValueError, EOFError) as e:
+                print(f"Warning: skipping {stem}: {e}", file=sys.stderr)
+                continue
+            if not fields.get("address"):
+                continue
+            mtime = raw_mtime if raw_mtime is not None else risk_mtime
+            fields.update(screened_at=datetime.fromtimestamp(mtime).isoformat(),
+                          status="success" if risk_path else "fetched",
+                          raw_graph_path=raw_path, risk_paths_path=risk_path)
+            rows.append(self._row(fields))
+
+        placeholders = ", ".join(f":{c}" for c in COLUMNS)
+        with self._lock, self._transaction():
+            self._conn.execute("DELETE FROM screenings")
+            self._conn.executemany(
+                f"INSERT INTO screenings ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+        return len(rows)
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def open_index(graph_dir=None, create=True):
+    """
+    Shared `ScreeningIndex` for an artifact directory, or None when the index
+    is disabled (or does not exist and `create` is False).
+    """
+    if not index_enabled():
+        return None
+    path = os.path.abspath(index_path(graph_dir))
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(path)
+        if index is None:
+            if not create and not os.path.exists(path):
+                return None
+            index = _INDEXES[path] = ScreeningIndex(path)
+    return index
+
+
+def record_safely(graph_dir, method, *args, **kwargs):
+    """Call an index write without ever failing the screening it describes."""
+    try:
+        index = open_index(graph_dir)
+        if index is not None:
+            return getattr(index, method)(*args, **kwargs)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: screening index not updated: {e}", file=sys.stderr)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or rebuild the local screenings index.")
+    parser.add_argument("--index", help="Index file (default: AMLCLAW_SCREENING_INDEX_PATH or graph_data/screenings.sqlite)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("latest", "history"):
+        p = sub.add_parser(name, help=f"{name.capitalize()} screening(s) of an address")
+        p.add_argument("address")
+        p.add_argument("--chain")
+        p.add_argument("--scenario")
+        if name == "history":
+            p.add_argument("--limit", type=int, default=20)
+    p_rebuild = sub.add_parser("rebuild", help="Re-create the index from the artifacts of a directory")
+    p_rebuild.add_argument("directory", nargs="?", default="graph_data")
+    args = parser.parse_args()
+
+    graph_dir = getattr(args, "directory", None)
+    path = args.index or index_path(graph_dir)
+    if args.command == "rebuild" and not os.path.isdir(graph_dir):
+        print(json.dumps({"status": "failed", "error": f"Directory not found: {graph_dir}"}))
+        sys.exit(1)
+    if args.command != "rebuild" and not os.path.exists(path):
+        print(json.dumps({"status": "failed", "error": f"Index not found: {path}"}))
+        sys.exit(1)
+
+    index = ScreeningIndex(path)
+    if args.command == "rebuild":
+        print(json.dumps({"status": "success", "index": index.path, "rows": index.rebuild(graph_dir)}))
+    elif args.command == "latest":
+        row = index.latest(args.address, chain=args.chain, scenario=args.scenario)
+        print(json.dumps(row, indent=2, ensure_ascii=False))
+        if row is None:
+            sys.exit(1)
+    else:
+        rows = index.history(args.address, chain=args.chain, scenario=args.scenario, limit=args.limit)
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
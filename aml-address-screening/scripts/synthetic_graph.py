@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+synthetic_graph.py
+------------------
+Generates synthetic TrustIn graphs in the exact shape `fetch_graph.py` saves and
+`extract_risk_paths()` consumes (`graph_data.data.tags` / `graph_data.data.paths`).
+
+Knobs:
+    hops           inflow / outflow depth of the generated paths
+    nodes_per_hop  distinct addresses available at each hop (TrustIn's max_nodes_per_hop)
+    paths          paths generated per direction
+    tag_density    fraction of addresses that carry TrustIn labels
+    overlap        probability that a path reuses an address already seen at that hop
+                   (0 = every path is disjoint, close to 1 = exchange-heavy graphs)
+
+Labels are drawn from `aml-rule-generator/references/Trustin AML labels.md`, so
+the bundled rule packs match a realistic share of nodes. The graph data is
+fully determined by `seed`.
+
+Usage:
+    python3 scripts/synthetic_graph.py --hops 5 --nodes-per-hop 200 --paths 5000 --overlap 0.8 -o graph.json
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime
+
+from fetch_graph import build_graph_response, default_time_window
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+LABELS_PATH = os.path.join(REPO_ROOT, "aml-rule-generator", "references", "Trustin AML labels.md")
+
+# Labels table risk column -> (tag risk_level, tag priority)
+RISK_LEVELS = {
+    "严重": ("severe", 1),
+    "高风险": ("high", 2),
+    "中风险": ("medium", 3),
+    "低风险": ("low", 4),
+}
+
+# Used when the labels reference file is not available
+FALLBACK_LABELS = [
+    ("Sanctions", "Sanctioned Entity", "severe", 1),
+    ("Cybercrime", "Phishing", "high", 2),
+    ("Obfuscation", "Mixers", "high", 2),
+    ("Gambling", "Unlicensed Gambling", "medium", 3),
+    ("Exchange", "Centralized Exchange", "low", 4),
+]
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+def load_label_catalog(labels_path=LABELS_PATH):
+    """Return (primary, secondary, risk_level, priority) tuples from the TrustIn labels table."""
+    if not os.path.exists(labels_path):
+        return list(FALLBACK_LABELS)
+
+    catalog = []
+    with open(labels_path, "r", encoding="utf-8") as f:
+        for line in f:
+            cols = [c.strip() for c in line.strip().split("|")]
+            # cols: ['', primary_en, primary_cn, secondary_en, secondary_cn, risk, '']
+            if len(cols) < 7:
+                continue
+            risk = RISK_LEVELS.get(cols[5].strip("*").strip())
+            if risk and cols[1] and cols[3]:
+                catalog.append((cols[1], cols[3], risk[0], risk[1]))
+    return catalog or list(FALLBACK_LABELS)
+
+
+def random_address(rng, chain="Tron"):
+    if chain.lower() == "tron":
+        return "T" + "".join(rng.choice(_BASE58) for _ in range(33))
+    return "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40))
+
+
+def random_tags(rng, catalog, max_tags=3):
+    tags = []
+    for primary, secondary, risk_level, priority in rng.sample(catalog, rng.randint(1, min(max_tags, len(catalog)))):
+        tags.append({
+            "primary_category": primary,
+            "secondary_category": secondary,
+            "tertiary_category": "",
+            "quaternary_category": "",
+            "risk_level": risk_level,
+            "priority": priority,
+        })
+    return tags
+
+
+class _HopLayer:
+    """Addresses available at one (direction, hop) position."""
+
+    def __init__(self):
+        self.nodes = []
+
+    def pick(self, rng, capacity, overlap, new_node):
+        if self.nodes and (len(self.nodes) >= capacity or rng.random() < overlap):
+            return rng.choice(self.nodes)
+        node = new_node()
+        self.nodes.append(node)
+        return node
+
+
+def generate_trustin_data(address, chain="Tron", inflow_hops=3, outflow_hops=3, nodes_per_hop=100,
+                          paths=None, tag_density=0.3, overlap=0.5, seed=0, catalog=None):
+    """
+    Generate the TrustIn get_result `data` object: `{"tags": [...], "paths": [...]}`.
+
+    Inflow paths are ordered [source(far), ..., target], outflow paths
+    [target, ..., destination(far)], like the live API.
+    """
+    rng = random.Random(seed)
+    catalog = catalog or load_label_catalog()
+    paths = nodes_per_hop if paths is None else paths
+
+    def new_node():
+        tags = random_tags(rng, catalog) if rng.random() < tag_density else []
+        return random_address(rng, chain), tags
+
+    def make_node(addr, tags, deep):
+        return {
+            "address": addr,
+            "amount": round(rng.lognormvariate(7, 2), 2),
+            "tags": tags,
+            "deep": deep,
+        }
+
+    target_tags = random_tags(rng, catalog) if rng.random() < tag_density else []
+    result_paths = []
+    for direction, hops in ((-1, inflow_hops), (1, outflow_hops)):
+        if hops <= 0:
+            continue
+        layers = [_HopLayer() for _ in range(hops)]
+        for _ in range(paths):
+            length = rng.randint(1, hops)
+            hop_nodes = [
+                make_node(*layers[hop].pick(rng, nodes_per_hop, overlap, new_node), hop + 1)
+                for hop in range(length)
+            ]
+            target = make_node(address, target_tags, 0)
+            if direction == -1:
+                nodes = list(reversed(hop_nodes)) + [target]
+            else:
+                nodes = [target] + hop_nodes
+            result_paths.append({"direction": direction, "path": nodes})
+
+    return {"tags": target_tags, "paths": result_paths}
+
+
+def generate_graph(chain="Tron", address=None, inflow_hops=3, outflow_hops=3, nodes_per_hop=100,
+                   paths=None, tag_density=0.3, overlap=0.5, seed=0, catalog=None):
+    """Generate a complete `fetch_graph()` result around synthetic TrustIn data."""
+    address = address or random_address(random.Random(f"target-{seed}"), chain)
+    start_time = datetime.now()
+    min_timestamp, max_timestamp = default_time_window(start_time)
+    data = generate_trustin_data(address, chain, inflow_hops, outflow_hops, nodes_per_hop,
+                                 paths, tag_density, overlap, seed, catalog)
+    return build_graph_response(
+        chain, address, "all", inflow_hops, outflow_hops, nodes_per_hop,
+        min_timestamp, max_timestamp, start_time, {"code": 0, "msg": "success", "data": data},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic TrustIn graph for testing and benchmarks.")
+    parser.add_argument("--chain", default="Tron")
+    parser.add_argument("--address", default=None, help="Target address (default: random for the seed).")
+    parser.add_argument("--hops", type=int, default=3, help="Inflow and outflow hops (default: 3).")
+    parser.add_argument("--inflow-hops", type=int, default=None)
+    parser.add_argument("--outflow-hops", type=int, default=None)
+    parser.add_argument("--nodes-per-hop", type=int, default=100)
+    parser.add_argument("--paths", type=int, default=None, help="Paths per direction (default: nodes-per-hop).")
+    parser.add_argument("--tag-density", type=float, default=0.3)
+    parser.add_argument("--overlap", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True, help="Output JSON path.")
+    args = parser.parse_args()
+
+    graph = generate_graph(
+        chain=args.chain,
+        address=args.address,
+        inflow_hops=args.hops if args.inflow_hops is None else args.inflow_hops,
+        outflow_hops=args.hops if args.outflow_hops is None else args.outflow_hops,
+        nodes_per_hop=args.nodes_per_hop,
+        paths=args.paths,
+        tag_density=args.tag_density,
+        overlap=args.overlap,
+        seed=args.seed,
+    )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(graph, f, indent=2, ensure_ascii=False)
+
+    data = graph["graph_data"]["data"]
+    print(json.dumps({
+        "status": "success",
+        "output": args.output,
+        "address": graph["address"],
+        "paths": len(data["paths"]),
+        "target_tags": len(data["tags"]),
+    }))
+
+
+if __name__ == "__main__":
+    main()
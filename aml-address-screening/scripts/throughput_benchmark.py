@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+throughput_benchmark.py
+-----------------------
+End-to-end screening throughput against the local TrustIn stand-in
+(`trustin_stub.py`), so client concurrency and polling changes can be measured
+offline.
+
+Modes:
+    batch   `run_batch()` as used by `run_screening.py --batch`
+    screen  `screen()` calls (one per address) on `--workers` threads
+    async   `AsyncTrustInAPI` fetches on one event loop (no extraction)
+
+The stand-in runs in-process on a free port unless `--base-url` points at an
+already running one.
+
+Usage:
+    python3 scripts/throughput_benchmark.py --mode batch --count 200 --batch-concurrency 50
+    python3 scripts/throughput_benchmark.py --mode async --count 500 --duration exp:1 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic_graph import random_address
+from trustin_stub import add_config_arguments, config_from_args, start_stub_server
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+DEFAULT_RULES = os.path.join(REPO_ROOT, "aml-rule-generator", "defaults", "singapore_mas.json")
+
+STUB_API_KEY = "stub-key"
+
+
+def _latency_summary(latencies):
+    if not latencies:
+        return {}
+    latencies = sorted(latencies)
+    return {
+        "latency_p50": round(latencies[len(latencies) // 2], 3),
+        "latency_p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        "latency_max": round(latencies[-1], 3),
+        "latency_mean": round(statistics.fmean(latencies), 3),
+    }
+
+
+def run_batch_mode(addresses, args, rules, out_dir):
+    from batch_screening import BatchJob, run_batch
+
+    jobs = [BatchJob(i + 1, args.chain, address, args.scenario) for i, address in enumerate(addresses)]
+    records, _ = run_batch(
+        jobs, rules,
+        inflow_hops=args.hops, outflow_hops=args.hops, max_nodes_per_hop=args.max_nodes,
+        api_key=STUB_API_KEY, concurrency=args.batch_concurrency, poll_interval=args.poll_interval,
+        graph_dir=out_dir, use_cache=False,
+    )
+    ok = [r for r in records if r["status"] == "success"]
+    return len(ok), [r["task_seconds"] for r in ok if "task_seconds" in r]
+
+
+def run_screen_mode(addresses, args, rules, out_dir):
+    from run_screening import screen
+
+    def one(address):
+        start = time.monotonic()
+        try:
+            screen(args.chain, address, rules, scenario=args.scenario,
+                   inflow_hops=args.hops, outflow_hops=args.hops, max_nodes_per_hop=args.max_nodes,
+                   api_key=STUB_API_KEY, output_dir=out_dir, use_cache=False)
+        except Exception:
+            return None
+        return time.monotonic() - start
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        latencies = [t for t in pool.map(one, addresses) if t is not None]
+    return len(latencies), latencies
+
+
+def run_async_mode(addresses, args):
+    from trustin_api import AsyncTrustInAPI
+
+    async def one(api, address):
+        start = time.monotonic()
+        result = await api.kya_pro_detect(args.chain, address, inflow_hops=args.hops,
+                                          outflow_hops=args.hops, max_nodes_per_hop=args.max_nodes)
+        return None if result.error else time.monotonic() - start
+
+    async def run():
+        async with AsyncTrustInAPI(api_key=STUB_API_KEY, concurrency=args.batch_concurrency,
+                                   use_cache=False) as api:
+            return await asyncio.gather(*(one(api, a) for a in addresses))
+
+    latencies = [t for t in asyncio.run(run()) if t is not None]
+    return len(latencies), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screening throughput against the local TrustIn stand-in.")
+    parser.add_argument("--mode", choices=["batch", "screen", "async"], default="batch")
+    parser.add_argument("--count", type=int, default=100, help="Addresses to screen (default: 100).")
+    parser.add_argument("--chain", default="Tron")
+    parser.add_argument("--scenario", default="all")
+    parser.add_argument("--hops", type=int, default=3)
+    parser.add_argument("--max-nodes", type=int, default=50)
+    parser.add_argument("--rules", default=DEFAULT_RULES, help="Rules file (default: bundled Singapore MAS pack).")
+    parser.add_argument("--batch-concurrency", type=int, default=20,
+                        help="Tasks in flight for batch/async modes (default: 20).")
+    parser.add_argument("--poll-interval", type=float, default=None,
+                        help="Fixed batch poll interval (default: the adaptive poll policy).")
+    parser.add_argument("--workers", type=int, default=4, help="Threads for screen mode (default: 4).")
+    parser.add_argument("--base-url", default=None, help="Use an already running stand-in instead of starting one.")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        try:
+            server = start_stub_server(config_from_args(args))
+        except ValueError as e:
+            parser.error(str(e))
+        base_url = server.base_url
+    # Both clients pick this up when no base_url is passed explicitly
+    os.environ["TRUSTIN_API_BASE_URL"] = base_url
+
+    with open(args.rules, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    rng = random.Random(args.seed)
+    addresses = [random_address(rng, args.chain) for _ in range(args.count)]
+
+    print(f"Screening {args.count} addresses in {args.mode} mode against {base_url}")
+    start = time.monotonic()
+    try:
+        with tempfile.TemporaryDirectory(prefix="amlclaw-bench-") as out_dir:
+            if args.mode == "batch":
+                succeeded, latencies = run_batch_mode(addresses, args, rules, out_dir)
+            elif args.mode == "screen":
+                succeeded, latencies = run_screen_mode(addresses, args, rules, out_dir)
+            else:
+                succeeded, latencies = run_async_mode(addresses, args)
+    finally:
+        wall = time.monotonic() - start
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    summary = {
+        "mode": args.mode,
+        "total": args.count,
+        "succeeded": succeeded,
+        "failed": args.count - succeeded,
+        "wall_seconds": round(wall, 3),
+        "screenings_per_minute": round(succeeded / wall * 60, 2) if wall > 0 else 0.0,
+    }
+    summary.update(_latency_summary(latencies))
+    if server is not None:
+        summary["server"] = dict(server.state.counters)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,22 @@ for blockchain address risk assessment.
 
 import os
 import json
+import time
+import asyncio
 import requests
 from typing import Dict, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
 
+from polling import PollPolicy, LatencyHints, latency_bucket
+from graph_cache import GraphCache, cache_enabled
+from metrics import NO_METRICS, ScreeningMetrics
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # Only required by AsyncTrustInAPI
+
 @dataclass
 class KYAResult:
     """Result from TrustIn KYA API."""
@@ -21,20 +32,177 @@ class KYAResult:
     details: Dict[str, Any]
     raw_response: Optional[Dict] = None
     error: Optional[str] = None
+    cached: bool = False  # Served from the local graph cache
+
+
+class AuthorizationError(Exception):
+    """Raised when TrustIn rejects the API key (HTTP 401); retrying cannot succeed."""
+
+
+def build_submit_payload(chain_name: str, address: str, **kwargs) -> Dict:
+    """Build the submit_task payload for a chain/address pair."""
+    chain_mapping = {
+        "Tron": "Tron",
+        "Ethereum": "Ethereum",
+        "Bitcoin": "Bitcoin",
+        "Solana": "Solana"
+    }
+
+    if chain_name not in chain_mapping:
+        raise ValueError(f"Unsupported chain for TrustIn API: {chain_name}")
+
+    submit_payload = {
+        "chain_name": chain_mapping[chain_name],
+        "address": address,
+        "inflow_hops": kwargs.get("inflow_hops", 3),
+        "outflow_hops": kwargs.get("outflow_hops", 3),
+        "max_nodes_per_hop": kwargs.get("max_nodes_per_hop", 100)
+    }
+
+    if kwargs.get("min_timestamp"):
+        submit_payload["min_timestamp"] = kwargs["min_timestamp"]
+    if kwargs.get("max_timestamp"):
+        submit_payload["max_timestamp"] = kwargs["max_timestamp"]
+    return submit_payload
+
+
+def parse_result(final_res: Dict) -> KYAResult:
+    """Turn a get_result response into a KYAResult with a heuristic risk score."""
+    if final_res.get("code") != 0:
+        error_msg = final_res.get("msg", "Unknown API error")
+        raise Exception(f"Failed to fetch result: {error_msg}")
+
+    raw_data = final_res.get("data")
+    if raw_data is None:
+        # An empty result is not evidence that the address is clean
+        raise Exception("Failed to fetch result: response carries no graph data")
+
+    # The 'data' field might be stringified JSON. Replace it in place so only the
+    # decoded graph is kept alive (details and raw_response share this dict).
+    if isinstance(raw_data, str):
+        try:
+            raw_data = json.loads(raw_data)
+        except json.JSONDecodeError:
+            raise Exception("Failed to fetch result: graph data is not valid JSON")
+        final_res["data"] = raw_data
+
+    # Support the new dict wrapper containing inflow_total_amount
+    if isinstance(raw_data, dict):
+        raw_graph = raw_data.get("graph", raw_data.get("paths", raw_data))
+    else:
+        raw_graph = raw_data
+
+    # Heuristically calculate risk score from raw graph tags priority
+    max_priority = 4
+    risk_tags = set()
+
+    # Helper to process tags
+    def process_tags(tags_list):
+        nonlocal max_priority
+        for tag in tags_list:
+            if isinstance(tag, dict):
+                prio = tag.get("priority", 4)
+                risk_tags.add(tag.get("primary_category", "Unknown"))
+                if prio < max_priority:
+                    max_priority = prio
+
+    if isinstance(raw_graph, list):
+        for flow in raw_graph:
+            if isinstance(flow, dict):
+                process_tags(flow.get("tags", []))
+                for node in flow.get("path", []):
+                    if isinstance(node, dict):
+                        process_tags(node.get("tags", []))
+    elif isinstance(raw_graph, dict):
+        process_tags(raw_graph.get("tags", []))
+        for node in raw_graph.get("path", []):
+            if isinstance(node, dict):
+                process_tags(node.get("tags", []))
+
+    # Priority 1: Critical (100), Priority 2: High (80), Priority 3: Medium (60), Priority 4: Low (20)
+    risk_score_map = {1: 100, 2: 80, 3: 60, 4: 20}
+    risk_score = risk_score_map.get(max_priority, 20)
+
+    recommendation = "No specific risk tags identified"
+    if risk_tags:
+        recommendation = f"Risk tags: {', '.join(list(risk_tags)[:3])}"
+
+    if risk_score <= 20:
+        risk_level = "LOW"
+    elif risk_score <= 40:
+        risk_level = "MEDIUM_LOW"
+    elif risk_score <= 60:
+        risk_level = "MEDIUM"
+    elif risk_score <= 80:
+        risk_level = "HIGH"
+    else:
+        risk_level = "CRITICAL"
+
+    return KYAResult(
+        risk_score=risk_score,
+        risk_level=risk_level,
+        recommendation=recommendation,
+        details=final_res,
+        raw_response=final_res
+    )
+
+
+def error_result(error: Exception) -> KYAResult:
+    """Fallback KYAResult returned when any pipeline stage fails."""
+    return KYAResult(
+        risk_score=50,
+        risk_level="UNKNOWN",
+        recommendation=f"API Error/Fallback: {str(error)}",
+        details={"api_error": str(error), "fallback": True},
+        error=str(error)
+    )
+
+
+def _resolve_cache(cache: Optional[GraphCache], use_cache: bool) -> Optional[GraphCache]:
+    if not use_cache:
+        return None
+    if cache is not None:
+        return cache
+    return GraphCache() if cache_enabled() else None
+
+
+def _cached_result(cache: Optional[GraphCache], chain_name: str, address: str,
+                   scenario: Optional[str] = None, **kwargs) -> Optional[KYAResult]:
+    if cache is None:
+        return None
+    payload = build_submit_payload(chain_name, address, **kwargs)
+    final_res = cache.get(payload, cache.ttl_for(scenario))
+    if final_res is None:
+        return None
+    result = parse_result(final_res)
+    result.cached = True
+    return result
+
 
 class TrustInAPI:
     """Client for TrustIn API (Async Tasks)."""
     
     BASE_URL = "https://api.trustin.info/api/v2/investigate"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, poll_policy: Optional[PollPolicy] = None,
+                 latency_hints: Optional[LatencyHints] = None, cache: Optional[GraphCache] = None,
+                 use_cache: bool = True, base_url: Optional[str] = None):
         """
         Initialize TrustIn API client.
         
         Args:
             api_key: TrustIn API key.
+            poll_policy: Status polling strategy (default: adaptive backoff, 60s deadline).
+            latency_hints: Learned task durations per bucket (default: persisted to
+                TRUSTIN_LATENCY_HINTS if set, otherwise in-memory).
+            cache: Graph response cache (default: on-disk GraphCache unless
+                AMLCLAW_GRAPH_CACHE=false).
+            use_cache: Set False to bypass the graph cache entirely.
+            base_url: Investigate API root (default: TRUSTIN_API_BASE_URL if set, else
+                the public TrustIn endpoint). Used to target a local stand-in server.
         """
         self.api_key = api_key or os.getenv("TRUSTIN_API_KEY")
+        self.base_url = (base_url or os.getenv("TRUSTIN_API_BASE_URL") or self.BASE_URL).rstrip("/")
         
         if not self.api_key:
             raise ValueError(
@@ -42,166 +210,131 @@ class TrustInAPI:
                 "Set TRUSTIN_API_KEY environment variable or pass api_key parameter."
             )
         
+        self.poll_policy = poll_policy or PollPolicy()
+        self.latency_hints = latency_hints or LatencyHints(os.getenv("TRUSTIN_LATENCY_HINTS"))
+        self.cache = _resolve_cache(cache, use_cache)
+
         self.session = requests.Session()
         self.session.headers.update({
             "Content-Type": "text/plain",
             "User-Agent": "amlclaw-address-screening/0.1.0"
         })
     
-    def _make_request(self, endpoint: str, data: Dict, require_auth: bool = False) -> Dict:
+    def _make_request(self, endpoint: str, data: Dict, require_auth: bool = False,
+                      metrics: Optional[ScreeningMetrics] = None) -> Dict:
         """Make request to TrustIn API."""
-        url = f"{self.BASE_URL}/{endpoint}?apikey={self.api_key}"
+        metrics = metrics or NO_METRICS
+        url = f"{self.base_url}/{endpoint}?apikey={self.api_key}"
             
         try:
             # The API expects raw string payload in text/plain format according to curl
+            start = time.perf_counter()
             response = self.session.post(url, data=json.dumps(data), timeout=30)
             response.raise_for_status()
-            return response.json()
+            body = response.content
+            metrics.add(f"{endpoint}_seconds", time.perf_counter() - start)
+            metrics.add(f"{endpoint}_requests")
+            metrics.add(f"{endpoint}_bytes", len(body))
+            with metrics.stage("decode"):
+                return json.loads(body)
         except requests.exceptions.Timeout:
             raise Exception("TrustIn API request timed out")
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:
-                raise Exception("Invalid authorization (Check API Key)")
+                raise AuthorizationError("Invalid authorization (Check API Key)")
             else:
                 raise Exception(f"TrustIn API error: {e}")
         except json.JSONDecodeError:
             raise Exception("Invalid response from TrustIn API")
 
-    def _wait_for_task(self, task_id: int, max_retries: int = 30) -> bool:
-        """Poll get_status until finished."""
-        import time
-        for _ in range(max_retries):
-            res = self._make_request("get_status", {"task_id": task_id}, require_auth=True)
-            if res.get("code") == 0 and res.get("data") == "finished":
-                return True
-            time.sleep(2)
-        return False
-
-    def async_detect(self, chain_name: str, address: str, **kwargs) -> KYAResult:
-        """Execute the asynchronous submit->poll->result pipeline."""
-        chain_mapping = {
-            "Tron": "Tron",
-            "Ethereum": "Ethereum",
-            "Bitcoin": "Bitcoin",
-            "Solana": "Solana"
-        }
-        
-        if chain_name not in chain_mapping:
-            raise ValueError(f"Unsupported chain for TrustIn API: {chain_name}")
-
-        submit_payload = {
-            "chain_name": chain_mapping[chain_name],
-            "address": address,
-            "inflow_hops": kwargs.get("inflow_hops", 3),
-            "outflow_hops": kwargs.get("outflow_hops", 3),
-            "max_nodes_per_hop": kwargs.get("max_nodes_per_hop", 100)
+    def submit_task(self, chain_name: str, address: str, metrics: Optional[ScreeningMetrics] = None,
+                    **kwargs) -> int:
+        """Submit an investigation task and return its task_id."""
+        submit_payload = build_submit_payload(chain_name, address, **kwargs)
+        submit_res = self._make_request("submit_task", submit_payload, metrics=metrics)
+        task_id = submit_res.get("data")
+        if submit_res.get("code") != 0 or not task_id:
+            raise Exception(f"Failed to submit task: {submit_res.get('msg')}")
+        return task_id
+
+    def get_status(self, task_id: int, metrics: Optional[ScreeningMetrics] = None) -> Optional[str]:
+        """Return the task status string (e.g. "finished"), or None if the call failed."""
+        res = self._make_request("get_status", {"task_id": task_id}, require_auth=True, metrics=metrics)
+        if res.get("code") != 0:
+            return None
+        return res.get("data")
+
+    def get_result(self, task_id: int, cache_payload: Optional[Dict] = None,
+                   metrics: Optional[ScreeningMetrics] = None) -> KYAResult:
+        """
+        Download a finished task's graph and derive the heuristic risk score.
+
+        When `cache_payload` (the task's submit payload) is given, the response is stored
+        in the graph cache.
+        """
+        metrics = metrics or NO_METRICS
+        result_payload = {
+            "task_id": task_id,
+            "token": "usdt" # Defaulting to usdt based on example
         }
-        
-        if kwargs.get("min_timestamp"):
-            submit_payload["min_timestamp"] = kwargs["min_timestamp"]
-        if kwargs.get("max_timestamp"):
-            submit_payload["max_timestamp"] = kwargs["max_timestamp"]
-        
+        final_res = self._make_request("get_result", result_payload, require_auth=True, metrics=metrics)
+        with metrics.stage("decode"):
+            result = parse_result(final_res)
+        if self.cache is not None and cache_payload is not None:
+            self.cache.put(cache_payload, final_res)
+        return result
+
+    def cached_result(self, chain_name: str, address: str, scenario: Optional[str] = None,
+                      **kwargs) -> Optional[KYAResult]:
+        """Return a KYAResult from the graph cache if a fresh entry exists for this request."""
+        return _cached_result(self.cache, chain_name, address, scenario, **kwargs)
+
+    def _wait_for_task(self, task_id: int, bucket: Optional[str] = None,
+                       metrics: Optional[ScreeningMetrics] = None) -> bool:
+        """Poll get_status following the poll policy until finished or past the deadline."""
+        metrics = metrics or NO_METRICS
+        start = time.monotonic()
         try:
-            submit_res = self._make_request("submit_task", submit_payload)
-            task_id = submit_res.get("data")
-            if submit_res.get("code") != 0 or not task_id:
-                raise Exception(f"Failed to submit task: {submit_res.get('msg')}")
+            for delay in self.poll_policy.delays(self.latency_hints.get(bucket)):
+                remaining = self.poll_policy.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                time.sleep(min(delay, remaining))
+                if self.get_status(task_id, metrics=metrics) == "finished":
+                    self.latency_hints.record(bucket, time.monotonic() - start)
+                    return True
+            return False
+        finally:
+            metrics.add("poll_wait_seconds", time.monotonic() - start)
+
+    def async_detect(self, chain_name: str, address: str, metrics: Optional[ScreeningMetrics] = None,
+                     **kwargs) -> KYAResult:
+        """Execute the asynchronous submit->poll->result pipeline."""
+        metrics = metrics or NO_METRICS
+        # Unsupported chains are a caller error, raised before any API call
+        payload = build_submit_payload(chain_name, address, **kwargs)
+        bucket = latency_bucket(payload)
+
+        try:
+            # Repeat screenings of the same request are served from the graph cache
+            cached = self.cached_result(chain_name, address, **kwargs)
+            metrics.set("cache_hit", cached is not None)
+            if cached is not None:
+                return cached
+
+            task_id = self.submit_task(chain_name, address, metrics=metrics, **kwargs)
 
             # Polling
-            if not self._wait_for_task(task_id):
+            if not self._wait_for_task(task_id, bucket, metrics=metrics):
                 raise Exception(f"Task {task_id} timed out while processing.")
 
             # Get Result
-            result_payload = {
-                "task_id": task_id,
-                "token": "usdt" # Defaulting to usdt based on example
-            }
-            final_res = self._make_request("get_result", result_payload, require_auth=True)
-            
-            if final_res.get("code") == 0:
-                raw_data = final_res.get("data", {})
-                
-                # The 'data' field might be stringified JSON
-                if isinstance(raw_data, str):
-                    try:
-                        raw_data = json.loads(raw_data)
-                    except json.JSONDecodeError:
-                        raw_data = {}
-                
-                # Support the new dict wrapper containing inflow_total_amount
-                if isinstance(raw_data, dict):
-                    raw_graph = raw_data.get("graph", raw_data.get("paths", raw_data))
-                else:
-                    raw_graph = raw_data
-                
-                # Heuristically calculate risk score from raw graph tags priority
-                max_priority = 4
-                risk_tags = set()
-                
-                # Helper to process tags
-                def process_tags(tags_list):
-                    nonlocal max_priority
-                    for tag in tags_list:
-                        if isinstance(tag, dict):
-                            prio = tag.get("priority", 4)
-                            risk_tags.add(tag.get("primary_category", "Unknown"))
-                            if prio < max_priority:
-                                max_priority = prio
-                
-                if isinstance(raw_graph, list):
-                    for flow in raw_graph:
-                        if isinstance(flow, dict):
-                            process_tags(flow.get("tags", []))
-                            for node in flow.get("path", []):
-                                if isinstance(node, dict):
-                                    process_tags(node.get("tags", []))
-                elif isinstance(raw_graph, dict):
-                    process_tags(raw_graph.get("tags", []))
-                    for node in raw_graph.get("path", []):
-                        if isinstance(node, dict):
-                            process_tags(node.get("tags", []))
-                
-                # Priority 1: Critical (100), Priority 2: High (80), Priority 3: Medium (60), Priority 4: Low (20)
-                risk_score_map = {1: 100, 2: 80, 3: 60, 4: 20}
-                risk_score = risk_score_map.get(max_priority, 20)
-                
-                recommendation = "No specific risk tags identified"
-                if risk_tags:
-                    recommendation = f"Risk tags: {', '.join(list(risk_tags)[:3])}"
-
-                if risk_score <= 20:
-                    risk_level = "LOW"
-                elif risk_score <= 40:
-                    risk_level = "MEDIUM_LOW"
-                elif risk_score <= 60:
-                    risk_level = "MEDIUM"
-                elif risk_score <= 80:
-                    risk_level = "HIGH"
-                else:
-                    risk_level = "CRITICAL"
-
-                return KYAResult(
-                    risk_score=risk_score,
-                    risk_level=risk_level,
-                    recommendation=recommendation,
-                    details=final_res,
-                    raw_response=final_res
-                )
-            else:
-                error_msg = final_res.get("msg", "Unknown API error")
-                raise Exception(f"Failed to fetch result: {error_msg}")
+            return self.get_result(task_id, cache_payload=payload, metrics=metrics)
 
         except Exception as e:
             import traceback
             traceback.print_exc()
-            return KYAResult(
-                risk_score=50,
-                risk_level="UNKNOWN",
-                recommendation=f"API Error/Fallback: {str(e)}",
-                details={"api_error": str(e), "fallback": True},
-                error=str(e)
-            )
+            return error_result(e)
 
     def kya_lite_detect(self, chain_name: str, address: str) -> KYAResult:
         """Fallback wrapper, using async_detect under the hood with 1 hop."""
@@ -211,6 +344,199 @@ class TrustInAPI:
         """Wrapper to async_detect"""
         return self.async_detect(chain_name, address, **kwargs)
 
+class AsyncTrustInAPI:
+    """
+    Asyncio-native client for TrustIn API with the same submit_task/get_status/get_result
+    protocol and KYAResult output as TrustInAPI.
+
+    One instance can drive many investigations on a single event loop:
+    `max_connections` bounds the HTTP connection pool and `concurrency` bounds the
+    number of investigations in flight at once. Requires `aiohttp`.
+
+    Usage:
+        async with AsyncTrustInAPI(concurrency=200) as api:
+            results = await asyncio.gather(*(api.async_detect("Tron", a) for a in addresses))
+    """
+
+    BASE_URL = TrustInAPI.BASE_URL
+
+    def __init__(self, api_key: Optional[str] = None, max_connections: int = 100,
+                 concurrency: int = 200, timeout: float = 30,
+                 poll_policy: Optional[PollPolicy] = None,
+                 latency_hints: Optional[LatencyHints] = None,
+                 cache: Optional[GraphCache] = None, use_cache: bool = True,
+                 base_url: Optional[str] = None):
+        """
+        Initialize async TrustIn API client.
+
+        Args:
+            api_key: TrustIn API key.
+            max_connections: Size of the shared HTTP connection pool.
+            concurrency: Max investigations (submit -> poll -> result) in flight.
+            timeout: Per-request timeout in seconds.
+            poll_policy: Status polling strategy (default: adaptive backoff, 60s deadline).
+            latency_hints: Learned task durations per bucket.
+            cache: Graph response cache (default: on-disk GraphCache unless
+                AMLCLAW_GRAPH_CACHE=false).
+            use_cache: Set False to bypass the graph cache entirely.
+            base_url: Investigate API root (default: TRUSTIN_API_BASE_URL or the public endpoint).
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncTrustInAPI requires aiohttp (pip install aiohttp)")
+
+        self.api_key = api_key or os.getenv("TRUSTIN_API_KEY")
+
+        if not self.api_key:
+            raise ValueError(
+                "No TrustIn API key provided. "
+                "Set TRUSTIN_API_KEY environment variable or pass api_key parameter."
+            )
+
+        self.base_url = (base_url or os.getenv("TRUSTIN_API_BASE_URL") or self.BASE_URL).rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.poll_policy = poll_policy or PollPolicy()
+        self.latency_hints = latency_hints or LatencyHints(os.getenv("TRUSTIN_LATENCY_HINTS"))
+        self.cache = _resolve_cache(cache, use_cache)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self):
+        # Created lazily so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "Content-Type": "text/plain",
+                    "User-Agent": "amlclaw-address-screening/0.1.0"
+                },
+            )
+        return self._session
+
+    async def close(self):
+        """Close the underlying connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _make_request(self, endpoint: str, data: Dict,
+                            metrics: Optional[ScreeningMetrics] = None) -> Dict:
+        """Make request to TrustIn API."""
+        metrics = metrics or NO_METRICS
+        url = f"{self.base_url}/{endpoint}?apikey={self.api_key}"
+
+        try:
+            start = time.perf_counter()
+            async with self._get_session().post(url, data=json.dumps(data)) as response:
+                response.raise_for_status()
+                body = await response.read()
+            metrics.add(f"{endpoint}_seconds", time.perf_counter() - start)
+            metrics.add(f"{endpoint}_requests")
+            metrics.add(f"{endpoint}_bytes", len(body))
+            with metrics.stage("decode"):
+                return json.loads(body)
+        except asyncio.TimeoutError:
+            raise Exception("TrustIn API request timed out")
+        except aiohttp.ClientResponseError as e:
+            if e.status == 401:
+                raise AuthorizationError("Invalid authorization (Check API Key)")
+            else:
+                raise Exception(f"TrustIn API error: {e}")
+        except json.JSONDecodeError:
+            raise Exception("Invalid response from TrustIn API")
+
+    async def submit_task(self, chain_name: str, address: str, metrics: Optional[ScreeningMetrics] = None,
+                          **kwargs) -> int:
+        """Submit an investigation task and return its task_id."""
+        submit_payload = build_submit_payload(chain_name, address, **kwargs)
+        submit_res = await self._make_request("submit_task", submit_payload, metrics=metrics)
+        task_id = submit_res.get("data")
+        if submit_res.get("code") != 0 or not task_id:
+            raise Exception(f"Failed to submit task: {submit_res.get('msg')}")
+        return task_id
+
+    async def get_status(self, task_id: int, metrics: Optional[ScreeningMetrics] = None) -> Optional[str]:
+        """Return the task status string (e.g. "finished"), or None if the call failed."""
+        res = await self._make_request("get_status", {"task_id": task_id}, metrics=metrics)
+        if res.get("code") != 0:
+            return None
+        return res.get("data")
+
+    async def get_result(self, task_id: int, cache_payload: Optional[Dict] = None,
+                         metrics: Optional[ScreeningMetrics] = None) -> KYAResult:
+        """Download a finished task's graph and derive the heuristic risk score."""
+        metrics = metrics or NO_METRICS
+        result_payload = {
+            "task_id": task_id,
+            "token": "usdt"
+        }
+        final_res = await self._make_request("get_result", result_payload, metrics=metrics)
+        with metrics.stage("decode"):
+            result = parse_result(final_res)
+        if self.cache is not None and cache_payload is not None:
+            self.cache.put(cache_payload, final_res)
+        return result
+
+    def cached_result(self, chain_name: str, address: str, scenario: Optional[str] = None,
+                      **kwargs) -> Optional[KYAResult]:
+        """Return a KYAResult from the graph cache if a fresh entry exists for this request."""
+        return _cached_result(self.cache, chain_name, address, scenario, **kwargs)
+
+    async def _wait_for_task(self, task_id: int, bucket: Optional[str] = None,
+                             metrics: Optional[ScreeningMetrics] = None) -> bool:
+        """Poll get_status following the poll policy without blocking the event loop."""
+        metrics = metrics or NO_METRICS
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            for delay in self.poll_policy.delays(self.latency_hints.get(bucket)):
+                remaining = self.poll_policy.deadline - (loop.time() - start)
+                if remaining <= 0:
+                    return False
+                await asyncio.sleep(min(delay, remaining))
+                if await self.get_status(task_id, metrics=metrics) == "finished":
+                    self.latency_hints.record(bucket, loop.time() - start)
+                    return True
+            return False
+        finally:
+            metrics.add("poll_wait_seconds", loop.time() - start)
+
+    async def async_detect(self, chain_name: str, address: str, metrics: Optional[ScreeningMetrics] = None,
+                           **kwargs) -> KYAResult:
+        """Execute the submit->poll->result pipeline as a coroutine."""
+        metrics = metrics or NO_METRICS
+        payload = build_submit_payload(chain_name, address, **kwargs)
+        bucket = latency_bucket(payload)
+
+        async with self._semaphore:
+            try:
+                cached = self.cached_result(chain_name, address, **kwargs)
+                metrics.set("cache_hit", cached is not None)
+                if cached is not None:
+                    return cached
+
+                task_id = await self.submit_task(chain_name, address, metrics=metrics, **kwargs)
+
+                if not await self._wait_for_task(task_id, bucket, metrics=metrics):
+                    raise Exception(f"Task {task_id} timed out while processing.")
+
+                return await self.get_result(task_id, cache_payload=payload, metrics=metrics)
+
+            except Exception as e:
+                return error_result(e)
+
+    async def kya_pro_detect(self, chain_name: str, address: str, **kwargs) -> KYAResult:
+        """Wrapper to async_detect"""
+        return await self.async_detect(chain_name, address, **kwargs)
+
+
 # Helper functions for direct usage
 def screen_with_trustin(
     chain: str,
@@ -252,6 +578,7 @@ def screen_with_trustin(
 # Export for easy import
 __all__ = [
     "TrustInAPI",
+    "AsyncTrustInAPI",
     "KYAResult",
     "screen_with_trustin"
 ]
\ No newline at end of file
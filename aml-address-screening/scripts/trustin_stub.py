@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+trustin_stub.py
+---------------
+Local stand-in for the TrustIn v2 investigate API, for load and latency testing
+without spending real API quota.
+
+Implements `submit_task`, `get_status` and `get_result` with the same `code` /
+`msg` / `data` envelope and `?apikey=` authentication as the live service.
+Result graphs come from `synthetic_graph.py`, seeded by the requested address
+and shaped by the requested hops and `max_nodes_per_hop`.
+
+Fault injection (all rates are per request, 0.0 - 1.0):
+    error_rate         respond with code != 0
+    unauthorized_rate  respond with HTTP 401
+    timeout_rate       stall for `stall_seconds` before responding (client timeouts)
+    stringify_rate     return get_result `data` as stringified JSON (TrustIn quirk)
+
+Task durations follow a distribution spec:
+    fixed:1.5            every task takes 1.5s
+    uniform:0.5,3        uniform between 0.5s and 3s
+    lognormal:0.5,0.6    lognormvariate(mu, sigma) seconds
+    exp:2                exponential with mean 2s
+
+Point the clients at it with TRUSTIN_API_BASE_URL (or `base_url=`):
+    python3 scripts/trustin_stub.py --port 8765 --duration lognormal:0.5,0.6
+    TRUSTIN_API_BASE_URL=http://127.0.0.1:8765/api/v2/investigate python3 scripts/run_screening.py Tron T...
+
+GET /stats returns request and fault counters.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+from synthetic_graph import generate_trustin_data, load_label_catalog
+
+API_PREFIX = "/api/v2/investigate"
+
+
+def parse_duration(spec):
+    """Return a `sampler(rng) -> seconds` for a duration distribution spec."""
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(",") if v.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid duration spec '{spec}'")
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    if kind == "exp" and len(values) == 1 and values[0] > 0:
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Invalid duration spec '{spec}' (use fixed:S, uniform:A,B, lognormal:MU,SIGMA or exp:MEAN)")
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stand-in server."""
+    duration: str = "lognormal:0.5,0.6"
+    api_keys: Optional[Set[str]] = None    # None accepts any non-empty key
+    error_rate: float = 0.0
+    unauthorized_rate: float = 0.0
+    timeout_rate: float = 0.0
+    stall_seconds: float = 35.0            # Longer than the clients' 30s request timeout
+    stringify_rate: float = 0.5
+    paths: Optional[int] = None            # Paths per direction (default: max_nodes_per_hop)
+    tag_density: float = 0.3
+    overlap: float = 0.6
+    seed: int = 0
+
+
+@dataclass
+class _Task:
+    payload: Dict
+    ready_at: float
+    data: Optional[Dict] = None
+
+
+@dataclass
+class StubState:
+    config: StubConfig
+    tasks: Dict[int, _Task] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.rng = random.Random(self.config.seed)
+        self.sample_duration = parse_duration(self.config.duration)
+        self.catalog = load_label_catalog()
+        self.task_ids = itertools.count(1000)
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def roll(self, rate):
+        if rate <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < rate
+
+    def submit(self, payload):
+        with self.lock:
+            task_id = next(self.task_ids)
+            duration = self.sample_duration(self.rng)
+            self.tasks[task_id] = _Task(payload=payload, ready_at=time.monotonic() + duration)
+        return task_id
+
+    def task(self, task_id):
+        with self.lock:
+            return self.tasks.get(task_id)
+
+    def result_data(self, task):
+        """Synthetic graph for a task (generated once, deterministic per address)."""
+        if task.data is None:
+            payload = task.payload
+            address = str(payload.get("address", ""))
+            seed = int(hashlib.sha256(f"{self.config.seed}:{address}".encode("utf-8")).hexdigest()[:8], 16)
+            nodes_per_hop = int(payload.get("max_nodes_per_hop", 100))
+            task.data = generate_trustin_data(
+                address,
+                chain=payload.get("chain_name", "Tron"),
+                inflow_hops=int(payload.get("inflow_hops", 3)),
+                outflow_hops=int(payload.get("outflow_hops", 3)),
+                nodes_per_hop=nodes_per_hop,
+                paths=self.config.paths,
+                tag_density=self.config.tag_density,
+                overlap=self.config.overlap,
+                seed=seed,
+                catalog=self.catalog,
+            )
+        return task.data
+
+
+def _envelope(data=None, code=0, msg="success"):
+    return {"code": code, "msg": msg, "data": data}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "TrustInStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> StubState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+    def _send_json(self, body, status=200):
+        raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            with self.state.lock:
+                stats = dict(self.state.counters, tasks=len(self.state.tasks))
+            self._send_json(stats)
+        else:
+            self._send_json(_envelope(code=404, msg="not found"), status=404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        state = self.state
+        config = state.config
+
+        endpoint = url.path[len(API_PREFIX) + 1:] if url.path.startswith(API_PREFIX + "/") else None
+        if endpoint not in ("submit_task", "get_status", "get_result"):
+            self._send_json(_envelope(code=404, msg="not found"), status=404)
+            return
+        state.count(endpoint)
+
+        api_key = parse_qs(url.query).get("apikey", [""])[0]
+        if not api_key or (config.api_keys is not None and api_key not in config.api_keys) \
+                or state.roll(config.unauthorized_rate):
+            state.count("unauthorized")
+            self._send_json(_envelope(code=401, msg="Invalid authorization"), status=401)
+            return
+
+        if state.roll(config.timeout_rate):
+            state.count("stalled")
+            time.sleep(config.stall_seconds)
+
+        if state.roll(config.error_rate):
+            state.count("errors")
+            self._send_json(_envelope(code=500, msg="Injected server error"))
+            return
+
+        try:
+            payload = json.loads(body.decode("utf-8") or "{}")
+        except ValueError:
+            self._send_json(_envelope(code=400, msg="Invalid JSON body"))
+            return
+
+        if endpoint == "submit_task":
+            if not payload.get("address") or not payload.get("chain_name"):
+                self._send_json(_envelope(code=400, msg="chain_name and address are required"))
+                return
+            self._send_json(_envelope(state.submit(payload)))
+            return
+
+        task = state.task(payload.get("task_id"))
+        if task is None:
+            self._send_json(_envelope(code=404, msg="task not found"))
+            return
+        finished = time.monotonic() >= task.ready_at
+
+        if endpoint == "get_status":
+            self._send_json(_envelope("finished" if finished else "running"))
+            return
+
+        if not finished:
+            self._send_json(_envelope(code=1, msg="task not finished"))
+            return
+        data = state.result_data(task)
+        if state.roll(config.stringify_rate):
+            state.count("stringified")
+            data = json.dumps(data, ensure_ascii=False)
+        self._send_json(_envelope(data))
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, StubHandler)
+        self.state = StubState(config)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+
+def start_stub_server(config=None, host="127.0.0.1", port=0):
+    """Start a stand-in server on a background thread; returns the server (`.base_url`, `.shutdown()`)."""
+    server = StubServer((host, port), config or StubConfig())
+    thread = threading.Thread(target=server.serve_forever, name="trustin-stub", daemon=True)
+    thread.start()
+    return server
+
+
+def add_config_arguments(parser):
+    """CLI flags shared by the server and the throughput benchmark."""
+    parser.add_argument("--duration", default="lognormal:0.5,0.6",
+                        help="Task duration distribution (default: lognormal:0.5,0.6).")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--unauthorized-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=35.0)
+    parser.add_argument("--stringify-rate", type=float, default=0.5)
+    parser.add_argument("--paths", type=int, default=None, help="Paths per direction (default: max_nodes_per_hop).")
+    parser.add_argument("--tag-density", type=float, default=0.3)
+    parser.add_argument("--overlap", type=float, default=0.6)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args, api_keys=None):
+    parse_duration(args.duration)  # Fail fast on a bad spec
+    return StubConfig(
+        duration=args.duration,
+        api_keys=api_keys,
+        error_rate=args.error_rate,
+        unauthorized_rate=args.unauthorized_rate,
+        timeout_rate=args.timeout_rate,
+        stall_seconds=args.stall_seconds,
+        stringify_rate=args.stringify_rate,
+        paths=args.paths,
+        tag_density=args.tag_density,
+        overlap=args.overlap,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local TrustIn API stand-in for load and latency testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--api-key", action="append", default=None,
+                        help="Accepted API key (repeatable, default: accept any key).")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        config = config_from_args(args, set(args.api_key) if args.api_key else None)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = StubServer((args.host, args.port), config)
+    print(f"TrustIn stand-in listening on {server.base_url}")
+    print(f"  export TRUSTIN_API_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+vector_engine.py
+----------------
+NumPy-vectorized extraction engine (`extract_risk_paths(..., engine="numpy")`).
+
+`VectorizedAccumulator` is a drop-in for `RiskPathAccumulator`: paths are
+interned into the same `NodeTable` as they arrive, but instead of matching node
+by node, every node occurrence is appended to flat arrays (node id, direction,
+hop, path index) and matched in one pass when `entities()` is called:
+
+    1. Each node's prioritized tag is encoded as integer codes per field
+       (primary / secondary category, risk level).
+    2. Each plan entry (`RuleIndex.plan`: rules sharing direction and node
+       conditions) becomes boolean masks over those codes, one per condition;
+       each member rule adds its own direction and hop range.
+    3. Every (rule, unique node/direction/hop) pair is evaluated with
+       broadcasting, and matches are aggregated per address with sort/reduce.
+
+Findings, evidence selection and ordering are identical to the Python engine,
+which remains the reference implementation.
+"""
+
+from array import array
+
+import numpy as np
+
+from graph_table import CompactPath, NodeTable, amount_value
+from rule_index import NODE_PARAM_FIELDS, RuleIndex
+
+# Tag fields encoded as category codes, in NODE_PARAM_FIELDS order
+CODED_FIELDS = tuple(dict.fromkeys(NODE_PARAM_FIELDS.values()))
+
+
+class _Vocabulary:
+    """Integer codes for tag field values (code `len(self)` = missing)."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+        self._unhashable = []  # (value, code) pairs, compared by equality
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        try:
+            code = self._codes.get(value)
+        except TypeError:
+            for known, code in self._unhashable:
+                if known == value:
+                    return code
+            code = len(self.values)
+            self.values.append(value)
+            self._unhashable.append((value, code))
+            return code
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+
+def _encode_tags(best_tags):
+    """Per field: (vocabulary, node id -> code array); nodes without the field get the missing code."""
+    encoded = {}
+    for field in CODED_FIELDS:
+        vocab = _Vocabulary()
+        codes = [None] * len(best_tags)
+        for node_id, tag in enumerate(best_tags):
+            value = tag.get(field) if tag else None
+            codes[node_id] = -1 if value is None else vocab.code(value)
+        codes = np.array(codes, dtype=np.intp)
+        codes[codes < 0] = len(vocab)
+        encoded[field] = (vocab, codes)
+    return encoded
+
+
+def _condition_mask(vocab, predicate):
+    """Boolean mask over a field's codes; the trailing missing code never matches."""
+    mask = np.zeros(len(vocab) + 1, dtype=bool)
+    for code, value in enumerate(vocab.values):
+        mask[code] = bool(predicate(value))
+    return mask
+
+
+def _hop_bound(value, default):
+    return default if value is None else value
+
+
+class VectorizedAccumulator:
+    """
+    Same interface as `RiskPathAccumulator` (`add_path()`, `entities()` and the
+    path / node counters), matching all collected paths at once with NumPy.
+    `allowed_dirs` is the scenario's path direction filter (None = both).
+    """
+
+    def __init__(self, rules, target_address="", max_depth=5, allowed_dirs=None, max_evidence=3):
+        self.target_address = target_address
+        self.max_depth = max_depth
+        self.max_evidence = max_evidence
+        self.allowed_dirs = allowed_dirs
+        self.rule_index = RuleIndex(rules)
+        self.nodes = NodeTable()
+        self.total_paths = 0
+        self.paths_direction_filtered = 0
+        self.nodes_visited = 0
+        self.rule_evaluations = 0
+        # Flat node occurrences of every kept path, plus per-path columns
+        self._node_ids = array("l")
+        self._amounts = []
+        self._path_index = []
+        self._path_start = []
+        self._path_dir = []
+
+    def add_paths(self, paths):
+        """Collect a whole in-memory path list (path indices = list positions)."""
+        for path_idx, path in enumerate(paths):
+            self.add_path(path_idx, path)
+
+    def add_path(self, path_idx, path):
+        """Intern one raw path and append its nodes to the flat arrays."""
+        self.total_paths += 1
+        raw_nodes = path.get("path", [])
+        if not raw_nodes:
+            return
+
+        path_dir = path.get("direction", -1)
+        if self.allowed_dirs and path_dir not in self.allowed_dirs:
+            self.paths_direction_filtered += 1
+            return
+
+        self._path_index.append(path_idx)
+        self._path_start.append(len(self._node_ids))
+        self._path_dir.append(path_dir)
+        self.nodes_visited += len(raw_nodes)
+        self._node_ids.extend(self.nodes.intern_many(raw_nodes))
+        self._amounts.extend([n.get("amount", 0) for n in raw_nodes])
+
+    def compact_paths(self):
+        """`(path index, CompactPath)` of every collected path."""
+        return [(self._path_index[pos], self._compact_path(pos)) for pos in range(len(self._path_index))]
+
+    def _compact_path(self, path_pos):
+        """Rebuild the `CompactPath` of one collected path (for evidence formatting)."""
+        start = self._path_start[path_pos]
+        end = self._path_start[path_pos + 1] if path_pos + 1 < len(self._path_start) else len(self._node_ids)
+        return CompactPath(self._path_dir[path_pos], self._node_ids[start:end], self._amounts[start:end])
+
+    def _hop_amounts(self, flat_index, flat_dirs, ends):
+        """`CompactPath.hop_amount()` for the given flat occurrences, as floats."""
+        hop = flat_index + ((flat_dirs == -1) & (flat_index + 1 < ends))
+        amounts = self._amounts
+        try:
+            values = np.array([amounts[i] for i in hop.tolist()], dtype=float)
+        except (TypeError, ValueError):
+            return np.array([amount_value(amounts[i]) for i in hop.tolist()], dtype=float)
+        values[np.isnan(values)] = 0.0
+        return values
+
+    def _match_keys(self, key_nodes, key_dirs, key_deeps):
+        """Boolean (rule x key) matrix for unique (node, direction, hop) keys."""
+        rules = self.rule_index.rules
+        matched = np.zeros((len(rules), len(key_nodes)), dtype=bool)
+        if not rules or not len(key_nodes):
+            return matched
+
+        # Context (direction + hop range), broadcast rule columns against key rows
+        any_dir = np.array([r.direction is None for r in rules])
+        rule_dir = np.array([r.direction if isinstance(r.direction, int) else 0 for r in rules])
+        known_dir = np.array([r.direction is None or isinstance(r.direction, int) for r in rules])
+        min_hops = np.array([_hop_bound(r.min_hops, -np.inf) for r in rules], dtype=float)
+        max_hops = np.array([_hop_bound(r.max_hops, np.inf) for r in rules], dtype=float)
+        matched[:] = known_dir[:, None] & (any_dir[:, None] | (rule_dir[:, None] == key_dirs[None, :]))
+        matched &= (key_deeps[None, :] >= min_hops[:, None]) & (key_deeps[None, :] <= max_hops[:, None])
+
+        # Node-level conditions: one code mask per condition, AND-ed once per plan entry
+        encoded = _encode_tags(self.nodes.best_tags)
+        key_codes = {field: codes[key_nodes] for field, (_, codes) in encoded.items()}
+        row_of = {rule.order: row for row, rule in enumerate(rules)}
+        for entry in self.rule_index.plan:
+            entry_mask = np.ones(len(key_nodes), dtype=bool)
+            for field, predicate in entry.conditions:
+                vocab, _ = encoded[field]
+                entry_mask &= _condition_mask(vocab, predicate)[key_codes[field]]
+            for rule in entry.members:
+                matched[row_of[rule.order]] &= entry_mask
+        return matched
+
+    def entities(self):
+        """Findings in first-seen order, identical to `RiskPathAccumulator.entities()`."""
+        result = self.partial_entities()
+        for f in result:
+            f["matched_rules"] = sorted(f["matched_rules"])
+            f["evidence_paths"] = [candidate[-1] for candidate in f["evidence_paths"]]
+        return result
+
+    def partial_entities(self):
+        """Same as `RiskPathAccumulator.partial_entities()` (unsorted rules, ranked evidence candidates)."""
+        table = self.nodes
+        if not self._path_index or not len(table):
+            return []
+
+        # --- Flat occurrence columns ---
+        node_ids = np.frombuffer(self._node_ids, dtype=np.dtype("l")).astype(np.intp)
+        starts = np.array(self._path_start, dtype=np.intp)
+        lengths = np.diff(np.append(starts, len(node_ids)))
+        path_pos = np.repeat(np.arange(len(starts)), lengths)
+        dirs = np.array(self._path_dir)[path_pos]
+        position = np.arange(len(node_ids)) - starts[path_pos]
+        deeps = np.where(dirs == -1, lengths[path_pos] - 1 - position, position)
+
+        # Skip the target address and hops outside 1..max_depth
+        is_target = np.fromiter((a == self.target_address for a in table.addresses), dtype=bool, count=len(table))
+        in_scope = ~is_target[node_ids] & (deeps >= 1) & (deeps <= self.max_depth)
+        occ = np.flatnonzero(in_scope)
+        if not len(occ):
+            return []
+
+        # --- Unique (node, direction, hop) keys, evaluated once per rule ---
+        dir_values, dir_codes = np.unique(dirs[occ], return_inverse=True)
+        span = self.max_depth + 1
+        keys = (node_ids[occ] * len(dir_values) + dir_codes) * span + deeps[occ]
+        unique_keys, key_of_occ = np.unique(keys, return_inverse=True)
+        self.rule_evaluations = len(unique_keys)
+        key_deeps = unique_keys % span
+        key_dirs = dir_values[(unique_keys // span) % len(dir_values)]
+        key_nodes = unique_keys // (span * len(dir_values))
+        matched = self._match_keys(key_nodes, key_dirs, key_deeps)
+
+        hit = matched.any(axis=0)[key_of_occ]
+        occ, key_of_occ = occ[hit], key_of_occ[hit]
+        if not len(occ):
+            return []
+
+        # --- Aggregate per address (occurrences are already in path order) ---
+        address_codes = {}
+        node_address = np.fromiter((address_codes.setdefault(a, len(address_codes)) for a in table.addresses),
+                                   dtype=np.intp, count=len(table))
+        occ_address = node_address[node_ids[occ]]
+        occ_deeps = deeps[occ]
+        by_address = np.argsort(occ_address, kind="stable")
+        sorted_address = occ_address[by_address]
+        group_starts = np.flatnonzero(np.r_[True, sorted_address[1:] != sorted_address[:-1]])
+        first_seen = by_address[group_starts]
+        counts = np.diff(np.append(group_starts, len(by_address)))
+        min_deeps = np.minimum.reduceat(occ_deeps[by_address], group_starts)
+        rule_hits = np.logical_or.reduceat(matched[:, key_of_occ[by_address]], group_starts, axis=1)
+
+        # --- Evidence: top-K per address by (hop asc, amount desc, path asc) ---
+        occ_paths = path_pos[occ]
+        ends = (starts + lengths)[occ_paths]
+        hop_amounts = self._hop_amounts(occ, dirs[occ], ends)
+        path_index = np.array(self._path_index)[occ_paths]
+        ranked = np.lexsort((path_index, -hop_amounts, occ_deeps, occ_address))
+        ranked_address = occ_address[ranked]
+        rank_starts = np.flatnonzero(np.r_[True, ranked_address[1:] != ranked_address[:-1]])
+        rank_in_group = np.arange(len(ranked)) - np.repeat(rank_starts, np.diff(np.append(rank_starts, len(ranked))))
+        evidence = {}
+        for i in ranked[rank_in_group < self.max_evidence].tolist():
+            evidence.setdefault(int(occ_address[i]), []).append(i)
+
+        rule_ids = [r.rule_id for r in self.rule_index.rules]
+        hit_rows, hit_groups = np.nonzero(rule_hits)
+        group_rules = {}
+        for row, group in zip(hit_rows.tolist(), hit_groups.tolist()):
+            group_rules.setdefault(group, set()).add(rule_ids[row])
+
+        result = []
+        for group in np.argsort(first_seen, kind="stable").tolist():
+            first = int(occ[first_seen[group]])
+            addr = table.addresses[self._node_ids[first]]
+            tag = table.best_tags[self._node_ids[first]]
+            evidence_paths = []
+            for i in evidence[int(sorted_address[group_starts[group]])]:
+                pos = int(occ_paths[i])
+                deep = int(occ_deeps[i])
+                evidence_paths.append((deep, -float(hop_amounts[i]), self._path_index[pos], {
+                    "path_index": self._path_index[pos],
+                    "deep": deep,
+                    "flow": self._compact_path(pos).format_evidence(table, int(position[occ[i]])),
+                }))
+            result.append({
+                "address": addr,
+                "min_deep": int(min_deeps[group]),
+                "tag": {
+                    "primary_category": tag.get("primary_category", ""),
+                    "secondary_category": tag.get("secondary_category", ""),
+                    "tertiary_category": tag.get("tertiary_category", ""),
+                    "quaternary_category": tag.get("quaternary_category", ""),
+                    "risk_level": tag.get("risk_level", ""),
+                },
+                "matched_rules": group_rules[group],
+                "evidence_paths": evidence_paths,
+                "occurrences": int(counts[group]),
+            })
+        return result
@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+"""
+verdict_engine.py
+-----------------
+Deterministic rule evaluation over a raw graph: the condition parameters of
+`rule_schema.json` listed below, and the final action the triggered rules demand.
+
+`extract_risk_paths()` only matches node and target tags; amounts, shares and
+daily volumes were left for the LLM to judge. Here each condition is three-valued:
+
+    True / False   decided from the graph
+    None           undetermined: the value is only known to lie in a range
+                   that straddles the threshold (e.g. a missing hop amount)
+
+Parameters are read as follows:
+
+    target.tags.*                 the target's own tags (one tag must satisfy all of them)
+    target.daily_deposit_usd      hop 1 inflow / outflow volume over distinct counterparties:
+    target.daily_withdrawal_usd   exact for windows up to one day, else the range
+                                  [volume / days, volume] (the busiest day lies in between)
+    path.node.tags.*              the node's prioritized tag, within the rule's direction and hops,
+                                  matched by rule_index.py exactly as in extraction
+    path.hops_total               hops of the whole path
+    path.amount                   the path's hop 1 amount (the target's own transfer)
+    path.risk_amount_usd          flow-weighted USD of the direction's flow that traces to tags
+                                  matching the rule's node conditions within its hop range
+                                  (flow_exposure.py, computed once per graph); unbounded above
+                                  when a missing amount feeds any of those tags
+    path.risk_percentage          risk_amount_usd as a share of the direction's total flow
+                                  (`inflow_total_amount` / `outflow_total_amount` when TrustIn
+                                  reports them, else the sum of distinct hop 1 amounts, which
+                                  a missing hop 1 amount leaves open)
+
+Tag conditions (target and node) use extraction's own matching
+(`rule_matches_target_tag()`, `RuleIndex`), so a rule's tag part holds here
+exactly where extraction reports it. A condition this module cannot evaluate
+(an operator the parameter does not support, e.g. `>` on a tag or `NOT_IN` on
+risk_level, a non-numeric threshold, a parameter outside the schema) is
+undetermined, so its rule is never decided false. Rules using risk_amount_usd /
+risk_percentage without node conditions measure Severe and High tags. A rule triggers when one context (target, path, node)
+satisfies all its conditions. On each path, nodes beyond the nearest node
+matched by a Whitelist rule are not evaluated by the other rules.
+
+The verdict action is the strictest triggered action (Freeze > Reject > EDD >
+Review > Warning > Allow; nothing triggered = Allow). It is `decided` unless an
+undetermined rule could still demand a stricter one, extraction reported a
+rule (`extracted_rules`) that did not trigger here, or the graph has no
+`graph_data.data` object at all (`notes` then says why); a decided verdict
+needs no LLM judgment, only the report.
+
+A `delta` graph (incremental monitoring: only the paths new since the previous
+cycle) shows only part of the cumulative figures. Its risk_amount_usd and daily
+volumes count as lower bounds and its risk_percentage as unknown. A rule on
+them is therefore decided only where the new paths alone settle it, and the
+verdict carries a `notes` entry saying so.
+
+Opt-out: AMLCLAW_VERDICT=false (run_screening.py / batch / daemon / extract_risk_paths.py output no verdict block).
+
+Usage:
+    python3 scripts/verdict_engine.py --graph graph_data/raw_graph_<addr>_<ts>.json --rules rules.json
+    python3 scripts/verdict_engine.py --graph raw_graph.json --rules rules.json --scenario deposit
+"""
+import argparse
+import json
+import operator
+import os
+import sys
+
+from extract_risk_paths import (NODE_LEVEL_PARAMS, SCENARIO_CATEGORIES, SCENARIO_PATH_FILTER, TARGET_LEVEL_PARAMS,
+                                compute_true_deep, filter_rules_for_scenario, rule_matches_target_tag)
+from flow_exposure import graph_exposure
+from graph_table import CompactPath, NodeTable
+from rule_index import NODE_PARAM_FIELDS, CompiledRule, RuleIndex, rule_spec, supports_operator
+
+# Strictest first; the rule schema's `action` enum
+ACTIONS = ("Freeze", "Reject", "EDD", "Review", "Warning", "Allow", "Whitelist")
+ACTION_RANK = {action: rank for rank, action in enumerate(ACTIONS)}
+DEFAULT_ACTION = "Allow"
+
+SEVERITIES = ("Severe", "High", "Medium", "Low")
+SEVERITY_RANK = {level.lower(): rank for rank, level in enumerate(SEVERITIES)}
+
+# Node condition implied by risk_amount_usd / risk_percentage rules without node conditions
+RISKY_CONDITION = {"parameter": "path.node.tags.risk_level", "operator": "IN", "value": ["Severe", "High"]}
+
+DIRECTION_CODES = {"inflow": -1, "outflow": 1}
+DIRECTION_NAMES = {-1: "inflow", 1: "outflow"}
+
+# Tag condition parameter (target and node) -> tag field it reads
+TAG_PARAM_FIELDS = dict(NODE_PARAM_FIELDS, **{param: param.rsplit(".", 1)[-1] for param in TARGET_LEVEL_PARAMS})
+
+VOLUME_PARAMS = {"target.daily_deposit_usd": -1, "target.daily_withdrawal_usd": 1}
+RISK_PARAMS = {"path.risk_amount_usd", "path.risk_percentage"}
+PATH_PARAMS = {"path.hops_total", "path.amount"} | RISK_PARAMS
+
+DAY_MS = 86_400_000
+UNKNOWN = (0.0, float("inf"))
+
+_ORDERING = {">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le}
+
+
+def verdict_enabled() -> bool:
+    return os.environ.get("AMLCLAW_VERDICT", "").lower() != "false"
+
+
+# ---------------------------------------------------------------------------
+# Conditions
+# ---------------------------------------------------------------------------
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _members(value):
+    return value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+def compare_bounds(op, bounds, value):
+    """
+    Three-valued `op` for a numeric value known to lie in `bounds` = (low, high);
+    an operator without numeric meaning (CONTAINS) or a non-numeric threshold is undetermined.
+    """
+    low, high = bounds
+    if op in _ORDERING:
+        if not _is_number(value):
+            return None
+        test = _ORDERING[op]
+        at_low, at_high = test(low, value), test(high, value)
+        return at_low if at_low == at_high else None  # Monotone: both ends agree = whole range agrees
+    if op not in ("==", "!=", "IN", "NOT_IN"):
+        return None
+    numbers = [m for m in _members(value) if _is_number(m)]
+    positive = op in ("==", "IN")
+    if low == high:
+        return any(m == low for m in numbers) == positive
+    if not any(low <= m <= high for m in numbers):
+        return not positive
+    return None
+
+
+def _and(results):
+    """Three-valued AND."""
+    outcome = True
+    for result in results:
+        if result is False:
+            return False
+        if result is None:
+            outcome = None
+    return outcome
+
+
+# ---------------------------------------------------------------------------
+# Graph facts
+# ---------------------------------------------------------------------------
+def _amount(raw):
+    """Hop amount as `(low, high)` bounds; missing or non-numeric amounts are unknown."""
+    if raw is None or isinstance(raw, bool):
+        return UNKNOWN
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return UNKNOWN
+    return (value, value) if value == value and value >= 0 else UNKNOWN
+
+
+class TargetTransfers:
+    """
+    The target's hop 1 transfers per direction, folded path by path (`add_path()`,
+    so it works while streaming): counterparty -> amount bounds, largest seen.
+    """
+
+    def __init__(self):
+        self.edges = {-1: {}, 1: {}}
+
+    def add_path(self, path):
+        nodes = path.get("path") or []
+        n, direction = len(nodes), path.get("direction", -1)
+        if n < 2 or direction not in self.edges:
+            return
+        if direction == -1:
+            counterparty, bounds = nodes[n - 2].get("address", ""), _amount(nodes[n - 1].get("amount"))
+        else:
+            counterparty, bounds = nodes[1].get("address", ""), _amount(nodes[1].get("amount"))
+        known = self.edges[direction].get(counterparty)
+        if known is None or bounds[1] > known[1]:
+            self.edges[direction][counterparty] = bounds
+
+
+class GraphFacts:
+    """
+    Target tags, daily volumes, flow exposure and compact paths of one raw graph,
+    read once. `state` (an `extract_risk_paths(..., return_state=True)` result)
+    supplies the node table, paths and exposure extraction already built, and
+    `transfers` (a TargetTransfers fed the same paths) the hop 1 transfers, e.g.
+    for a streamed graph whose `graph_data.data.paths` was not kept.
+    """
+
+    def __init__(self, graph, max_depth=5, state=None, delta=False, transfers=None):
+        data = (graph.get("graph_data") or {}).get("data")
+        # No graph at all (missing or undecodable TrustIn data) is no evidence either way
+        self.graph_missing = not isinstance(data, dict) or not data
+        if not isinstance(data, dict):
+            data = {}
+        self.delta = delta  # Only the paths new since the previous monitoring cycle
+        self.target = graph.get("address", "")
+        self.target_tags = [t for t in data.get("tags") or [] if isinstance(t, dict)]
+        raw_paths = data.get("paths") or []
+        if state is not None:
+            self.nodes, self.paths, self.exposure = state.nodes, state.paths, state.exposure
+        else:
+            self.nodes = NodeTable()
+            self.paths = [(i, CompactPath.from_path(p, self.nodes)) for i, p in enumerate(raw_paths)]
+            self.exposure = graph_exposure(graph, max_depth)
+
+        if transfers is None:
+            transfers = TargetTransfers()
+            for path in raw_paths:
+                transfers.add_path(path)
+
+        self.volumes = {}
+        days = self._window_days(graph.get("parameters") or {})
+        for direction in DIRECTION_NAMES:
+            edges = transfers.edges[direction].values()
+            low, high = sum(b[0] for b in edges), sum(b[1] for b in edges)
+            if days is None:
+                self.volumes[direction] = (0.0, high)
+            elif days <= 1:
+                self.volumes[direction] = (low, high)
+            else:
+                self.volumes[direction] = (low / days, high)
+            if delta:
+                # Earlier transfers of the same days are not in the slice
+                self.volumes[direction] = (self.volumes[direction][0], float("inf"))
+
+    @staticmethod
+    def _window_days(parameters):
+        start, end = parameters.get("min_timestamp_ms"), parameters.get("max_timestamp_ms")
+        if not _is_number(start) or not _is_number(end) or end < start:
+            return None
+        return max((end - start) / DAY_MS, 1.0)
+
+    @staticmethod
+    def path_value(param, path):
+        """Bounds of `path.hops_total` / `path.amount` for a CompactPath."""
+        if param == "path.hops_total":
+            hops = len(path.nodes) - 1
+            return (hops, hops)
+        n = len(path.amounts)
+        if n < 2:
+            return UNKNOWN
+        return _amount(path.amounts[n - 1] if path.direction == -1 else path.amounts[1])
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+class RuleCheck:
+    """One rule's conditions sorted by what they read."""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.rule_id = rule.get("rule_id")
+        self.action = rule.get("action", "")
+        self.risk_level = rule.get("risk_level", "")
+        self.whitelist = self.action == "Whitelist"
+        rule_dir = rule.get("direction")
+        self.direction = DIRECTION_CODES.get(rule_dir, False) if rule_dir else None
+        self.min_hops, self.max_hops = rule.get("min_hops"), rule.get("max_hops")
+        self.target_tags = False
+        self.volumes, self.paths, self.unknown = [], [], []
+        conditions = rule.get("conditions", [])
+        evaluable = []  # Conditions extraction's tag matching can evaluate
+        for cond in conditions:
+            param, op, value = cond.get("parameter", ""), cond.get("operator", ""), cond.get("value")
+            field = TAG_PARAM_FIELDS.get(param)
+            if field is not None and not supports_operator(field, op):
+                self.unknown.append(param)  # Extraction never matches it; left undetermined
+                continue
+            evaluable.append(cond)
+            if param in TARGET_LEVEL_PARAMS:
+                self.target_tags = True
+            elif param in VOLUME_PARAMS:
+                self.volumes.append((param, op, value))
+            elif param in PATH_PARAMS:
+                self.paths.append((param, op, value))
+            elif param not in NODE_LEVEL_PARAMS:
+                self.unknown.append(param)
+        # The rule as tag matching sees it (rule_matches_target_tag(), RuleIndex / CompiledRule)
+        self.tag_rule = rule if len(evaluable) == len(conditions) else dict(rule, conditions=evaluable)
+        self.node_rule = self.tag_rule
+        if (not any(c.get("parameter") in NODE_LEVEL_PARAMS for c in conditions)
+                and any(param in RISK_PARAMS for param, _, _ in self.paths)):
+            self.node_rule = dict(rule, conditions=evaluable + [RISKY_CONDITION])
+        spec = rule_spec(self.node_rule)
+        self.node_conditions = CompiledRule(0, spec) if spec is not None else None
+        # Node conditions left out of node_rule: the tags it selects are a superset
+        self.partial_node = any(param in NODE_LEVEL_PARAMS for param in self.unknown)
+        self.conditions = len(conditions)
+        self._exposure = {}  # path direction -> risk parameter values
+
+    @property
+    def needs_paths(self):
+        return bool(self.node_conditions or self.paths)
+
+    def applies_to(self, path_dir, deep):
+        """Direction and hop range (rule_applies_to_context() semantics)."""
+        if self.direction is not None and self.direction != path_dir:
+            return False
+        if deep is not None:
+            if self.min_hops is not None and deep < self.min_hops:
+                return False
+            if self.max_hops is not None and deep > self.max_hops:
+                return False
+        return True
+
+    def match_tag(self, tag):
+        return self.node_conditions is not None and self.node_conditions.matches(tag)
+
+    def risk_values(self, facts, direction):
+        """Flow-weighted exposure to the tags this rule matches, within its hop range."""
+        values = self._exposure.get(direction)
+        if values is None:
+            amount = facts.exposure.amount_bounds(direction, self.match_tag, self.min_hops, self.max_hops)
+            if self.partial_node:
+                amount = UNKNOWN if self.node_conditions is None else (0.0, amount[1])
+            percentage = facts.exposure.percentage_bounds(direction, amount)
+            if facts.delta:
+                # Earlier cycles add to the amount; the share can move either way
+                amount, percentage = (amount[0], float("inf")), (0.0, 100.0)
+            values = self._exposure[direction] = {
+                "path.risk_amount_usd": amount,
+                "path.risk_percentage": percentage,
+            }
+        return values
+
+    def match_path(self, facts, path):
+        """Three-valued AND of the path.* conditions, the values read and the undetermined parameters."""
+        values = {}
+        results = []
+        undetermined = []
+        for param, op, value in self.paths:
+            if param in RISK_PARAMS:
+                bounds = values[param] = self.risk_values(facts, path.direction)[param]
+            else:
+                bounds = values[param] = facts.path_value(param, path)
+            result = compare_bounds(op, bounds, value)
+            if result is None:
+                undetermined.append(param)
+            results.append(result)
+        return _and(results), values, undetermined
+
+
+def _bounds_json(bounds):
+    low, high = bounds
+    if low == high:
+        return round(low, 6)
+    return [round(low, 6), None if high == float("inf") else round(high, 6)]
+
+
+class _Outcome:
+    """Running three-valued OR over a rule's contexts."""
+
+    __slots__ = ("result", "witness", "undetermined")
+
+    def __init__(self):
+        self.result = False
+        self.witness = None
+        self.undetermined = set()
+
+    def add(self, result, witness, values=None):
+        if result is True:
+            self.result, self.witness = True, witness
+        elif result is None and self.result is False:
+            self.result = None
+            self.undetermined.update(values or ())
+        elif result is None:
+            self.undetermined.update(values or ())
+
+
+def evaluate_verdict(graph, rules, scenario="all", max_depth=5, facts=None, state=None, extracted_rules=None,
+                     delta=False):
+    """
+    Evaluate every rule of `scenario` on a raw graph and derive the final action.
+    Pass the `ExtractionState` of the same extraction as `state` to reuse its
+    node table, paths and exposure, and its `summary.rules_triggered` as
+    `extracted_rules`: a rule extraction reported that did not trigger here is
+    listed as undetermined and the verdict is not decided. `delta` marks a graph
+    holding only the paths new since the previous monitoring cycle.
+
+    Returns `{"scenario", "action", "decided", "highest_severity", "triggered",
+    "undetermined", "rules_evaluated"}`, plus `notes` when something other than
+    a rule keeps the verdict undecided; `triggered` entries carry a `witness`
+    (the target tag, volume or path node that satisfied the rule).
+    """
+    facts = facts or GraphFacts(graph, max_depth, state, delta)
+    checks = [RuleCheck(rule) for rule in filter_rules_for_scenario(rules, scenario)]
+    allowed_dirs = SCENARIO_PATH_FILTER.get(scenario)
+    outcomes = {}
+    pending = []  # (check, outcome) still waiting on path contexts
+
+    for check in checks:
+        outcome = outcomes[check.rule_id] = _Outcome()
+        if not check.conditions:
+            continue
+        head = [None] * len(check.unknown)  # Parameters outside the schema stay for the LLM
+        outcome.undetermined.update(check.unknown)
+        witness = {}
+        if check.target_tags:
+            tag = next((t for t in facts.target_tags if rule_matches_target_tag(check.tag_rule, t)), None)
+            head.append(tag is not None)
+            if tag is not None:
+                witness["target_tag"] = {field: tag.get(field, "") for field in
+                                         ("primary_category", "secondary_category", "risk_level")}
+        for param, op, value in check.volumes:
+            bounds = facts.volumes[VOLUME_PARAMS[param]]
+            result = compare_bounds(op, bounds, value)
+            head.append(result)
+            witness[param] = _bounds_json(bounds)
+            if result is None:
+                outcome.undetermined.add(param)
+        head = _and(head)
+        if head is False:
+            outcome.undetermined.clear()
+            continue
+        if not check.needs_paths:
+            outcome.add(head, witness)
+            continue
+        pending.append((check, outcome, head, witness))
+
+    if pending:
+        _evaluate_paths(facts, pending, allowed_dirs, max_depth)
+
+    extracted = set(extracted_rules or ())
+    disputed = False
+    triggered, undetermined = [], []
+    for check in checks:
+        outcome = outcomes[check.rule_id]
+        entry = {"rule_id": check.rule_id, "action": check.action, "risk_level": check.risk_level}
+        if outcome.result is True:
+            triggered.append(dict(entry, witness=outcome.witness))
+        elif outcome.result is None:
+            undetermined.append(dict(entry, parameters=sorted(outcome.undetermined)))
+        elif check.rule_id in extracted:
+            # Extraction matched it, so the engine's False is not the only reading
+            disputed = True
+            parameters = sorted({param for param, _, _ in check.volumes + check.paths} | set(check.unknown))
+            undetermined.append(dict(entry, parameters=parameters, extracted=True))
+
+    enforced = [t["action"] for t in triggered if t["action"] in ACTION_RANK and t["action"] != "Whitelist"]
+    action = min(enforced, key=ACTION_RANK.get) if enforced else DEFAULT_ACTION
+    decided = not disputed and not any(
+        ACTION_RANK.get(u["action"], len(ACTIONS)) < ACTION_RANK[action] for u in undetermined)
+    notes = []
+    if facts.graph_missing:
+        decided = False
+        notes.append("graph_data.data is missing or empty: the graph carries no evidence either way")
+    if facts.delta and any(check.volumes or RISK_PARAMS.intersection(p for p, _, _ in check.paths) for check in checks):
+        notes.append("delta slice: risk_amount_usd and daily volumes cover only the new paths (lower bounds) and "
+                     "risk_percentage is unknown; rules on them are decided only where the new paths alone settle them")
+    severities = [t["risk_level"] for t in triggered if str(t["risk_level"]).lower() in SEVERITY_RANK]
+    highest = min(severities, key=lambda level: SEVERITY_RANK[level.lower()]) if severities else "Low"
+
+    verdict = {
+        "scenario": scenario,
+        "action": action,
+        "decided": decided,
+        "highest_severity": highest,
+        "triggered": triggered,
+        "undetermined": undetermined,
+        "rules_evaluated": len(checks),
+    }
+    if notes:
+        verdict["notes"] = notes
+    return verdict
+
+
+def _evaluate_paths(facts, pending, allowed_dirs, max_depth):
+    """One pass over the paths for every rule that needs path contexts."""
+    table = facts.nodes
+    node_rules = [item for item in pending if item[0].node_conditions]
+    path_rules = [item for item in pending if not item[0].node_conditions]
+    whitelist = [item for item in node_rules if item[0].whitelist]
+    # Extraction's own index decides which rules a node's tag matches at a direction and hop
+    index = RuleIndex([item[0].node_rule for item in node_rules])
+    by_rule_id = {item[0].rule_id: item for item in node_rules}
+    node_matches = {}  # (node id, direction, deep) -> candidate rules
+
+    def contexts(path):
+        """(node_id, deep, candidate rules) of the path's matched, in-range nodes other than the target."""
+        n = len(path.nodes)
+        found = []
+        for node_idx, node_id in enumerate(path.nodes):
+            tag = table.best_tags[node_id]
+            if not tag or table.addresses[node_id] == facts.target:
+                continue
+            deep = compute_true_deep(node_idx, n, path.direction, None)
+            if not 1 <= deep <= max_depth:
+                continue
+            key = (node_id, path.direction, deep)
+            candidates = node_matches.get(key)
+            if candidates is None:
+                candidates = node_matches[key] = tuple(
+                    by_rule_id[rule_id] for rule_id in index.match(path.direction, deep, tag))
+            if candidates:
+                found.append((node_id, deep, candidates))
+        return found
+
+    def settle(item, path, witness):
+        check, outcome, head, base = item
+        result, values, undetermined = check.match_path(facts, path)
+        combined = _and((head, result))
+        if combined is not False:
+            witness.update((param, _bounds_json(bounds)) for param, bounds in values.items())
+            outcome.add(combined, dict(base, **witness), undetermined)
+
+    for path_idx, path in facts.paths:
+        if not path.nodes or path.direction not in DIRECTION_NAMES:
+            continue
+        if allowed_dirs and path.direction not in allowed_dirs:
+            continue
+        if all(item[1].result is True for item in pending):
+            break  # Every rule already has its witness
+        direction = DIRECTION_NAMES[path.direction]
+
+        for item in path_rules:
+            check, outcome = item[0], item[1]
+            if outcome.result is True or not check.applies_to(path.direction, None):
+                continue
+            settle(item, path, {"path_index": path_idx, "direction": direction})
+
+        nodes = contexts(path) if node_rules else ()
+        if not nodes:
+            continue
+        cut = None
+        if whitelist:
+            # Nearest node matched by a Whitelist rule: the others stop there
+            for node_id, deep, candidates in nodes:
+                if cut is not None and deep >= cut:
+                    continue
+                for check, _, head, _ in candidates:
+                    if check.whitelist and head is True and check.applies_to(path.direction, deep) \
+                            and check.match_path(facts, path)[0] is True:
+                        cut = deep
+                        break
+        for node_id, deep, candidates in nodes:
+            for item in candidates:
+                check, outcome = item[0], item[1]
+                if outcome.result is True or not check.applies_to(path.direction, deep):
+                    continue
+                if cut is not None and deep > cut and not check.whitelist:
+                    continue
+                settle(item, path, {"path_index": path_idx, "direction": direction,
+                                    "address": table.addresses[node_id], "deep": deep})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate every rule condition on a raw graph and print the verdict.")
+    parser.add_argument("--graph", required=True, help="Path to raw_graph file (any format, detected from content).")
+    parser.add_argument("--rules", default="rules.json", help="Path to rules.json (default: ./rules.json).")
+    parser.add_argument("--scenario", choices=list(SCENARIO_CATEGORIES), default="all",
+                        help="Business scenario filter (default: all).")
+    parser.add_argument("--max-depth", type=int, default=5, help="Maximum hop depth to consider.")
+    args = parser.parse_args()
+
+    for label, path in (("Graph", args.graph), ("Rules", args.rules)):
+        if not os.path.isfile(path):
+            print(json.dumps({"status": "failed", "error": f"{label} file not found: {path}"}))
+            sys.exit(1)
+
+    from artifact_io import load_artifact
+    from compiled_rules import load_compiled_rules
+    from extract_risk_paths import extract_risk_paths
+    rules = load_compiled_rules(args.rules)
+    graph = load_artifact(args.graph)
+    _, summary, _, _, state = extract_risk_paths(graph, rules, args.max_depth, args.scenario, return_state=True)
+    verdict = evaluate_verdict(graph, rules, args.scenario, args.max_depth, state=state,
+                               extracted_rules=summary.get("rules_triggered"))
+    print(json.dumps({"status": "success", **verdict}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Regression tests: a delta slice (incremental monitoring) only bounds cumulative figures from below.
+
+Run from the repository root:
+    python3 -m pytest -q aml-address-screening/tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from verdict_engine import evaluate_verdict  # noqa: E402
+
+TARGET = "TTargetAddress000000000000000000000"
+SANCTIONED = {"primary_category": "Sanctions", "secondary_category": "OFAC", "risk_level": "Severe"}
+GRAPH = {
+    "address": TARGET,
+    "parameters": {"min_timestamp_ms": 0, "max_timestamp_ms": 3_600_000},
+    "graph_data": {"data": {"tags": [], "paths": [{"direction": -1, "path": [
+        {"address": "TSanctioned000000000000000000000000", "tags": [SANCTIONED]},
+        {"address": TARGET, "amount": 500},
+    ]}]}},
+}
+
+
+def _rule(parameter, operator, value):
+    return {
+        "rule_id": "T-001", "category": "Deposit", "name": "test", "risk_level": "High", "action": "Reject",
+        "conditions": [
+            {"parameter": "path.node.tags.primary_category", "operator": "IN", "value": ["Sanctions"]},
+            {"parameter": parameter, "operator": operator, "value": value},
+        ],
+    }
+
+
+def _verdict(rule, delta):
+    return evaluate_verdict(GRAPH, [rule], "deposit", delta=delta)
+
+
+def test_full_graph_decides_cumulative_rules():
+    for rule in (_rule("path.risk_percentage", ">", 50), _rule("path.risk_amount_usd", ">", 1000)):
+        verdict = _verdict(rule, delta=False)
+        assert verdict["decided"] is True and "notes" not in verdict
+
+
+def test_delta_percentage_is_undetermined():
+    verdict = _verdict(_rule("path.risk_percentage", ">", 50), delta=True)
+    assert verdict["action"] == "Allow" and verdict["decided"] is False
+    assert verdict["undetermined"][0]["parameters"] == ["path.risk_percentage"]
+    assert verdict["notes"]
+
+
+def test_delta_amount_is_a_lower_bound():
+    # The slice alone exceeds the threshold, so the cumulative amount does too
+    verdict = _verdict(_rule("path.risk_amount_usd", ">", 100), delta=True)
+    assert verdict["action"] == "Reject" and verdict["decided"] is True
+
+    verdict = _verdict(_rule("path.risk_amount_usd", ">", 1000), delta=True)
+    assert verdict["action"] == "Allow" and verdict["decided"] is False
+
+
+def test_delta_daily_volume_is_a_lower_bound():
+    rule = {"rule_id": "T-002", "category": "Deposit", "name": "test", "risk_level": "High", "action": "EDD",
+            "conditions": [{"parameter": "target.daily_deposit_usd", "operator": ">", "value": 1000}]}
+    assert evaluate_verdict(GRAPH, [rule], "deposit")["decided"] is True
+    verdict = evaluate_verdict(GRAPH, [rule], "deposit", delta=True)
+    assert verdict["decided"] is False and verdict["notes"]
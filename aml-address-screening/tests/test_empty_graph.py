@@ -0,0 +1,40 @@
+"""
+Regression tests: an empty or undecodable TrustIn payload is never a decided verdict.
+
+Run from the repository root:
+    python3 -m pytest -q aml-address-screening/tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from trustin_api import parse_result  # noqa: E402
+from verdict_engine import evaluate_verdict  # noqa: E402
+
+RULES = [{
+    "rule_id": "T-001", "category": "Deposit", "name": "test", "risk_level": "Severe", "action": "Freeze",
+    "conditions": [{"parameter": "path.node.tags.primary_category", "operator": "IN", "value": ["Sanctions"]}],
+}]
+
+
+@pytest.mark.parametrize("response", [{"code": 0}, {"code": 0, "data": None}, {"code": 0, "data": "{not json"}])
+def test_parse_result_rejects_missing_graph(response):
+    with pytest.raises(Exception):
+        parse_result(response)
+
+
+@pytest.mark.parametrize("graph_data", [{}, {"code": 0, "data": {}}, {"code": 0, "data": []}])
+def test_verdict_without_graph_is_undecided(graph_data):
+    verdict = evaluate_verdict({"address": "T0", "graph_data": graph_data}, RULES, "deposit")
+    assert verdict["action"] == "Allow"
+    assert verdict["decided"] is False
+    assert verdict["notes"]
+
+
+def test_verdict_with_empty_paths_is_decided():
+    graph = {"address": "T0", "graph_data": {"code": 0, "data": {"tags": [], "paths": []}}}
+    verdict = evaluate_verdict(graph, RULES, "deposit")
+    assert verdict["decided"] is True and "notes" not in verdict
@@ -0,0 +1,62 @@
+"""
+Regression tests: a streamed extraction yields the same verdict as an in-memory one.
+
+Run from the repository root:
+    python3 -m pytest -q aml-address-screening/tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from extract_risk_paths import extract_risk_paths, extract_risk_paths_streaming  # noqa: E402
+from verdict_engine import GraphFacts, TargetTransfers, evaluate_verdict  # noqa: E402
+
+TARGET = "TTargetAddress000000000000000000000"
+MIXER = {"primary_category": "Obfuscation", "secondary_category": "Mixers", "risk_level": "High"}
+GRAPH = {
+    "chain": "Tron",
+    "address": TARGET,
+    "parameters": {"min_timestamp_ms": 0, "max_timestamp_ms": 3_600_000},
+    "graph_data": {"code": 0, "data": {"tags": [], "paths": [
+        {"direction": -1, "path": [
+            {"address": "TMixerAddress0000000000000000000000", "tags": [MIXER]},
+            {"address": "THopAddress00000000000000000000000", "amount": 300},
+            {"address": TARGET, "amount": 1200},
+        ]},
+        {"direction": 1, "path": [
+            {"address": TARGET},
+            {"address": "TPayeeAddress0000000000000000000000", "amount": 700},
+        ]},
+    ]}},
+}
+RULES = [
+    {"rule_id": "T-001", "category": "Deposit", "name": "mixer share", "risk_level": "High", "action": "EDD",
+     "conditions": [
+         {"parameter": "path.node.tags.secondary_category", "operator": "IN", "value": ["Mixers"]},
+         {"parameter": "path.risk_percentage", "operator": ">", "value": 20},
+     ]},
+    {"rule_id": "T-002", "category": "Withdrawal", "name": "volume", "risk_level": "Medium", "action": "Review",
+     "conditions": [{"parameter": "target.daily_withdrawal_usd", "operator": ">", "value": 500}]},
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_streamed_verdict_matches_in_memory(tmp_path, workers):
+    graph_path = tmp_path / "raw_graph.json"
+    graph_path.write_text(json.dumps(GRAPH), encoding="utf-8")
+
+    _, summary, _, _, state = extract_risk_paths(GRAPH, RULES, 5, "all", return_state=True)
+    expected = evaluate_verdict(GRAPH, RULES, "all", 5, state=state, extracted_rules=summary["rules_triggered"])
+
+    transfers = TargetTransfers()
+    _, summary, _, _, header, state = extract_risk_paths_streaming(
+        str(graph_path), RULES, 5, "all", workers=workers, return_state=True, on_path=transfers.add_path)
+    facts = GraphFacts(header, 5, state, transfers=transfers)
+    verdict = evaluate_verdict(header, RULES, "all", 5, facts=facts, extracted_rules=summary["rules_triggered"])
+
+    assert verdict == expected
+    assert {t["rule_id"] for t in verdict["triggered"]} == {"T-001", "T-002"}
@@ -0,0 +1,77 @@
+"""
+Regression tests for tag condition operators in extraction and the verdict engine.
+
+Run from the repository root:
+    python3 -m pytest -q aml-address-screening/tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from extract_risk_paths import extract_risk_paths  # noqa: E402
+from verdict_engine import evaluate_verdict  # noqa: E402
+
+TARGET = "TTargetAddress000000000000000000000"
+MIXER = {"primary_category": "Obfuscation", "secondary_category": "Mixers", "risk_level": "High"}
+
+
+def _graph(target_tags=(), counterparty_tag=MIXER):
+    path = [
+        {"address": "TMixerAddress0000000000000000000000", "amount": 100, "tags": [counterparty_tag]},
+        {"address": TARGET, "amount": 1000},
+    ]
+    return {
+        "address": TARGET,
+        "graph_data": {"data": {"tags": list(target_tags), "paths": [{"direction": -1, "path": path}]}},
+    }
+
+
+def _rule(parameter, operator, value, rule_id="T-001"):
+    return {
+        "rule_id": rule_id, "category": "Deposit", "name": "test", "risk_level": "High", "action": "EDD",
+        "conditions": [{"parameter": parameter, "operator": operator, "value": value}],
+    }
+
+
+def _screen(graph, rules):
+    _, summary, _, _, state = extract_risk_paths(graph, rules, 5, "deposit", return_state=True)
+    verdict = evaluate_verdict(graph, rules, "deposit", 5, state=state, extracted_rules=summary["rules_triggered"])
+    return summary["rules_triggered"], verdict
+
+
+def test_node_tag_contains():
+    rules = [_rule("path.node.tags.secondary_category", "CONTAINS", "Mixer")]
+    triggered, verdict = _screen(_graph(), rules)
+    assert triggered == ["T-001"]
+    assert verdict["action"] == "EDD" and verdict["decided"] is True
+
+    rules = [_rule("path.node.tags.secondary_category", "CONTAINS", ["Bridge", "Mixer"])]
+    assert _screen(_graph(), rules)[0] == ["T-001"]
+
+    rules = [_rule("path.node.tags.secondary_category", "CONTAINS", "Bridge")]
+    triggered, verdict = _screen(_graph(), rules)
+    assert triggered == []
+    assert verdict["action"] == "Allow" and verdict["decided"] is True
+
+
+def test_target_tag_contains():
+    graph = _graph(target_tags=[MIXER], counterparty_tag={})
+    rules = [_rule("target.tags.primary_category", "CONTAINS", "Obfusc")]
+    triggered, verdict = _screen(graph, rules)
+    assert triggered == ["T-001"]
+    assert verdict["action"] == "EDD" and verdict["decided"] is True
+
+    rules = [_rule("target.tags.risk_level", "CONTAINS", "Sev")]
+    triggered, verdict = _screen(graph, rules)
+    assert triggered == []
+    assert verdict["action"] == "Allow" and verdict["decided"] is True
+
+
+def test_unsupported_operator_is_undetermined():
+    for parameter in ("path.node.tags.risk_level", "target.tags.risk_level"):
+        graph = _graph(target_tags=[MIXER])
+        triggered, verdict = _screen(graph, [_rule(parameter, ">", "Medium")])
+        assert triggered == []
+        assert verdict["decided"] is False
+        assert [u["parameters"] for u in verdict["undetermined"]] == [[parameter]]
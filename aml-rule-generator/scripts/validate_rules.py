@@ -5,69 +5,212 @@ validate_rules.py
 Validates rules.json against the rule_schema.json JSON Schema
 and checks that condition values use valid TrustIn AML labels.
 
+The labels Markdown table is parsed into a `LabelIndex` (primary → secondary
+→ tertiary → quaternary, with risk levels) that is cached as JSON and rebuilt
+only when the labels file's SHA-256 changes
+(AMLCLAW_LABEL_INDEX_CACHE, default: ~/.cache/amlclaw/label_index.json).
+Schema enums are checked through frozensets (`SchemaIndex`).
+
+Several rules files (e.g. one per tenant) are validated in parallel processes.
+
 Usage:
     python3 amlclaw/aml-rule-generator/scripts/validate_rules.py [rules.json]
+    python3 amlclaw/aml-rule-generator/scripts/validate_rules.py tenants/*/rules.json --jobs 8
 """
 
+import argparse
+import hashlib
 import json
 import sys
 import os
-import re
+from concurrent.futures import ProcessPoolExecutor
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SKILL_DIR = os.path.dirname(SCRIPT_DIR)  # aml-rule-generator/
 SCHEMA_PATH = os.path.join(SKILL_DIR, "schema", "rule_schema.json")
 LABELS_PATH = os.path.join(SKILL_DIR, "references", "Trustin AML labels.md")
 
+# Bump when the cached LabelIndex layout changes
+LABEL_INDEX_FORMAT = 1
+
+# Label table risk column → schema risk_level
+LABEL_RISK_LEVELS = {"严重": "Severe", "高风险": "High", "中风险": "Medium", "低风险": "Low"}
+RISK_ORDER = {"Low": 0, "Medium": 1, "High": 2, "Severe": 3}
+LABEL_LEVELS = ("primary", "secondary", "tertiary", "quaternary")
+
+# Files validated per worker task in multi-file mode
+FILES_PER_TASK = 16
+
 
 def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def label_index_cache_path():
+    return os.path.expanduser(os.getenv("AMLCLAW_LABEL_INDEX_CACHE") or "~/.cache/amlclaw/label_index.json")
+
+
+class LabelIndex:
+    """
+    TrustIn label taxonomy parsed from the labels Markdown table.
+
+    `taxonomy` nests each level's labels as
+    `{name: {"risk_level": ..., "children": {...}}}` (primary → secondary →
+    tertiary → quaternary); a label's risk level is the highest among its
+    rows. `levels` maps each level name to the frozenset of its labels.
+    """
+
+    def __init__(self, taxonomy, source_sha256=None):
+        self.taxonomy = taxonomy
+        self.source_sha256 = source_sha256
+        labels = {level: set() for level in LABEL_LEVELS}
+        nodes = [(0, taxonomy)]
+        while nodes:
+            depth, children = nodes.pop()
+            labels[LABEL_LEVELS[depth]].update(children)
+            nodes.extend((depth + 1, node["children"]) for node in children.values() if node["children"])
+        self.levels = {level: frozenset(names) for level, names in labels.items()}
+
+    @property
+    def primary(self):
+        return self.levels["primary"]
+
+    @property
+    def secondary(self):
+        return self.levels["secondary"]
+
+    def risk_level(self, *path):
+        """Risk level of a label path, e.g. `risk_level("Sanctions", "Sanctioned Entity")`; None if unknown."""
+        node = {"children": self.taxonomy}
+        for name in path:
+            node = node["children"].get(name)
+            if node is None:
+                return None
+        return node["risk_level"]
+
+    @classmethod
+    def from_markdown(cls, content, source_sha256=None):
+        """
+        Parse label table rows `| level_en | level_cn | ... | risk |`: one
+        English/Chinese column pair per level (two to four levels), risk last.
+        """
+        taxonomy = {}
+        for line in content.splitlines():
+            line = line.strip()
+            if not line.startswith("|") or line.startswith("| :") or line.startswith("| 一级"):
+                continue
+            cols = [c.strip() for c in line.split("|")][1:-1]
+            # cols: [primary_en, primary_cn, secondary_en, secondary_cn, (tertiary..., quaternary...,) risk]
+            if len(cols) < 5:
+                continue
+            risk = cols[-1].strip("*").strip()
+            risk = LABEL_RISK_LEVELS.get(risk, risk)
+            children = taxonomy
+            for name in cols[:-1][0::2][:len(LABEL_LEVELS)]:
+                if not name:
+                    break
+                node = children.setdefault(name, {"risk_level": risk, "children": {}})
+                if RISK_ORDER.get(risk, -1) > RISK_ORDER.get(node["risk_level"], -1):
+                    node["risk_level"] = risk
+                children = node["children"]
+        return cls(taxonomy, source_sha256)
+
+    def to_json(self):
+        return {"format": LABEL_INDEX_FORMAT, "source_sha256": self.source_sha256, "taxonomy": self.taxonomy}
+
+
+_LABEL_INDEXES = {}  # (labels path, sha256) -> LabelIndex, per process
+
+
+def load_label_index(labels_path=LABELS_PATH, cache_path=None):
+    """
+    LabelIndex for `labels_path`, read from the on-disk cache when it was built
+    from the same file content (SHA-256), else parsed and cached. Returns None
+    when the labels file does not exist.
+    """
+    try:
+        with open(labels_path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    sha256 = hashlib.sha256(raw).hexdigest()
+    key = (labels_path, sha256)
+    index = _LABEL_INDEXES.get(key)
+    if index is not None:
+        return index
+
+    cache_path = cache_path or label_index_cache_path()
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("format") == LABEL_INDEX_FORMAT and cached.get("source_sha256") == sha256:
+            index = LabelIndex(cached["taxonomy"], sha256)
+    except (OSError, ValueError, AttributeError, KeyError):
+        index = None
+
+    if index is None:
+        index = LabelIndex.from_markdown(raw.decode("utf-8"), sha256)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index.to_json(), f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # Read-only cache location: keep the in-process index
+    _LABEL_INDEXES[key] = index
+    return index
+
+
 def parse_trustin_labels(labels_path):
     """Extract valid primary_category and secondary_category values from the Trustin AML labels Markdown table."""
-    primary_categories = set()
-    secondary_categories = set()
-
-    if not os.path.exists(labels_path):
+    index = load_label_index(labels_path)
+    if index is None:
         print(f"  WARNING: Labels file not found at {labels_path}, skipping tag validation")
-        return primary_categories, secondary_categories
+        return frozenset(), frozenset()
+    return index.primary, index.secondary
 
-    with open(labels_path, "r", encoding="utf-8") as f:
-        content = f.read()
 
-    for line in content.splitlines():
-        line = line.strip()
-        if not line.startswith("|") or line.startswith("| :") or line.startswith("| 一级"):
-            continue
-        cols = [c.strip() for c in line.split("|")]
-        # cols: ['', primary_en, primary_cn, secondary_en, secondary_cn, risk, '']
-        if len(cols) >= 6:
-            primary_en = cols[1].strip()
-            secondary_en = cols[3].strip()
-            if primary_en and primary_en != "一级分类「英文」":
-                primary_categories.add(primary_en)
-            if secondary_en and secondary_en != "二级分类「英文」":
-                secondary_categories.add(secondary_en)
+class SchemaIndex:
+    """Enum values and required fields of rule_schema.json, as frozensets for membership checks."""
 
-    return primary_categories, secondary_categories
+    def __init__(self, schema):
+        item = schema["items"]
+        props = item["properties"]
+        cond_props = props["conditions"]["items"]["properties"]
+        self.categories = props["category"]["enum"]
+        self.risk_levels = props["risk_level"]["enum"]
+        self.actions = props["action"]["enum"]
+        self.required_fields = item["required"]
+        self.category_set = frozenset(self.categories)
+        self.risk_level_set = frozenset(self.risk_levels)
+        self.action_set = frozenset(self.actions)
+        self.parameter_set = frozenset(cond_props["parameter"]["enum"])
+        self.operator_set = frozenset(cond_props["operator"]["enum"])
+
+
+def _is_member(value, members):
+    try:
+        return value in members
+    except TypeError:  # Unhashable value (e.g. a list) is never a valid enum member
+        return False
 
 
 def validate_schema_structure(rules, schema):
-    """Validate rules against the JSON Schema structure (lightweight, no jsonschema dependency)."""
+    """
+    Validate rules against the JSON Schema structure (lightweight, no jsonschema dependency).
+    `schema` is the loaded rule_schema.json or a `SchemaIndex` built from it.
+    """
     errors = []
 
     if not isinstance(rules, list):
         errors.append("Root element must be a JSON array")
         return errors
 
-    valid_categories = schema["items"]["properties"]["category"]["enum"]
-    valid_risk_levels = schema["items"]["properties"]["risk_level"]["enum"]
-    valid_actions = schema["items"]["properties"]["action"]["enum"]
-    valid_parameters = schema["items"]["properties"]["conditions"]["items"]["properties"]["parameter"]["enum"]
-    valid_operators = schema["items"]["properties"]["conditions"]["items"]["properties"]["operator"]["enum"]
-    required_fields = schema["items"]["required"]
+    if not isinstance(schema, SchemaIndex):
+        schema = SchemaIndex(schema)
+    required_fields = schema.required_fields
 
     for i, rule in enumerate(rules):
         prefix = f"Rule [{i}] (id={rule.get('rule_id', '???')})"
@@ -78,14 +221,14 @@ def validate_schema_structure(rules, schema):
                 errors.append(f"{prefix}: missing required field '{field}'")
 
         # Enum validation
-        if "category" in rule and rule["category"] not in valid_categories:
-            errors.append(f"{prefix}: invalid category '{rule['category']}'. Valid: {valid_categories}")
+        if "category" in rule and not _is_member(rule["category"], schema.category_set):
+            errors.append(f"{prefix}: invalid category '{rule['category']}'. Valid: {schema.categories}")
 
-        if "risk_level" in rule and rule["risk_level"] not in valid_risk_levels:
-            errors.append(f"{prefix}: invalid risk_level '{rule['risk_level']}'. Valid: {valid_risk_levels}")
+        if "risk_level" in rule and not _is_member(rule["risk_level"], schema.risk_level_set):
+            errors.append(f"{prefix}: invalid risk_level '{rule['risk_level']}'. Valid: {schema.risk_levels}")
 
-        if "action" in rule and rule["action"] not in valid_actions:
-            errors.append(f"{prefix}: invalid action '{rule['action']}'. Valid: {valid_actions}")
+        if "action" in rule and not _is_member(rule["action"], schema.action_set):
+            errors.append(f"{prefix}: invalid action '{rule['action']}'. Valid: {schema.actions}")
 
         # New V2 fields validation
         if "direction" in rule:
@@ -112,9 +255,9 @@ def validate_schema_structure(rules, schema):
                     for req in ["parameter", "operator", "value"]:
                         if req not in cond:
                             errors.append(f"{cprefix}: missing required field '{req}'")
-                    if "parameter" in cond and cond["parameter"] not in valid_parameters:
+                    if "parameter" in cond and not _is_member(cond["parameter"], schema.parameter_set):
                         errors.append(f"{cprefix}: invalid parameter '{cond['parameter']}'")
-                    if "operator" in cond and cond["operator"] not in valid_operators:
+                    if "operator" in cond and not _is_member(cond["operator"], schema.operator_set):
                         errors.append(f"{cprefix}: invalid operator '{cond['operator']}'")
 
     return errors
@@ -165,17 +308,60 @@ def validate_tag_values(rules, primary_categories, secondary_categories):
     return errors
 
 
-def main():
-    rules_path = sys.argv[1] if len(sys.argv) > 1 else "rules.json"
+def validate_rules_file(rules_path, schema, primary_cats, secondary_cats):
+    """Validate one rules file; returns `(rule count or None, errors)`."""
+    try:
+        rules = load_json(rules_path)
+    except OSError as e:
+        return None, [f"Cannot read file - {e}"]
+    except json.JSONDecodeError as e:
+        return None, [f"Invalid JSON - {e}"]
 
-    if not os.path.exists(rules_path):
-        print(f"FAIL: Rules file not found: {rules_path}")
-        sys.exit(1)
+    errors = []
+    errors.extend(validate_schema_structure(rules, schema))
+    if isinstance(rules, list):
+        errors.extend(validate_rule_id_uniqueness(rules))
+        errors.extend(validate_tag_values(rules, primary_cats, secondary_cats))
+    return len(rules) if isinstance(rules, list) else None, errors
+
+
+def _validate_files(task):
+    """Worker: validate a chunk of rules files with the parent's schema and label sets."""
+    rules_paths, schema, primary_cats, secondary_cats = task
+    return [validate_rules_file(path, schema, primary_cats, secondary_cats) for path in rules_paths]
+
+
+def validate_many(rules_paths, schema, primary_cats, secondary_cats, jobs=0):
+    """Validate many rules files, in parallel processes when `jobs` != 1; results follow input order."""
+    jobs = jobs or os.cpu_count() or 1
+    chunks = [rules_paths[i:i + FILES_PER_TASK] for i in range(0, len(rules_paths), FILES_PER_TASK)]
+    tasks = [(chunk, schema, primary_cats, secondary_cats) for chunk in chunks]
+    if jobs == 1 or len(chunks) == 1:
+        results = map(_validate_files, tasks)
+        return [result for chunk in results for result in chunk]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        return [result for chunk in pool.map(_validate_files, tasks) for result in chunk]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate rules.json files against the rule schema and TrustIn labels.")
+    parser.add_argument("rules", nargs="*", default=["rules.json"], help="Rules file(s) to validate (default: rules.json)")
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="Processes for multi-file validation (default: 0 = one per CPU)")
+    args = parser.parse_args()
 
     if not os.path.exists(SCHEMA_PATH):
         print(f"FAIL: Schema file not found: {SCHEMA_PATH}")
         sys.exit(1)
 
+    if len(args.rules) > 1:
+        main_many(args.rules, args.jobs)
+
+    rules_path = args.rules[0]
+    if not os.path.exists(rules_path):
+        print(f"FAIL: Rules file not found: {rules_path}")
+        sys.exit(1)
+
     print(f"Validating: {rules_path}")
     print(f"Schema:     {SCHEMA_PATH}")
     print(f"Labels:     {LABELS_PATH}")
@@ -187,7 +373,7 @@ def main():
         print(f"FAIL: Invalid JSON - {e}")
         sys.exit(1)
 
-    schema = load_json(SCHEMA_PATH)
+    schema = SchemaIndex(load_json(SCHEMA_PATH))
     primary_cats, secondary_cats = parse_trustin_labels(LABELS_PATH)
 
     all_errors = []
@@ -209,5 +395,31 @@ def main():
         sys.exit(0)
 
 
+def main_many(rules_paths, jobs):
+    """Multi-file mode: one PASS/FAIL line per file (errors listed under failures), exit 1 if any fail."""
+    print(f"Validating: {len(rules_paths)} files")
+    print(f"Schema:     {SCHEMA_PATH}")
+    print(f"Labels:     {LABELS_PATH}")
+    print("-" * 50)
+
+    schema = SchemaIndex(load_json(SCHEMA_PATH))
+    primary_cats, secondary_cats = parse_trustin_labels(LABELS_PATH)
+    results = validate_many(rules_paths, schema, primary_cats, secondary_cats, jobs)
+
+    failed = 0
+    for rules_path, (count, errors) in zip(rules_paths, results):
+        if errors:
+            failed += 1
+            print(f"FAIL: {rules_path}: {len(errors)} error(s)")
+            for err in errors:
+                print(f"  - {err}")
+        else:
+            print(f"PASS: {rules_path}: {count} rule(s)")
+
+    print("-" * 50)
+    print(f"{len(rules_paths) - failed} passed, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
 if __name__ == "__main__":
     main()